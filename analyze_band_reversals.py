@@ -14,13 +14,15 @@ import numpy as np
 sys.path.insert(0, str(Path(__file__).parent))
 
 from config import (
-    DATA_DIR, OUTPUTS_DIR,
-    VWAP_FAST, VWAP_BANDS_START_TIME,
+    OUTPUTS_DIR,
+    VWAP_BANDS_START_TIME,
     VWAP_TIME_ENTRY,
     USE_ALL_DAYS_AVAILABLE, ALL_DAYS_SEGMENT_START, ALL_DAYS_SEGMENT_END
 )
 from find_fractals import load_date_range
-from calculate_vwap import calculate_vwap
+from data_catalog import catalog_dates
+from feature_store import attach_features
+from vwap_bands import calculate_vwap_bands, detect_band_reversals
 
 print("="*80)
 print("BAND REVERSAL ANALYSIS - DETECTING BLUE DOT SIGNALS")
@@ -30,32 +32,16 @@ print()
 # ============================================================================
 # STEP 1: SCAN DATA FOLDER FOR AVAILABLE DATES
 # ============================================================================
-csv_files = list(DATA_DIR.glob("time_and_sales_nq_*.csv"))
-print(f"[INFO] Found {len(csv_files)} CSV files in data folder")
+available_dates = catalog_dates()
+print(f"[INFO] Found {len(available_dates)} days in data catalog")
 
-if len(csv_files) == 0:
+if len(available_dates) == 0:
     print("[ERROR] No data files found")
     sys.exit(1)
 
-# Extract dates from filenames
-import re
-date_pattern = re.compile(r"time_and_sales_nq_(\d{8})\.csv")
-available_dates = []
-
-for csv_file in csv_files:
-    match = date_pattern.search(csv_file.name)
-    if match:
-        date_str = match.group(1)
-        available_dates.append(date_str)
-
-available_dates.sort()
-
 # Apply segment filter if needed
 if not USE_ALL_DAYS_AVAILABLE:
-    available_dates = [
-        date for date in available_dates
-        if ALL_DAYS_SEGMENT_START <= date <= ALL_DAYS_SEGMENT_END
-    ]
+    available_dates = catalog_dates(ALL_DAYS_SEGMENT_START, ALL_DAYS_SEGMENT_END)
 
 print(f"[INFO] Processing {len(available_dates)} dates from {available_dates[0]} to {available_dates[-1]}")
 print()
@@ -81,131 +67,28 @@ for i, date_str in enumerate(available_dates, 1):
             print(f"  [ERROR] No timestamp column in data for {date_str}")
             continue
 
-        # Calculate VWAP
-        df = calculate_vwap(df, period=VWAP_FAST)
-
-        # Re-check timestamp after VWAP calculation
-        if 'timestamp' not in df.columns:
-            print(f"  [ERROR] timestamp column lost after VWAP calculation for {date_str}")
-            continue
-
-        # Calculate VWAP bands
-        bands_start_time = pd.to_datetime(VWAP_BANDS_START_TIME).time()
-        df_bands = df[df['timestamp'].dt.time >= bands_start_time].copy()
+        # VWAP Fast from the feature store (valid from the first bar thanks to the warm-up)
+        attach_features(df, ['vwap_fast'])
 
-        if df_bands.empty:
+        # Session-anchored VWAP bands and 3σ -> 2σ reversal events (shared with plot_day)
+        bands = calculate_vwap_bands(df)
+        n_band_bars = int(bands['std_dev'].notna().sum())
+        if n_band_bars == 0:
             print(f"  [WARN] No data after {VWAP_BANDS_START_TIME} for {date_str}")
             continue
 
-        print(f"  [DEBUG] Total bars after {VWAP_BANDS_START_TIME}: {len(df_bands)}")
-
-        # Calculate standard deviation bands
-        df_bands['price_deviation'] = df_bands['close'] - df_bands['vwap_fast']
-        std_dev = df_bands['price_deviation'].expanding().std()
-
-        # Bands
-        upper_band_2sigma = df_bands['vwap_fast'] + 2 * std_dev
-        lower_band_2sigma = df_bands['vwap_fast'] - 2 * std_dev
-        upper_band_3sigma = df_bands['vwap_fast'] + 3 * std_dev
-        lower_band_3sigma = df_bands['vwap_fast'] - 3 * std_dev
-
-        # Filter data AFTER Entry Time (if configured)
+        print(f"  [DEBUG] Total bars after {VWAP_BANDS_START_TIME}: {n_band_bars}")
         if VWAP_TIME_ENTRY:
-            entry_time = pd.to_datetime(VWAP_TIME_ENTRY).time()
-            df_after_entry = df_bands[df_bands['timestamp'].dt.time > entry_time].copy()
-            print(f"  [DEBUG] Bars after entry time {VWAP_TIME_ENTRY}: {len(df_after_entry)}")
+            print(f"  [DEBUG] Scanning bars after entry time {VWAP_TIME_ENTRY}")
         else:
-            df_after_entry = df_bands.copy()
-            print(f"  [DEBUG] No entry time filter - using all {len(df_after_entry)} bars")
+            print("  [DEBUG] No entry time filter - scanning all band bars")
 
-        if df_after_entry.empty:
-            print(f"  [INFO] No data after entry time for {date_str}")
-            continue
-
-        # Add bands to dataframe
-        df_after_entry['upper_2sigma'] = upper_band_2sigma[df_after_entry.index]
-        df_after_entry['lower_2sigma'] = lower_band_2sigma[df_after_entry.index]
-        df_after_entry['upper_3sigma'] = upper_band_3sigma[df_after_entry.index]
-        df_after_entry['lower_3sigma'] = lower_band_3sigma[df_after_entry.index]
-
-        # Check if 3σ is ever touched
-        upper_3sigma_touches = (df_after_entry['close'] > df_after_entry['upper_3sigma']).sum()
-        lower_3sigma_touches = (df_after_entry['close'] < df_after_entry['lower_3sigma']).sum()
-        print(f"  [DEBUG] 3σ touches - Upper: {upper_3sigma_touches}, Lower: {lower_3sigma_touches}")
-
-        # Estado de seguimiento
-        touched_upper_3sigma = False
-        touched_lower_3sigma = False
-        plotted_upper_dot = False
-        plotted_lower_dot = False
-
-        upper_3sigma_touch_price = None
-        lower_3sigma_touch_price = None
-        upper_3sigma_touch_time = None
-        lower_3sigma_touch_time = None
-
-        for idx, row in df_after_entry.iterrows():
-            close_price = row['close']
-
-            # BEARISH reversal: Close ABOVE upper 3σ, then cross down through upper 2σ
-            if close_price > row['upper_3sigma']:
-                if not touched_upper_3sigma:
-                    upper_3sigma_touch_price = close_price
-                    upper_3sigma_touch_time = row['timestamp']
-                touched_upper_3sigma = True
-                plotted_upper_dot = False
-
-            if touched_upper_3sigma and not plotted_upper_dot and close_price < row['upper_2sigma']:
-                # Blue dot detected!
-                price_move = upper_3sigma_touch_price - close_price  # How much it reversed
-                pct_move = (price_move / upper_3sigma_touch_price) * 100 if upper_3sigma_touch_price > 0 else 0
-
-                all_blue_dots.append({
-                    'date': date_str,
-                    'signal_type': 'BEARISH',
-                    'signal_time': row['timestamp'],
-                    'signal_price': close_price,
-                    'extreme_touch_price': upper_3sigma_touch_price,
-                    'extreme_touch_time': upper_3sigma_touch_time,
-                    'price_movement': price_move,
-                    'pct_movement': pct_move,
-                    'vwap_fast': row['vwap_fast'],
-                    'band_3sigma': row['upper_3sigma'],
-                    'band_2sigma': row['upper_2sigma']
-                })
-
-                print(f"  [BLUE DOT BEARISH] {row['timestamp'].time()} - ${close_price:.2f} (reversed {price_move:.2f} pts / {pct_move:.1f}%)")
-                plotted_upper_dot = True
-
-            # BULLISH reversal: Close BELOW lower 3σ, then cross up through lower 2σ
-            if close_price < row['lower_3sigma']:
-                if not touched_lower_3sigma:
-                    lower_3sigma_touch_price = close_price
-                    lower_3sigma_touch_time = row['timestamp']
-                touched_lower_3sigma = True
-                plotted_lower_dot = False
-
-            if touched_lower_3sigma and not plotted_lower_dot and close_price > row['lower_2sigma']:
-                # Blue dot detected!
-                price_move = close_price - lower_3sigma_touch_price  # How much it reversed
-                pct_move = (price_move / lower_3sigma_touch_price) * 100 if lower_3sigma_touch_price > 0 else 0
-
-                all_blue_dots.append({
-                    'date': date_str,
-                    'signal_type': 'BULLISH',
-                    'signal_time': row['timestamp'],
-                    'signal_price': close_price,
-                    'extreme_touch_price': lower_3sigma_touch_price,
-                    'extreme_touch_time': lower_3sigma_touch_time,
-                    'price_movement': price_move,
-                    'pct_movement': pct_move,
-                    'vwap_fast': row['vwap_fast'],
-                    'band_3sigma': row['lower_3sigma'],
-                    'band_2sigma': row['lower_2sigma']
-                })
-
-                print(f"  [BLUE DOT BULLISH] {row['timestamp'].time()} - ${close_price:.2f} (reversed {price_move:.2f} pts / {pct_move:.1f}%)")
-                plotted_lower_dot = True
+        df_events = detect_band_reversals(df, bands, after_time=VWAP_TIME_ENTRY)
+        for event in df_events.itertuples(index=False):
+            print(f"  [BLUE DOT {event.signal_type}] {event.signal_time.time()} - ${event.signal_price:.2f} "
+                  f"(reversed {event.price_movement:.2f} pts / {event.pct_movement:.1f}%)")
+        if not df_events.empty:
+            all_blue_dots.append(df_events.drop(columns='signal_bar'))
 
     except Exception as e:
         print(f"  [ERROR] Failed to analyze {date_str}: {e}")
@@ -220,13 +103,11 @@ print()
 # ============================================================================
 # STEP 3: SAVE RESULTS AND GENERATE STATISTICS
 # ============================================================================
-if len(all_blue_dots) == 0:
+df_blue_dots = pd.concat(all_blue_dots, ignore_index=True) if all_blue_dots else pd.DataFrame()
+if len(df_blue_dots) == 0:
     print("[WARN] No blue dot signals detected in any date")
     sys.exit(0)
 
-# Convert to DataFrame
-df_blue_dots = pd.DataFrame(all_blue_dots)
-
 # Save to CSV
 output_file = OUTPUTS_DIR / "band_reversal_analysis.csv"
 df_blue_dots.to_csv(output_file, index=False, sep=';', decimal=',')
@@ -0,0 +1,200 @@
+"""
+Caché persistente de barras OHLC en outputs/cache/bars/
+Cada entrada se identifica por la huella del fichero de ticks de origen
+(ruta, tamaño, mtime) y el timeframe: si el fichero cambia, la clave cambia
+y las barras se reconstruyen. La caché está acotada a BAR_CACHE_MAX_MB y
+elimina primero las entradas usadas hace más tiempo.
+
+Uso:
+    python bar_cache.py            # Muestra el contenido de la caché
+    python bar_cache.py --clear    # Elimina todas las entradas
+"""
+
+import os
+import sys
+import hashlib
+import pandas as pd
+from pathlib import Path
+from typing import Optional
+
+from config import BAR_CACHE_DIR, BAR_CACHE_MAX_MB
+from tick_store import tick_source_path, store_path_for
+
+
+# =============================================================================
+# CLAVES
+# =============================================================================
+
+def source_path_for(date_str: str) -> Optional[Path]:
+    """Fichero de ticks de origen de un día (CSV original o comprimido, o el .npy si no hay ninguno)"""
+    for path in (tick_source_path(date_str), store_path_for(date_str)):
+        if path is not None and path.exists():
+            return path
+    return None
+
+
+def source_fingerprint(path: Path) -> str:
+    """Huella de un fichero de origen: ruta absoluta + tamaño + mtime (ns)"""
+    st = path.stat()
+    return f"{path.resolve()}|{st.st_size}|{st.st_mtime_ns}"
+
+
+def cache_key(date_str: str, timeframe: str, variant: str = '') -> Optional[str]:
+    """
+    Clave de caché para (día, timeframe) o None si no existe el fichero de origen.
+    variant distingue barras del mismo timeframe con distintas columnas (p.ej. 'orderflow')
+    """
+    source = source_path_for(date_str)
+    if source is None:
+        return None
+    raw = f"{source_fingerprint(source)}|{timeframe}|{variant}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def _entry_prefix(date_str: str, timeframe: str) -> str:
+    return f"bars_{date_str}_{timeframe}_"
+
+
+def cache_path_for(date_str: str, timeframe: str, variant: str = '') -> Optional[Path]:
+    """Ruta de la entrada de caché vigente para (día, timeframe, variante)"""
+    key = cache_key(date_str, timeframe, variant)
+    if key is None:
+        return None
+    return BAR_CACHE_DIR / f"{_entry_prefix(date_str, timeframe)}{key}.pkl"
+
+
+# =============================================================================
+# LECTURA / ESCRITURA
+# =============================================================================
+
+def load_cached_bars(date_str: str, timeframe: str = '1min', variant: str = '') -> Optional[pd.DataFrame]:
+    """
+    Devuelve las barras cacheadas de (día, timeframe) o None si no hay entrada vigente
+    """
+    path = cache_path_for(date_str, timeframe, variant)
+    if path is None or not path.exists():
+        return None
+
+    try:
+        df = pd.read_pickle(path)
+    except Exception as e:
+        print(f"[WARNING] Entrada de caché corrupta {path.name}: {e}")
+        path.unlink(missing_ok=True)
+        return None
+
+    # Marcar como usada recientemente (política LRU por mtime)
+    os.utime(path)
+    return df
+
+
+def save_cached_bars(date_str: str, timeframe: str, df: pd.DataFrame,
+                     variant: str = '') -> Optional[Path]:
+    """
+    Guarda barras en la caché, elimina entradas obsoletas del mismo (día, timeframe)
+    y aplica el límite de tamaño
+
+    Returns:
+        Ruta de la entrada creada o None si no existe el fichero de origen
+    """
+    path = cache_path_for(date_str, timeframe, variant)
+    if path is None:
+        return None
+
+    BAR_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Entradas de versiones anteriores del fichero de origen
+    for old in BAR_CACHE_DIR.glob(f"{_entry_prefix(date_str, timeframe)}*.pkl"):
+        if old != path:
+            old.unlink(missing_ok=True)
+
+    tmp_path = path.with_name(path.name + '.tmp')
+    df.to_pickle(tmp_path)
+    tmp_path.replace(path)
+
+    evict()
+    return path
+
+
+def get_bars(date_str: str, timeframe: str, builder, variant: str = '') -> Optional[pd.DataFrame]:
+    """
+    Devuelve las barras de (día, timeframe) desde la caché o las construye con builder()
+
+    Args:
+        date_str: Fecha en formato YYYYMMDD
+        timeframe: Timeframe de las barras (ej: '1min')
+        builder: Función sin argumentos que devuelve el DataFrame de barras (o None)
+        variant: Variante de columnas de las barras (ver cache_key)
+    """
+    df = load_cached_bars(date_str, timeframe, variant)
+    if df is not None:
+        return df
+
+    df = builder()
+    if df is not None:
+        save_cached_bars(date_str, timeframe, df, variant)
+    return df
+
+
+# =============================================================================
+# INVALIDACIÓN Y EVICCIÓN
+# =============================================================================
+
+def invalidate(date_str: Optional[str] = None, timeframe: Optional[str] = None) -> int:
+    """
+    Elimina entradas de la caché
+
+    Args:
+        date_str: Solo este día (None = todos)
+        timeframe: Solo este timeframe (None = todos)
+
+    Returns:
+        Número de entradas eliminadas
+    """
+    if not BAR_CACHE_DIR.exists():
+        return 0
+
+    pattern = f"bars_{date_str or '*'}_{timeframe or '*'}_*.pkl"
+    removed = 0
+    for path in BAR_CACHE_DIR.glob(pattern):
+        path.unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+
+def evict(max_mb: float = BAR_CACHE_MAX_MB, cache_dir: Path = BAR_CACHE_DIR,
+          pattern: str = "bars_*.pkl") -> int:
+    """
+    Elimina las entradas usadas hace más tiempo hasta que la caché ocupe <= max_mb
+    (cache_dir/pattern permiten aplicar la misma política a otras cachés, ver feature_store.py)
+
+    Returns:
+        Número de entradas eliminadas
+    """
+    if not cache_dir.exists():
+        return 0
+
+    entries = [(p, p.stat()) for p in cache_dir.glob(pattern)]
+    total = sum(st.st_size for _, st in entries)
+    max_bytes = max_mb * 1024 * 1024
+
+    removed = 0
+    for path, st in sorted(entries, key=lambda e: e[1].st_mtime):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= st.st_size
+        removed += 1
+    return removed
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ('--clear', '-c'):
+        print(f"[OK] Eliminadas {invalidate()} entradas de {BAR_CACHE_DIR}")
+        sys.exit(0)
+
+    entries = sorted(BAR_CACHE_DIR.glob("bars_*.pkl")) if BAR_CACHE_DIR.exists() else []
+    total = sum(p.stat().st_size for p in entries)
+    print(f"Caché de barras: {BAR_CACHE_DIR}")
+    print(f"Entradas: {len(entries)} ({total / 1024 / 1024:.1f} MB de {BAR_CACHE_MAX_MB} MB)")
+    for p in entries:
+        print(f"  {p.name} ({p.stat().st_size / 1024:.0f} KB)")
@@ -0,0 +1,88 @@
+"""
+Benchmark: lectura de ficheros de ticks comprimidos
+Comprime cada CSV de data/ a .csv.zst, .csv.gz y .parquet (en un directorio temporal),
+mide el tiempo de lectura hasta el array TICK_DTYPE frente al CSV sin comprimir y
+verifica que los ticks leídos son idénticos. El throughput se expresa en MB/s del
+CSV original (datos útiles por segundo) y en millones de ticks/s.
+
+Uso:
+    python benchmarks/bench_compressed_ticks.py
+"""
+
+import sys
+import time
+import tempfile
+import numpy as np
+from pathlib import Path
+
+# Add parent directory to path to import config
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import DATA_DIR
+import tick_store
+from tick_store import archive_source, read_tick_source_array
+
+REPEATS = 5
+FORMATS = ('zst', 'gz', 'parquet')
+
+
+def best_time(func, *args):
+    """Mejor tiempo de REPEATS ejecuciones (segundos) y último resultado"""
+    best = float('inf')
+    result = None
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    csv_files = sorted(DATA_DIR.glob("time_and_sales_nq_*.csv"))
+    if not csv_files:
+        print(f"[ERROR] No hay ficheros en {DATA_DIR}")
+        return
+
+    print("="*100)
+    print("BENCHMARK: LECTURA DE TICKS COMPRIMIDOS")
+    print("="*100)
+    print(f"pyarrow disponible: {tick_store.pa is not None}")
+    print(f"{'Fichero':<32} {'Formato':<8} {'Tamaño':>10} {'Ratio':>7} {'Lectura':>10} "
+          f"{'MB/s':>8} {'Mticks/s':>9} {'vs CSV':>8}")
+    print("-"*100)
+
+    totals = {fmt: [0, 0.0] for fmt in ('csv',) + FORMATS}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        for csv_file in csv_files:
+            csv_copy = tmp_dir / csv_file.name
+            csv_copy.write_bytes(csv_file.read_bytes())
+            csv_mb = csv_copy.stat().st_size / 1024 / 1024
+
+            paths = {'csv': csv_copy}
+            for fmt in FORMATS:
+                paths[fmt] = archive_source(csv_copy, fmt=fmt)
+
+            t_csv, reference = best_time(read_tick_source_array, csv_copy)
+            for fmt, path in paths.items():
+                t_read, ticks = best_time(read_tick_source_array, path) if fmt != 'csv' else (t_csv, reference)
+                assert np.array_equal(ticks, reference), f"{path.name}: ticks distintos del CSV"
+
+                size = path.stat().st_size
+                totals[fmt][0] += size
+                totals[fmt][1] += t_read
+                print(f"{csv_file.name:<32} {fmt:<8} {size / 1024:>8.0f}KB "
+                      f"{csv_copy.stat().st_size / size:>6.1f}x {t_read * 1000:>8.1f}ms "
+                      f"{csv_mb / t_read:>8.1f} {len(ticks) / t_read / 1e6:>9.2f} {t_csv / t_read:>7.2f}x")
+            print("-"*100)
+
+    csv_size, csv_time = totals['csv']
+    print("TOTAL")
+    for fmt, (size, t_read) in totals.items():
+        print(f"  {fmt:<8} {size / 1024 / 1024:>8.1f}MB ({csv_size / size:>5.1f}x)  "
+              f"{t_read * 1000:>8.1f}ms  {csv_time / t_read:>6.2f}x vs CSV")
+    print("[OK] Ticks idénticos a la lectura del CSV sin comprimir")
+
+
+if __name__ == "__main__":
+    main()
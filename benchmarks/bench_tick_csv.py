@@ -0,0 +1,97 @@
+"""
+Benchmark: lectura de CSV de ticks (sep=';', decimal=',')
+Compara la lectura original (read_csv + pd.to_datetime con inferencia) con
+tick_store.read_tick_csv (dtypes fijos + formato de timestamp detectado una vez)
+sobre todos los ficheros de data/, y verifica que el DataFrame resultante es idéntico,
+también el que devuelve find_fractals.load_nq_tick_data (que lee del tick store si existe).
+
+Uso:
+    python benchmarks/bench_tick_csv.py
+"""
+
+import io
+import sys
+import time
+import contextlib
+import pandas as pd
+from pathlib import Path
+
+# Add parent directory to path to import config
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import DATA_DIR
+import tick_store
+from tick_store import normalize_tick_columns, read_tick_csv, _read_tick_csv_pandas
+from find_fractals import load_nq_tick_data
+
+REPEATS = 5
+
+
+def read_tick_csv_legacy(csv_path):
+    """Lectura previa de find_fractals.load_nq_tick_data"""
+    df = pd.read_csv(csv_path, sep=';', decimal=',')
+    normalize_tick_columns(df)
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    return df
+
+
+def read_tick_csv_pandas_engine(csv_path):
+    """Ruta rápida forzando el motor C de pandas (sin pyarrow)"""
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        header = f.readline().strip().split(';')
+        sample_ts = f.readline().split(';')[0]
+    return normalize_tick_columns(_read_tick_csv_pandas(csv_path, header, sample_ts))
+
+
+def best_time(func, *args):
+    """Mejor tiempo de REPEATS ejecuciones (segundos) y último resultado"""
+    best = float('inf')
+    result = None
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    csv_files = sorted(DATA_DIR.glob("time_and_sales_nq_*.csv"))
+    if not csv_files:
+        print(f"[ERROR] No hay ficheros en {DATA_DIR}")
+        return
+
+    print("="*90)
+    print("BENCHMARK: LECTURA CSV DE TICKS")
+    print("="*90)
+    print(f"pyarrow disponible: {tick_store.pa_csv is not None}")
+    print(f"{'Fichero':<36} {'Ticks':>9} {'Legacy':>10} {'Pandas C':>10} {'Fast':>10} {'Speedup':>9}")
+    print("-"*90)
+
+    total_legacy = 0.0
+    total_fast = 0.0
+    for csv_file in csv_files:
+        t_legacy, df_legacy = best_time(read_tick_csv_legacy, csv_file)
+        t_pandas, df_pandas = best_time(read_tick_csv_pandas_engine, csv_file)
+        t_fast, df_fast = best_time(read_tick_csv, csv_file)
+
+        pd.testing.assert_frame_equal(df_fast, df_legacy)
+        pd.testing.assert_frame_equal(df_pandas, df_legacy)
+
+        # Lo que reciben los scripts: tick store (.npy) si existe, CSV en caso contrario
+        with contextlib.redirect_stdout(io.StringIO()):
+            df_loaded = load_nq_tick_data(csv_file.stem.rsplit('_', 1)[-1])
+        pd.testing.assert_frame_equal(df_loaded, df_legacy)
+
+        total_legacy += t_legacy
+        total_fast += t_fast
+        print(f"{csv_file.name:<36} {len(df_legacy):>9,} {t_legacy*1000:>8.1f}ms "
+              f"{t_pandas*1000:>8.1f}ms {t_fast*1000:>8.1f}ms {t_legacy/t_fast:>8.2f}x")
+
+    print("-"*90)
+    print(f"{'TOTAL':<46} {total_legacy*1000:>8.1f}ms {'':>10} {total_fast*1000:>8.1f}ms "
+          f"{total_legacy/total_fast:>8.2f}x")
+    print("[OK] DataFrames idénticos a la lectura original (también load_nq_tick_data)")
+
+
+if __name__ == "__main__":
+    main()
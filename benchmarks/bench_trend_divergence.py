@@ -0,0 +1,98 @@
+"""
+Benchmark: detección de orange dots (Trend Divergence)
+Para cada día de data/ compara una implementación de referencia barra a barra (iterrows)
+con find_trend_divergence_dots (vectorizado) y TrendDivergenceDetector (streaming), sobre
+las columnas del almacén de indicadores, y verifica que los tres marcan las mismas barras.
+
+Uso:
+    python benchmarks/bench_trend_divergence.py
+"""
+
+import sys
+import time
+import numpy as np
+from pathlib import Path
+
+# Add parent directory to path to import config
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_catalog import catalog_dates
+from feature_store import attach_features
+from find_fractals import load_date_range
+from find_trend_divergence import find_trend_divergence_dots, TrendDivergenceDetector
+
+REPEATS = 3
+
+
+def dots_iterrows(df):
+    """Referencia: primer green dot tras cada cruce de close con vwap_fast, fila a fila"""
+    dots = []
+    side = 0
+    armed = False
+    for idx, row in df.iterrows():
+        if row['close'] > row['vwap_fast']:
+            new_side = 1
+        elif row['close'] < row['vwap_fast']:
+            new_side = -1
+        else:
+            new_side = 0
+        if new_side != 0:
+            if side != 0 and new_side != side:
+                armed = True
+            side = new_side
+        if armed and row['price_ejection']:
+            dots.append(idx)
+            armed = False
+    return dots
+
+
+def best_time(func, *args, repeats=REPEATS):
+    """Mejor tiempo de `repeats` ejecuciones (segundos) y último resultado"""
+    best = float('inf')
+    result = None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    dates = catalog_dates()
+    if not dates:
+        print("[ERROR] No hay datos catalogados")
+        return
+
+    days = []
+    for date_str in dates:
+        df = load_date_range(date_str, date_str)
+        if df is not None:
+            days.append((date_str, attach_features(df, ['vwap_fast', 'price_ejection'])))
+
+    print("="*90)
+    print(f"BENCHMARK: ORANGE DOTS ({len(days)} días)")
+    print("="*90)
+    print(f"{'Día':<10} {'Barras':>8} {'Dots':>6} {'iterrows':>11} {'streaming':>11} {'vectorizado':>12} {'Mejora':>8}")
+    print("-"*90)
+
+    totals = np.zeros(3)
+    for date_str, df in days:
+        t_ref, reference = best_time(dots_iterrows, df, repeats=1)
+        t_stream, streamed = best_time(lambda d: TrendDivergenceDetector().replay(d), df)
+        t_vec, dots = best_time(find_trend_divergence_dots, df)
+
+        assert list(dots.index) == reference, f"{date_str}: vectorizado distinto de la referencia"
+        assert list(df.index[streamed]) == reference, f"{date_str}: streaming distinto de la referencia"
+
+        totals += (t_ref, t_stream, t_vec)
+        print(f"{date_str:<10} {len(df):>8,} {len(dots):>6} {t_ref*1000:>9.1f}ms {t_stream*1000:>9.1f}ms "
+              f"{t_vec*1000:>10.2f}ms {t_ref/t_vec:>7.0f}x")
+
+    print("-"*90)
+    print(f"{'TOTAL':<10} {sum(len(df) for _, df in days):>8,} {'':>6} {totals[0]*1000:>9.1f}ms "
+          f"{totals[1]*1000:>9.1f}ms {totals[2]*1000:>10.2f}ms {totals[0]/totals[2]:>7.0f}x")
+    print("[OK] Vectorizado, streaming y referencia marcan las mismas barras")
+
+
+if __name__ == "__main__":
+    main()
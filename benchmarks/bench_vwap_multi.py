@@ -0,0 +1,95 @@
+"""
+Benchmark: VWAP de varios periodos (barridos de VWAP_FAST / VWAP_SLOW)
+Compara N llamadas a calculate_vwap (la versión previa copiaba el DataFrame en cada
+llamada) con una sola pasada de calculate_vwap_multi sobre las barras de data/ y
+sobre una serie sintética larga, y verifica que los valores coinciden.
+
+Uso:
+    python benchmarks/bench_vwap_multi.py
+"""
+
+import sys
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# Add parent directory to path to import config
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from calculate_vwap import calculate_vwap, calculate_vwap_multi
+from data_catalog import catalog_dates
+from find_fractals import load_date_range
+
+REPEATS = 3
+PERIODS = list(range(20, 420, 20))   # 20 periodos, como un barrido de VWAP_FAST/VWAP_SLOW
+SYNTHETIC_BARS = 500_000
+
+
+def calculate_vwap_legacy(df, period):
+    """calculate_vwap previo (df.copy() + columnas auxiliares)"""
+    df = df.copy()
+    df['typical_price'] = (df['high'] + df['low'] + df['close']) / 3
+    df['tp_volume'] = df['typical_price'] * df['volume']
+    df['vwap'] = df['tp_volume'].rolling(window=period).sum() / df['volume'].rolling(window=period).sum()
+    return df['vwap']
+
+
+def best_time(func, *args):
+    """Mejor tiempo de REPEATS ejecuciones (segundos) y último resultado"""
+    best = float('inf')
+    result = None
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def run_case(name, df):
+    def per_period(func):
+        return np.vstack([func(df, period).to_numpy() for period in PERIODS])
+
+    t_legacy, reference = best_time(per_period, calculate_vwap_legacy)
+    t_single, single = best_time(per_period, calculate_vwap)
+    t_multi, multi = best_time(calculate_vwap_multi, df, PERIODS)
+
+    assert np.array_equal(single, reference, equal_nan=True), f"{name}: calculate_vwap cambió"
+    assert np.array_equal(np.isnan(multi), np.isnan(reference)), f"{name}: NaN distintos"
+    max_err = np.nanmax(np.abs(multi - reference))
+
+    print(f"{name:<22} {len(df):>9,} {t_legacy*1000:>10.1f}ms {t_single*1000:>10.1f}ms "
+          f"{t_multi*1000:>10.1f}ms {t_legacy/t_multi:>7.1f}x   {max_err:.1e}")
+    return max_err
+
+
+def main():
+    dates = catalog_dates()
+    if not dates:
+        print("[ERROR] No hay datos catalogados")
+        return
+
+    df_real = load_date_range(dates[0], dates[-1])
+
+    rng = np.random.default_rng(0)
+    close = 25000 + np.cumsum(rng.normal(0, 1.0, SYNTHETIC_BARS))
+    df_synth = pd.DataFrame({
+        'high': close + rng.random(SYNTHETIC_BARS), 'low': close - rng.random(SYNTHETIC_BARS),
+        'close': close, 'volume': rng.integers(1, 500, SYNTHETIC_BARS),
+    })
+
+    print("="*90)
+    print(f"BENCHMARK: VWAP MULTI-PERIODO ({len(PERIODS)} periodos: {PERIODS[0]}..{PERIODS[-1]})")
+    print("="*90)
+    print(f"{'Datos':<22} {'Barras':>9} {'previo xN':>12} {'actual xN':>12} {'multi':>12} {'Mejora':>8}   Error")
+    print("-"*90)
+    max_err = max(
+        run_case(f"data/ ({len(dates)} días)", df_real),
+        run_case("sintético", df_synth),
+    )
+    print("-"*90)
+    print(f"[OK] Error absoluto máximo frente a calculate_vwap: {max_err:.1e} puntos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark: pendiente del VWAP en ventana móvil
+Compara los cálculos previos con calculate_vwap_slope.rolling_slope:
+    - regresión: rolling(window).apply(np.polyfit) de plot_day / find_rectangles*
+    - endpoint:  calculate_vwap_slope_at_bar barra a barra (df.index.get_loc) de strat_vwap_momentum
+sobre las barras de data/ y sobre una serie sintética larga, y verifica que los valores coinciden.
+
+Uso:
+    python benchmarks/bench_vwap_slope.py
+"""
+
+import sys
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# Add parent directory to path to import config
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import VWAP_FAST, VWAP_SLOPE_DEGREE_WINDOW
+from calculate_vwap import calculate_vwap
+from calculate_vwap_slope import rolling_slope
+from data_catalog import catalog_dates
+from find_fractals import load_date_range
+
+REPEATS = 3
+WINDOW = VWAP_SLOPE_DEGREE_WINDOW
+SYNTHETIC_BARS = 50_000
+
+
+def slope_polyfit_legacy(vwap):
+    """rolling().apply(np.polyfit) previo (con signo)"""
+    return vwap.rolling(window=WINDOW).apply(
+        lambda x: np.polyfit(np.arange(len(x)), x, 1)[0] if len(x) == WINDOW else np.nan,
+        raw=False
+    ).to_numpy()
+
+
+def slope_endpoint_legacy(df):
+    """calculate_vwap_slope_at_bar de strat_vwap_momentum aplicado a cada barra"""
+    def at_bar(bar_idx):
+        bar_position = df.index.get_loc(bar_idx)
+        if bar_position < WINDOW - 1:
+            return 0.0
+        vwap_window = df.iloc[bar_position - WINDOW + 1:bar_position + 1]['vwap_fast'].values
+        if pd.isna(vwap_window).any():
+            return 0.0
+        return (vwap_window[-1] - vwap_window[0]) / (WINDOW - 1)
+    return np.array([at_bar(idx) for idx in df.index])
+
+
+def best_time(func, *args, repeats=REPEATS):
+    """Mejor tiempo de `repeats` ejecuciones (segundos) y último resultado"""
+    best = float('inf')
+    result = None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def run_case(name, df):
+    vwap = df['vwap_fast']
+
+    t_poly, ref_reg = best_time(slope_polyfit_legacy, vwap)
+    t_reg, new_reg = best_time(rolling_slope, vwap, WINDOW)
+    assert np.array_equal(np.isnan(ref_reg), np.isnan(new_reg)), f"{name}: NaN distintos"
+    err_reg = np.nanmax(np.abs(ref_reg - new_reg))
+
+    t_loop, ref_end = best_time(slope_endpoint_legacy, df, repeats=1)
+    t_end, new_end = best_time(lambda v: np.nan_to_num(rolling_slope(v, WINDOW, method='endpoint')), vwap)
+    err_end = np.max(np.abs(ref_end - new_end))
+
+    print(f"{name:<28} {len(df):>8,}  regresión: {t_poly*1000:>9.1f}ms -> {t_reg*1000:>6.2f}ms "
+          f"({t_poly/t_reg:>7.0f}x, err {err_reg:.1e})")
+    print(f"{'':<28} {'':>8}  endpoint:  {t_loop*1000:>9.1f}ms -> {t_end*1000:>6.2f}ms "
+          f"({t_loop/t_end:>7.0f}x, err {err_end:.1e})")
+    return max(err_reg, err_end)
+
+
+def main():
+    dates = catalog_dates()
+    if not dates:
+        print("[ERROR] No hay datos catalogados")
+        return
+
+    print("="*100)
+    print(f"BENCHMARK: VWAP SLOPE (ventana {WINDOW}, VWAP_FAST {VWAP_FAST})")
+    print("="*100)
+
+    df_real = load_date_range(dates[0], dates[-1])
+    df_real['vwap_fast'] = calculate_vwap(df_real, period=VWAP_FAST)
+
+    rng = np.random.default_rng(0)
+    close = 25000 + np.cumsum(rng.normal(0, 1.0, SYNTHETIC_BARS))
+    df_synth = pd.DataFrame({
+        'high': close + 1.0, 'low': close - 1.0, 'close': close,
+        'volume': rng.integers(1, 500, SYNTHETIC_BARS),
+    })
+    df_synth['vwap_fast'] = calculate_vwap(df_synth, period=VWAP_FAST)
+
+    print("-"*100)
+    max_err = max(
+        run_case(f"data/ ({len(dates)} días)", df_real),
+        run_case("sintético", df_synth),
+    )
+    print("-"*100)
+    print(f"[OK] Error absoluto máximo frente al cálculo previo: {max_err:.1e} puntos/barra")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark: detección de fractales ZigZag
+Compara el bucle previo de detect_fractals (df.iterrows() + UnifiedZigzagDetector.add_candle)
+con el kernel sobre arrays find_fractals.zigzag_pivots, sobre las barras de data/ (día completo
+y rango) y sobre una serie sintética de varios meses, y verifica que los puntos de giro coinciden.
+Mide también zigzag_pivots_multi (K umbrales en un recorrido) frente a K llamadas a zigzag_pivots.
+
+Uso:
+    python benchmarks/bench_zigzag.py
+"""
+
+import sys
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# Add parent directory to path to import config
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import MIN_CHANGE_PCT_MINOR, MIN_CHANGE_PCT_MAJOR
+from data_catalog import catalog_dates
+from find_fractals import (
+    UnifiedZigzagDetector, ZigzagDirection, load_day_bars, load_date_range, zigzag_pivots, zigzag_pivots_multi
+)
+
+REPEATS = 3
+SYNTHETIC_DAYS = 60
+BARS_PER_DAY = 1380
+LEVELS = [0.10, 0.15, 0.20, 0.30, 0.50, 0.75, 1.00, 1.50]   # Umbrales (%) del barrido multinivel
+
+
+def zigzag_legacy(df, min_change_pct):
+    """Bucle previo de detect_fractals: una llamada a add_candle por fila de iterrows"""
+    detector = UnifiedZigzagDetector(min_change_pct=min_change_pct)
+    for idx, row in df.iterrows():
+        detector.add_candle(high=row['high'], low=row['low'], index=idx, timestamp=row['timestamp'])
+    points = detector.get_zigzag_points()
+    return (df.index.get_indexer([p.index for p in points]),
+            np.array([p.price for p in points], dtype=np.float64),
+            np.array([1 if p.direction == ZigzagDirection.UP else -1 for p in points], dtype=np.int8))
+
+
+def best_time(func, *args, repeats=REPEATS):
+    """Mejor tiempo de `repeats` ejecuciones (segundos) y último resultado"""
+    best = float('inf')
+    result = None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def run_case(name, df):
+    speedups = []
+    for pct in (MIN_CHANGE_PCT_MINOR, MIN_CHANGE_PCT_MAJOR):
+        t_legacy, reference = best_time(zigzag_legacy, df, pct, repeats=1)
+        t_kernel, pivots = best_time(zigzag_pivots, df['high'], df['low'], pct)
+        for ref, new, label in zip(reference, pivots, ('posiciones', 'precios', 'direcciones')):
+            assert np.array_equal(ref, new), f"{name} ({pct}%): {label} distintas"
+        speedups.append(t_legacy / t_kernel)
+        print(f"{name:<28} {len(df):>9,} {pct:>6.2f}% {len(pivots[0]):>7,} "
+              f"{t_legacy*1000:>11.1f} {t_kernel*1000:>10.2f} {t_legacy/t_kernel:>8.0f}x")
+    return min(speedups)
+
+
+def run_multi_case(name, df):
+    """
+    Coste de zigzag_pivots_multi con K umbrales frente a un solo umbral (crecimiento sub-lineal)
+    y frente a K llamadas a zigzag_pivots
+    """
+    t_one, _ = best_time(zigzag_pivots_multi, df['high'], df['low'], LEVELS[:1])
+    for k in (1, 2, 4, len(LEVELS)):
+        levels = LEVELS[:k]
+        t_single, reference = best_time(lambda: [zigzag_pivots(df['high'], df['low'], pct) for pct in levels])
+        t_multi, pivots = best_time(zigzag_pivots_multi, df['high'], df['low'], levels)
+        for ref, new in zip(reference, pivots):
+            assert all(np.array_equal(a, b) for a, b in zip(ref, new)), f"{name} (K={k}): giros distintos"
+        print(f"{name:<28} {len(df):>9,} {k:>4} {t_single*1000:>14.2f} {t_multi*1000:>12.2f} "
+              f"{t_multi/t_one:>10.2f}x")
+
+
+def main():
+    dates = catalog_dates()
+    if not dates:
+        print("[ERROR] No hay datos catalogados")
+        return
+
+    print("="*90)
+    print("BENCHMARK: ZIGZAG (iterrows + add_candle vs zigzag_pivots)")
+    print("="*90)
+
+    df_day = load_day_bars(dates[-1])
+    df_range = load_date_range(dates[0], dates[-1])
+
+    # Varios meses de barras de 1 minuto: paseo aleatorio con la volatilidad típica del NQ
+    rng = np.random.default_rng(0)
+    n = SYNTHETIC_DAYS * BARS_PER_DAY
+    close = np.round((25000 + np.cumsum(rng.normal(0, 6.0, n))) * 4) / 4
+    wick = np.round(np.abs(rng.normal(0, 4.0, (2, n))) * 4) / 4
+    df_synth = pd.DataFrame({
+        'timestamp': pd.date_range('2025-01-01', periods=n, freq='1min'),
+        'high': close + wick[0], 'low': close - wick[1], 'close': close,
+    })
+
+    print(f"{'Caso':<28} {'Barras':>9} {'Umbral':>7} {'Giros':>7} {'iterrows(ms)':>11} "
+          f"{'kernel(ms)':>10} {'Mejora':>9}")
+    print("-"*90)
+    min_speedup = min(
+        run_case(f"día {dates[-1]}", df_day),
+        run_case(f"data/ ({len(dates)} días)", df_range),
+        run_case(f"sintético ({SYNTHETIC_DAYS} días)", df_synth),
+    )
+    print("-"*90)
+    print(f"[OK] Puntos de giro idénticos al detector; mejora mínima {min_speedup:.0f}x")
+
+    print(f"\n{'Caso':<28} {'Barras':>9} {'K':>4} {'K pasadas(ms)':>14} {'1 pasada(ms)':>12} {'vs K=1':>11}")
+    print("-"*90)
+    run_multi_case(f"data/ ({len(dates)} días)", df_range)
+    run_multi_case(f"sintético ({SYNTHETIC_DAYS} días)", df_synth)
+    print("-"*90)
+    print(f"[OK] Umbrales {', '.join(f'{pct}%' for pct in LEVELS)}: mismos giros en una sola pasada")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,82 @@
 import pandas as pd
 import numpy as np
 
-def calculate_atr(df, period=14):
+ATR_MODES = ('sma', 'wilder', 'ema')
+
+
+def true_range(high, low, close) -> np.ndarray:
+    """
+    True Range on raw arrays: TR = Max(H-L, |H-Cp|, |L-Cp|).
+    The first bar has no previous close, so its TR is H-L.
+
+    Args:
+        high, low, close: arrays (or Series) of the same length
+
+    Returns:
+        np.ndarray float64 with the TR of each bar
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+
+    prev_close = np.empty_like(close)
+    prev_close[:1] = np.nan
+    prev_close[1:] = close[:-1]
+
+    # fmax ignores the missing previous close, like max(axis=1) on the three columns
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def rolling_atr(high, low, close, period=14, mode='sma') -> np.ndarray:
+    """
+    ATR kernel on raw arrays.
+
+    Modes:
+        'sma':    simple moving average of TR (same values as the previous calculate_atr)
+        'wilder': Wilder's smoothing, ATR = ATR_prev + (TR - ATR_prev) / period
+        'ema':    exponential smoothing with alpha = 2 / (period + 1)
+    'wilder' and 'ema' are seeded with the SMA of the first `period` TRs (TA-Lib convention).
+
+    Args:
+        high, low, close: arrays (or Series) of the same length
+        period: ATR period (default 14)
+        mode: one of ATR_MODES
+
+    Returns:
+        np.ndarray float64 (NaN until the first `period` bars are available)
+    """
+    if mode not in ATR_MODES:
+        raise ValueError(f"mode must be one of {ATR_MODES}, not '{mode}'")
+
+    tr = true_range(high, low, close)
+    sma = pd.Series(tr).rolling(window=period).mean().to_numpy()
+    if mode == 'sma':
+        return sma
+
+    valid = np.flatnonzero(~np.isnan(sma))
+    atr = np.full(len(tr), np.nan)
+    if len(valid) == 0:
+        return atr
+
+    # Recursive smoothing from the seed: ewm(adjust=False) gives y0 = seed, y = (1-alpha)*y_prev + alpha*TR
+    seed = valid[0]
+    alpha = 1.0 / period if mode == 'wilder' else 2.0 / (period + 1)
+    smoothed = np.concatenate(([sma[seed]], tr[seed + 1:]))
+    atr[seed:] = pd.Series(smoothed).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return atr
+
+
+def calculate_atr(df, period=14, mode='sma'):
     """
     Calculate Average True Range (ATR) for a DataFrame.
-    
+
     Args:
         df: DataFrame containing 'high', 'low', 'close' columns
         period: ATR period (default 14)
-        
+        mode: 'sma' (default, rolling mean as in the VIX example), 'wilder' or 'ema'
+
     Returns:
         pd.Series: ATR values
     """
-    high = df['high']
-    low = df['low']
-    close = df['close']
-    
-    # Calculate True Range (TR)
-    # TR = Max(H-L, |H-Cp|, |L-Cp|)
-    prev_close = close.shift(1)
-    
-    tr1 = high - low
-    tr2 = (high - prev_close).abs()
-    tr3 = (low - prev_close).abs()
-    
-    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-    
-    # Calculate ATR (Wilder's Smoothing usually, or SMA for simplicity)
-    # Here using SMA as per the VIX example which uses rolling mean
-    # "atr = tr.rolling(window=atr_period).mean()"
-    atr = tr.rolling(window=period).mean()
-    
-    return atr
+    atr = rolling_atr(df['high'], df['low'], df['close'], period=period, mode=mode)
+    return pd.Series(atr, index=df.index)
@@ -1,42 +1,184 @@
 """
 Cálculo del indicador VWAP (Volume Weighted Average Price)
+
+Dos fuentes para Σ(precio·volumen) de cada barra (source / VWAP_SOURCE):
+    'typical' -> precio típico (H+L+C)/3 · volumen de la barra (aproximación desde el OHLC)
+    'tick'    -> columna price_volume de las barras: Σ(precio·volumen) de sus trades, calculada
+                 en la misma pasada que la agregación de ticks (ver find_fractals._ohlcv_from_groups).
+                 Con volume (Σ volumen) da el VWAP exacto de los trades sin volver a los ticks.
 """
+from datetime import time as dt_time
+
+import numpy as np
 import pandas as pd
 
+from config import VWAP_SOURCE
+from tick_store import PRICE_VOLUME_COLUMN
+
+VWAP_SOURCES = ('typical', 'tick')
 
-def calculate_vwap(df, period=50):
+
+def bar_price_volume(df, source=VWAP_SOURCE) -> pd.Series:
     """
-    Calcula VWAP con ventana móvil (rolling VWAP)
+    Σ(precio·volumen) de cada barra según la fuente del VWAP
 
     Args:
-        df: DataFrame con columnas ['high', 'low', 'close', 'volume']
-        period: Periodo de la ventana móvil (default: 50)
+        df: DataFrame de barras (high/low/close/volume; price_volume con source='tick')
+        source: 'typical' o 'tick' (ver VWAP_SOURCES)
 
     Returns:
-        Series con valores de VWAP
+        Series con el mismo índice que df
     """
+    if source not in VWAP_SOURCES:
+        raise ValueError(f"source debe ser uno de {VWAP_SOURCES}, no '{source}'")
+    if source == 'tick':
+        if PRICE_VOLUME_COLUMN not in df.columns:
+            raise ValueError(f"source='tick' requiere la columna '{PRICE_VOLUME_COLUMN}' "
+                             f"(barras de aggregate_ticks_to_ohlc / load_day_bars)")
+        return df[PRICE_VOLUME_COLUMN]
+
+    # Precio típico (Typical Price) * volumen
+    typical_price = (df['high'] + df['low'] + df['close']) / 3
+    return typical_price * df['volume']
+
 
-    df = df.copy()
+def calculate_vwap(df, period=50, source=VWAP_SOURCE):
+    """
+    Calcula VWAP con ventana móvil (rolling VWAP)
 
-    # Calcular precio típico (Typical Price)
-    df['typical_price'] = (df['high'] + df['low'] + df['close']) / 3
+    Args:
+        df: DataFrame con columnas ['high', 'low', 'close', 'volume'] (+ 'price_volume' con source='tick')
+        period: Periodo de la ventana móvil (default: 50)
+        source: 'typical' (precio típico de la barra) o 'tick' (Σ precio·volumen de los trades)
 
-    # Calcular volumen * precio típico
-    df['tp_volume'] = df['typical_price'] * df['volume']
+    Returns:
+        Series con valores de VWAP
+    """
+    tp_volume = bar_price_volume(df, source)
 
-    # Calcular VWAP con ventana móvil
+    # Calcular VWAP con ventana móvil (sin copiar el DataFrame)
     # VWAP = Suma(Typical Price * Volume) / Suma(Volume)
-    df['vwap'] = (
-        df['tp_volume'].rolling(window=period).sum() /
+    vwap = (
+        tp_volume.rolling(window=period).sum() /
         df['volume'].rolling(window=period).sum()
     )
 
-    return df['vwap']
+    return vwap.rename('vwap')
+
+
+def calculate_vwap_multi(df, periods, source=VWAP_SOURCE) -> np.ndarray:
+    """
+    Calcula el VWAP móvil de varios periodos en una sola pasada (barridos de VWAP_FAST/VWAP_SLOW)
+
+    Una única suma acumulada de tp·volume y de volume sirve para todos los periodos:
+    VWAP_p[i] = (C[i] - C[i-p]) / (V[i] - V[i-p]). Para que la resta de acumulados
+    grandes no pierda precisión, tp se centra en su primer valor (VWAP = tp0 + Σ(tp-tp0)·v / Σv)
+    y el volumen entero se acumula en int64 (exacto). Difiere de calculate_vwap en ~1e-9 puntos como mucho.
+    Con source='tick' se centra price_volume en el primer cierre (Σ(p-p0)·v, múltiplos exactos del tick).
+
+    Args:
+        df: DataFrame con columnas ['high', 'low', 'close', 'volume'] (no se copia)
+        periods: Lista de periodos
+        source: 'typical' o 'tick' (ver VWAP_SOURCES)
+
+    Returns:
+        np.ndarray float64 de forma (len(periods), len(df)); fila j = VWAP de periods[j]
+        (NaN mientras la ventana no está completa o contiene NaN, como calculate_vwap)
+    """
+    periods = [int(p) for p in periods]
+    if any(p < 1 for p in periods):
+        raise ValueError(f"Los periodos deben ser >= 1: {periods}")
+
+    if source not in VWAP_SOURCES:
+        raise ValueError(f"source debe ser uno de {VWAP_SOURCES}, no '{source}'")
+
+    n = len(df)
+    if source == 'tick':
+        price = df['close'].to_numpy(dtype=np.float64)
+        price_volume = bar_price_volume(df, source).to_numpy(dtype=np.float64)
+        invalid = np.isnan(price_volume)
+    else:
+        price = (df['high'].to_numpy(dtype=np.float64) + df['low'].to_numpy(dtype=np.float64)
+                 + df['close'].to_numpy(dtype=np.float64)) / 3
+        invalid = np.isnan(price)
+    volume = df['volume'].to_numpy()
+
+    if volume.dtype.kind in 'iu':
+        volume = volume.astype(np.int64)
+    else:
+        volume = volume.astype(np.float64)
+        invalid |= np.isnan(volume)
+    invalid_any = invalid.any()
+
+    tp0 = price[~invalid][0] if not invalid.all() else 0.0
+    with np.errstate(invalid='ignore'):
+        if source == 'tick':
+            tp_volume = np.where(invalid, 0.0, price_volume - tp0 * volume)
+        else:
+            tp_volume = np.where(invalid, 0.0, (price - tp0) * volume)
+    if invalid_any:
+        volume = np.where(invalid, 0, volume)
+
+    # Acumulados con un 0 inicial: suma de la ventana (i-p, i] = C[i+1] - C[i+1-p]
+    cum_tpv = np.concatenate(([0.0], np.cumsum(tp_volume)))
+    cum_vol = np.concatenate(([0], np.cumsum(volume)))
+    cum_bad = np.concatenate(([0], np.cumsum(invalid))) if invalid_any else None
+
+    vwaps = np.full((len(periods), n), np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for j, period in enumerate(periods):
+            if period > n:
+                continue
+            sum_tpv = cum_tpv[period:] - cum_tpv[:n + 1 - period]
+            sum_vol = cum_vol[period:] - cum_vol[:n + 1 - period]
+            row = tp0 + sum_tpv / sum_vol
+            if cum_bad is not None:
+                row[(cum_bad[period:] - cum_bad[:n + 1 - period]) > 0] = np.nan
+            vwaps[j, period - 1:] = row
+
+    return vwaps
+
+
+def calculate_anchored_vwap(df, start_time=None, source=VWAP_SOURCE) -> pd.Series:
+    """
+    VWAP anclado a la sesión: Σ(precio·volumen) / Σ volumen acumulados desde start_time
+    de cada día (desde la primera barra del día si start_time es None)
+
+    Con source='tick' las sumas son las de los trades (price_volume y volume de cada barra),
+    así que el valor en cada barra es el VWAP exacto de todos los trades desde el anclaje.
+
+    Args:
+        df: DataFrame con 'timestamp', 'volume' y las columnas de la fuente (uno o varios días)
+        start_time: Hora de anclaje ('HH:MM:SS' o datetime.time) o None
+        source: 'typical' o 'tick' (ver VWAP_SOURCES)
+
+    Returns:
+        Series con el mismo índice que df (NaN antes de la hora de anclaje)
+    """
+    timestamps = df['timestamp']
+    price_volume = bar_price_volume(df, source).to_numpy(dtype=np.float64)
+    volume = df['volume'].to_numpy(dtype=np.float64)
+
+    anchored = np.ones(len(df), dtype=bool)
+    if start_time is not None:
+        if not isinstance(start_time, dt_time):
+            start_time = pd.to_datetime(start_time).time()
+        anchored = (timestamps.dt.time >= start_time).to_numpy()
+
+    # Sumas acumuladas por día solo sobre las barras ancladas
+    session = timestamps.dt.normalize().to_numpy()[anchored]
+    sums = pd.DataFrame({'pv': price_volume[anchored], 'v': volume[anchored]})
+    cum = sums.groupby(session, sort=False).cumsum()
+
+    vwap = np.full(len(df), np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        vwap[anchored] = cum['pv'].to_numpy() / cum['v'].to_numpy()
+    return pd.Series(vwap, index=df.index, name='vwap')
 
 
 if __name__ == "__main__":
     from find_fractals import load_date_range
-    from config import START_DATE, END_DATE, VWAP_FAST, VWAP_SLOW
+    from config import START_DATE, END_DATE, VWAP_FAST, VWAP_SLOW, PRICE_EJECTION_TRIGGER
 
     print("="*70)
     print("TEST: Cálculo de VWAP")
@@ -73,5 +215,20 @@ if __name__ == "__main__":
     print(f"  Max: {df['vwap_slow'].max():.2f}")
     print(f"  Registros con VWAP válido: {df['vwap_slow'].notna().sum()}")
 
+    # VWAP exacto de los trades (price_volume de la agregación) frente al precio típico
+    if PRICE_VOLUME_COLUMN in df.columns:
+        def ejections(vwap):
+            return ((df['close'] - vwap).abs() / vwap > PRICE_EJECTION_TRIGGER).to_numpy()
+
+        vwap_typical = calculate_vwap(df, period=VWAP_FAST, source='typical')
+        vwap_tick = calculate_vwap(df, period=VWAP_FAST, source='tick')
+        diff = (vwap_tick - vwap_typical).abs()
+        ejection_typical, ejection_tick = ejections(vwap_typical), ejections(vwap_tick)
+        print("\nVWAP Fast exacto (ticks) vs precio típico:")
+        print(f"  Diferencia media: {diff.mean():.4f} puntos, máxima: {diff.max():.4f} puntos")
+        print(f"  Barras con price ejection (> {PRICE_EJECTION_TRIGGER:.2%}): "
+              f"{ejection_typical.sum()} (típico) vs {ejection_tick.sum()} (ticks), "
+              f"distinta en {(ejection_typical != ejection_tick).sum()} barras")
+
     print(f"\nRegistros totales: {len(df)}")
     print("\n[OK] Test completado")
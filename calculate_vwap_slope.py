@@ -0,0 +1,108 @@
+"""
+Cálculo vectorizado de la pendiente (slope) del VWAP en ventana móvil
+Sustituye a rolling(window).apply(np.polyfit) (una llamada Python y un ajuste por
+mínimos cuadrados por barra) y a calculate_vwap_slope_at_bar barra a barra.
+
+Con x = 0..w-1 dentro de cada ventana, la pendiente de la regresión lineal es
+
+    slope = (Σxy - x̄·Σy) / Σ(x - x̄)²,   x̄ = (w-1)/2,   Σ(x - x̄)² = w(w²-1)/12
+
+y Σy, Σxy se obtienen con sumas móviles (O(n) en total): Σxy de la ventana que
+termina en i es Σ k·y_k - (i-w+1)·Σy_k con k la posición global. Para no perder
+precisión en esa resta, y se desplaza antes a su primer valor válido.
+
+Ventanas con algún NaN (el arranque del VWAP) devuelven NaN, igual que rolling().apply.
+"""
+import numpy as np
+import pandas as pd
+
+from config import VWAP_SLOPE_DEGREE_WINDOW
+
+
+SLOPE_METHODS = ('regression', 'endpoint')
+
+
+def rolling_slope(values, window: int = VWAP_SLOPE_DEGREE_WINDOW, method: str = 'regression') -> np.ndarray:
+    """
+    Pendiente (puntos por barra, con signo) de cada ventana de `window` barras que termina en cada barra
+
+    Args:
+        values: Serie o array de valores (p.ej. vwap_fast)
+        window: Número de barras de la ventana
+        method: 'regression' = pendiente de mínimos cuadrados (idéntica a np.polyfit(x, y, 1)[0]),
+                'endpoint' = (y[i] - y[i-window+1]) / (window - 1)
+
+    Returns:
+        np.ndarray float64 del mismo tamaño (NaN si la ventana no está completa o tiene NaN)
+    """
+    if method not in SLOPE_METHODS:
+        raise ValueError(f"method debe ser uno de {SLOPE_METHODS}, no '{method}'")
+    if window < 2:
+        raise ValueError(f"window debe ser >= 2, no {window}")
+
+    y = np.asarray(values, dtype=np.float64)
+    n = len(y)
+    slope = np.full(n, np.nan)
+    if n < window:
+        return slope
+
+    if method == 'endpoint':
+        slope[window - 1:] = (y[window - 1:] - y[:n - window + 1]) / (window - 1)
+        return slope
+
+    valid = np.flatnonzero(~np.isnan(y))
+    if len(valid) == 0:
+        return slope
+    y = y - y[valid[0]]
+
+    # Sumas móviles (pandas: NaN si la ventana tiene algún NaN, suma compensada)
+    k = np.arange(n, dtype=np.float64)
+    sum_y = pd.Series(y).rolling(window).sum().to_numpy()
+    sum_ky = pd.Series(k * y).rolling(window).sum().to_numpy()
+
+    sum_xy = sum_ky - (k - (window - 1)) * sum_y
+    x_mean = (window - 1) / 2
+    sxx = window * (window * window - 1) / 12
+    return (sum_xy - x_mean * sum_y) / sxx
+
+
+def calculate_vwap_slope(df, window: int = VWAP_SLOPE_DEGREE_WINDOW, method: str = 'regression',
+                         column: str = 'vwap_fast') -> pd.Series:
+    """
+    Calcula la pendiente del VWAP en ventana móvil (con signo; usar .abs() para el indicador)
+
+    Args:
+        df: DataFrame con la columna del VWAP
+        window: Número de barras de la ventana (default: VWAP_SLOPE_DEGREE_WINDOW)
+        method: 'regression' o 'endpoint' (ver rolling_slope)
+        column: Columna del VWAP (default: 'vwap_fast')
+
+    Returns:
+        Series con la pendiente, mismo índice que df
+    """
+    return pd.Series(rolling_slope(df[column], window, method), index=df.index, name='vwap_slope')
+
+
+if __name__ == "__main__":
+    from find_fractals import load_date_range
+    from calculate_vwap import calculate_vwap
+    from config import START_DATE, END_DATE, VWAP_FAST
+
+    print("="*70)
+    print("TEST: Cálculo de VWAP Slope")
+    print("="*70)
+    print(f"Periodo: {START_DATE} -> {END_DATE}")
+    print(f"Ventana: {VWAP_SLOPE_DEGREE_WINDOW} barras")
+
+    df = load_date_range(START_DATE, END_DATE)
+    if df is None:
+        print("[ERROR] No se pudieron cargar datos")
+        exit(1)
+
+    df['vwap_fast'] = calculate_vwap(df, period=VWAP_FAST)
+    df['vwap_slope'] = calculate_vwap_slope(df).abs()
+    df['vwap_slope_endpoint'] = calculate_vwap_slope(df, method='endpoint').abs()
+
+    print(df[['timestamp', 'close', 'vwap_fast', 'vwap_slope', 'vwap_slope_endpoint']].tail(20))
+    print(f"\nRegistros con slope válido: {df['vwap_slope'].notna().sum()} de {len(df)}")
+    print("\n[OK] Test completado")
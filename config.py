@@ -117,6 +117,7 @@ TRAIL_CASH_BREAK_EVEN_POINTS_PROFIT = 1            # Points of profit to lock in
 USE_ATR_TRAILING_STOP = False                       # True = use ATR based trailing stop, False = disabled
 ATR_PERIOD = 21                                    # Period for ATR calculation
 ATR_MULTIPLIER = 3                               # Multiplier for ATR to determine stop distance
+ATR_MODE = "sma"                                   # ATR smoothing: "sma", "wilder" or "ema"
 
 # ============================================================================
 # TRADING PARAMETERS VWAP CROSSOVER STRATEGY
@@ -182,6 +183,7 @@ REVERSE_AT_EACH_ORANGE_DOT = False            # True = reverse at each orange do
 USE_WYCKOFF_ATR_TRAILING_STOP = True          # True = use ATR based trailing stop, False = use fixed stop
 WYCKOFF_ATR_PERIOD = 21                        # Period for ATR calculation
 WYCKOFF_ATR_MULTIPLIER = 10                    # Multiplier for ATR to determine stop distance
+WYCKOFF_ATR_MODE = "wilder"                    # ATR smoothing: "sma", "wilder" or "ema"
 
 # OPENING RANGE CHANNEL
 ENABLE_OPENING_RANGE_PLOT = False
@@ -192,6 +194,7 @@ OPENING_RANGE_END = "15:29:00"
 USE_SQUARE_ATR_TRAILING_STOP = False          # True = use ATR based trailing stop, False = use fixed stop
 SQUARE_ATR_PERIOD = 21                       # Period for ATR calculation
 SQUARE_ATR_MULTIPLIER = 7                    # Multiplier for ATR to determine stop distance
+SQUARE_ATR_MODE = "sma"                      # ATR smoothing: "sma", "wilder" or "ema"
 
 # Rectangle-Based Initial Stop Loss
 USE_OPOSITE_SIDE_OF_SQUARE_AS_STOP = True   # True = use opposite side of rectangle as initial stop, False = use fixed SL
@@ -218,11 +221,39 @@ OUTPUTS_DIR = PROJECT_ROOT / "outputs"
 FRACTALS_DIR = OUTPUTS_DIR / "fractals"
 CHARTS_DIR = OUTPUTS_DIR / "charts"
 MODELS_DIR = OUTPUTS_DIR / "modelos_json"
+TICK_STORE_DIR = DATA_DIR / "tick_store"   # Ticks convertidos a .npy (ver tick_store.py)
+CACHE_DIR = OUTPUTS_DIR / "cache"
+BAR_CACHE_DIR = CACHE_DIR / "bars"          # Barras OHLC cacheadas (ver bar_cache.py)
+FEATURE_CACHE_DIR = CACHE_DIR / "features"  # Indicadores por día cacheados (ver feature_store.py)
+CATALOG_PATH = DATA_DIR / "catalog.json"    # Manifiesto de días disponibles (ver data_catalog.py)
+LIVE_INGEST_DIR = CACHE_DIR / "live"        # Estado de la ingesta incremental (ver live_ingest.py)
+QUARANTINE_DIR = DATA_DIR / "quarantine"    # Ticks descartados por la validación (ver tick_validation.py)
+
+# ============================================================================
+# VALIDACIÓN DE TICKS
+# ============================================================================
+VALIDATE_TICKS = True                       # True = descartar ticks inválidos antes de agregar barras
+TICK_QUARANTINE = True                      # True = guardar los ticks descartados en QUARANTINE_DIR
+TICK_MAX_DEVIATION_PCT = 5.0                # Precio inválido si se aleja más de este % de la mediana del día
+TICK_MAX_JUMP_POINTS = 50.0                 # Pico aislado: salto > N puntos respecto a ambos vecinos
+
+# ============================================================================
+# CACHÉ DE BARRAS OHLC
+# ============================================================================
+USE_BAR_CACHE = True                        # True = reutilizar barras cacheadas en load_date_range
+BAR_CACHE_MAX_MB = 512                      # Tamaño máximo de la caché; se eliminan las entradas menos usadas
+BAR_PYRAMID_TIMEFRAMES = ['1min', '5min', '15min', '30min', '1h']  # Niveles derivados de una sola pasada de 1min
+INCREMENTAL_INGEST = False                  # True = el CSV de DATE (en curso) se ingiere de forma incremental
+BAR_ORDER_FLOW = True                       # True = barras con buy/sell volume, delta, cum_delta, trade_count, avg_spread
+USE_FEATURE_STORE = True                    # True = indicadores (VWAP, slope, señales) calculados una vez por día y parámetros
+FEATURE_HISTORY = True                      # True = cada día del almacén se calcula tras las barras previas (warm-up, ver MAX_WARMUP_GAP_DAYS); False = solo con las del día
+FEATURE_CACHE_MAX_MB = 256                  # Tamaño máximo del almacén de indicadores
 
 # ============================================================================
 # TRADING PARAMETERS GENERAL
 # ============================================================================
 POINT_VALUE = 20.0                          # Valor de cada punto en USD (NQ = $20)
+TICK_SIZE = 0.25                            # Incremento mínimo de precio en puntos (NQ = 0.25)
 
 # ============================================================================
 # PARÁMETROS DE FRACTALES ZIGZAG (PRECIO) - AJUSTADOS PARA NQ
@@ -230,6 +261,7 @@ POINT_VALUE = 20.0                          # Valor de cada punto en USD (NQ = $
 # NQ tiene precio ~26000, por lo que los porcentajes pueden ser diferentes a GC
 MIN_CHANGE_PCT_MINOR = 0.10   #0.15% umbral para fractales pequeños (~39 puntos en NQ)
 MIN_CHANGE_PCT_MAJOR = 0.20   # 0.50% umbral para fractales grandes (~130 puntos en NQ)
+MIN_CHANGE_PCT_EXTRA = []     # Umbrales adicionales (%) detectados en la misma pasada que MINOR/MAJOR (ej: [0.30, 0.50])
 
 # ============================================================================
 # PARÁMETROS DE ANÁLISIS DE CONSOLIDACIÓN
@@ -244,6 +276,7 @@ TRIGGER_PERIODS = 2                      # Número de fractales consecutivos por
 # ============================================================================
 VWAP_FAST = 100               # Periodo para VWAP rápido (magenta)
 VWAP_SLOW = 200                  # Periodo para VWAP lento (verde)
+VWAP_SOURCE = "typical"          # "typical" = precio típico (H+L+C)/3 de la barra; "tick" = VWAP exacto de los trades (price_volume)
 
 PRICE_EJECTION_TRIGGER = 0.001         # Porcentaje mínimo de distancia entre precio y VWAP fast para trigger (0.001 = 0.1%)
 OVER_PRICE_EJECTION_TRIGGER = 0.003     # Porcentaje para trigger de sobre-alejamiento (puntos rojos) (0.005 = 0.5%)
@@ -253,6 +286,17 @@ VWAP_SLOPE_DEGREE_WINDOW = 10                 # Window (in bars) to calculate VW
 VWAP_SLOPE_INDICATOR_HIGH_VALUE = 0.6         # Threshold alto para VWAP Slope indicator
 VWAP_SLOPE_INDICATOR_LOW_VALUE = 0.01         # Threshold bajo para VWAP Slope indicator
 
+# ============================================================================
+# SESIONES DE TRADING (CME GLOBEX)
+# ============================================================================
+USE_SESSION_BARS = False                # True = barras por sesión Globex (18:00 -> 17:00 ET) en lugar de por fichero/día natural
+DATA_TIMEZONE = "Europe/Madrid"         # Zona horaria de los timestamps de data/ (sin zona en los CSV)
+SESSION_TIMEZONE = "America/New_York"   # Zona horaria del calendario de sesiones CME
+SESSION_OPEN_TIME = "18:00:00"          # Apertura de la sesión (día natural anterior, hora ET)
+SESSION_CLOSE_TIME = "17:00:00"         # Cierre de la sesión (hora ET)
+SESSION_WARMUP_BARS = VWAP_SLOW         # Barras de la sesión anterior añadidas como warm-up de indicadores
+MAX_WARMUP_GAP_DAYS = 4                 # Antigüedad máxima (días naturales) de las barras de warm-up: cubre fin de semana + festivo
+
 # ============================================================================
 # PARÁMETROS DE VISUALIZACIÓN
 # ============================================================================
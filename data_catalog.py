@@ -0,0 +1,263 @@
+"""
+Catálogo de días disponibles en data/ (manifiesto persistente en data/catalog.json)
+Sustituye los glob + regex sobre DATA_DIR que cada script hacía por su cuenta.
+
+Por cada día guarda:
+    path, source          fichero de ticks de origen (CSV, CSV comprimido .zst/.gz, Parquet,
+                          o .npy del store si no hay ninguno) y su formato
+    size, mtime_ns, sha1  huella del fichero (el sha1 solo se recalcula si cambian tamaño/mtime)
+    rows                  número de ticks
+    first_timestamp, last_timestamp
+    price_min, price_max  rango de precios en puntos
+    store                 True si el día tiene un .npy al día en el tick store
+    quality               informe de la validación de ticks (ver tick_validation.py), si se ha ejecutado
+
+El catálogo se actualiza de forma incremental: en cada refresco solo se vuelven a
+leer los ficheros nuevos o modificados; el resto se toma del manifiesto.
+
+Uso:
+    python data_catalog.py              # Actualiza y muestra el catálogo
+    python data_catalog.py --rebuild    # Reconstruye todas las entradas
+"""
+
+import os
+import re
+import sys
+import json
+import bisect
+import hashlib
+import numpy as np
+from pathlib import Path
+from typing import List, Optional
+
+from config import DATA_DIR, TICK_STORE_DIR, CATALOG_PATH
+from tick_store import (
+    has_store, store_path_for, load_tick_view, read_tick_source_array,
+    source_format, ticks_to_points
+)
+
+
+CATALOG_VERSION = 1
+
+# time_and_sales_nq_YYYYMMDD.csv (o .csv.zst, .csv.gz, .parquet) en data/,
+# time_and_sales_nq_YYYYMMDD.npy en el store (los mismos nombres que resuelve tick_source_path)
+SOURCE_PATTERN = re.compile(r"^time_and_sales_nq_(\d{8})\.(csv|csv\.zst|csv\.gz|parquet|npy)$")
+
+# Prioridad de formatos de menor a mayor (un formato sobrescribe a los anteriores)
+SOURCE_PRIORITY = ('npy', 'parquet', 'csv.gz', 'csv.zst', 'csv')
+
+# Catálogo ya refrescado en este proceso (ver load_catalog)
+_catalog = None
+_catalog_dates = None
+
+
+# =============================================================================
+# ESCANEO
+# =============================================================================
+
+def file_checksum(path: Path, chunk_size: int = 1 << 20) -> str:
+    """sha1 del contenido de un fichero, leído por bloques"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def scan_sources(data_dir: Path = DATA_DIR, store_dir: Path = TICK_STORE_DIR) -> dict:
+    """
+    Fichero de origen de cada día: {fecha: Path}
+    El CSV tiene prioridad sobre sus versiones comprimidas y todos ellos sobre el .npy
+    (que puede regenerarse a partir de ellos), ver SOURCE_PRIORITY
+    """
+    candidates = []
+    for directory, formats in ((store_dir, ('npy',)), (data_dir, SOURCE_PRIORITY[1:])):
+        if not directory.exists():
+            continue
+        for path in directory.iterdir():
+            match = SOURCE_PATTERN.match(path.name)
+            if match and match.group(2) in formats:
+                candidates.append((SOURCE_PRIORITY.index(match.group(2)), path.name, match.group(1), path))
+
+    # Orden por prioridad: cada formato sobrescribe a los de menor prioridad
+    sources = {}
+    for _, _, date_str, path in sorted(candidates):
+        sources[date_str] = path
+    return sources
+
+
+def _day_stats(date_str: str, path: Path) -> dict:
+    """Filas, primer/último timestamp y rango de precios de un día"""
+    if has_store(date_str):
+        ticks = load_tick_view(date_str)
+    elif path.suffix == '.npy':
+        ticks = np.load(path, mmap_mode='r')
+    else:
+        ticks = read_tick_source_array(path)
+
+    if ticks is None or len(ticks) == 0:
+        return {'rows': 0, 'first_timestamp': None, 'last_timestamp': None,
+                'price_min': None, 'price_max': None}
+
+    ts = ticks['timestamp']
+    price = ticks['price']
+    return {
+        'rows': int(len(ticks)),
+        'first_timestamp': str(np.datetime64(int(ts.min()), 'ns')),
+        'last_timestamp': str(np.datetime64(int(ts.max()), 'ns')),
+        'price_min': float(ticks_to_points(price.min())),
+        'price_max': float(ticks_to_points(price.max())),
+    }
+
+
+def build_entry(date_str: str, path: Path, previous: Optional[dict] = None) -> dict:
+    """
+    Entrada del catálogo para un día. Si previous corresponde al mismo fichero
+    (ruta, tamaño y mtime), reutiliza checksum y estadísticas sin releerlo.
+    """
+    st = path.stat()
+    entry = {
+        'date': date_str,
+        'path': str(path),
+        'source': source_format(path),
+        'size': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+    }
+
+    unchanged = (
+        previous is not None
+        and previous.get('path') == entry['path']
+        and previous.get('size') == entry['size']
+        and previous.get('mtime_ns') == entry['mtime_ns']
+    )
+    if unchanged:
+        entry.update({k: v for k, v in previous.items() if k not in entry})
+    else:
+        print(f"[INFO] Catalogando {path.name}")
+        entry['sha1'] = file_checksum(path)
+        entry.update(_day_stats(date_str, path))
+
+    # Estado del store: barato de comprobar, se refresca siempre
+    entry['store'] = has_store(date_str)
+    entry['store_path'] = str(store_path_for(date_str)) if entry['store'] else None
+    return entry
+
+
+# =============================================================================
+# MANIFIESTO
+# =============================================================================
+
+def read_manifest(catalog_path: Path = CATALOG_PATH) -> dict:
+    """Manifiesto guardado ({fecha: entrada}); vacío si no existe o es de otra versión"""
+    if not catalog_path.exists():
+        return {}
+    try:
+        with open(catalog_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[WARNING] Catálogo ilegible {catalog_path.name}: {e}")
+        return {}
+    if manifest.get('version') != CATALOG_VERSION:
+        return {}
+    return manifest.get('days', {})
+
+
+def write_manifest(days: dict, catalog_path: Path = CATALOG_PATH) -> Path:
+    """Guarda el manifiesto de forma atómica (fichero .tmp + rename)"""
+    catalog_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = catalog_path.with_name(catalog_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': CATALOG_VERSION, 'days': days}, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, catalog_path)
+    return catalog_path
+
+
+def refresh_catalog(rebuild: bool = False) -> dict:
+    """
+    Actualiza el manifiesto con los ficheros actuales de data/ y del tick store
+
+    Args:
+        rebuild: Si True, recalcula todas las entradas aunque no hayan cambiado
+
+    Returns:
+        dict {fecha: entrada} ordenado por fecha
+    """
+    global _catalog, _catalog_dates
+
+    previous = {} if rebuild else read_manifest()
+    sources = scan_sources()
+
+    days = {
+        date_str: build_entry(date_str, path, previous.get(date_str))
+        for date_str, path in sorted(sources.items())
+    }
+
+    if days != previous:
+        write_manifest(days)
+
+    _catalog = days
+    _catalog_dates = list(days)
+    return days
+
+
+def load_catalog(refresh: bool = False) -> dict:
+    """
+    Catálogo {fecha: entrada}. Se refresca una vez por proceso (o si refresh=True);
+    las llamadas siguientes no tocan el disco.
+    """
+    if _catalog is None or refresh:
+        return refresh_catalog()
+    return _catalog
+
+
+# =============================================================================
+# CONSULTAS
+# =============================================================================
+
+def catalog_dates(start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[str]:
+    """
+    Fechas YYYYMMDD catalogadas en [start_date, end_date], ordenadas
+
+    Args:
+        start_date: Fecha mínima incluida (None = sin límite)
+        end_date: Fecha máxima incluida (None = sin límite)
+    """
+    load_catalog()
+    lo = 0 if start_date is None else bisect.bisect_left(_catalog_dates, start_date)
+    hi = len(_catalog_dates) if end_date is None else bisect.bisect_right(_catalog_dates, end_date)
+    return _catalog_dates[lo:hi]
+
+
+def catalog_entry(date_str: str) -> Optional[dict]:
+    """Entrada del catálogo de un día o None si no hay datos"""
+    return load_catalog().get(date_str)
+
+
+def record_quality(date_str: str, report: dict) -> None:
+    """
+    Guarda en la entrada del día el informe de calidad de la validación de ticks
+    (ver tick_validation.py). Se conserva mientras el fichero de origen no cambie.
+    """
+    entry = load_catalog().get(date_str)
+    if entry is None or entry.get('quality') == report:
+        return
+    entry['quality'] = report
+    write_manifest(_catalog)
+
+
+if __name__ == "__main__":
+    days = refresh_catalog(rebuild='--rebuild' in sys.argv[1:])
+
+    print("="*70)
+    print("CATÁLOGO DE DATOS")
+    print("="*70)
+    print(f"Manifiesto: {CATALOG_PATH}")
+    print(f"Días: {len(days)}")
+    print("-"*70)
+    for date_str, entry in days.items():
+        store = 'store' if entry['store'] else '-'
+        price_range = (f"{entry['price_min']:.2f}-{entry['price_max']:.2f}"
+                       if entry['rows'] else 'sin ticks')
+        print(f"  {date_str}  {entry['rows']:>9,} ticks  "
+              f"{(entry['first_timestamp'] or '')[11:19]}-{(entry['last_timestamp'] or '')[11:19]}  "
+              f"{price_range}  {store:<5}  {Path(entry['path']).name}")
@@ -0,0 +1,365 @@
+"""
+Almacén de indicadores por día en outputs/cache/features/
+Las estrategias, plot_day, find_rectangles* y los optimizadores calculaban cada uno
+vwap_fast, vwap_slow, vwap_slope, price_vwap_distance, price_ejection y las señales
+sobre las mismas barras. Aquí se calculan una vez por (día, huella de parámetros),
+se guardan junto a la caché de barras y todos los consumidores reciben las mismas
+columnas con attach_features(df).
+
+Con FEATURE_HISTORY cada día se calcula sobre sus barras precedidas de las últimas barras
+de los días anteriores (ver sessions.warmup_bars, como mucho MAX_WARMUP_GAP_DAYS días
+naturales atrás), de modo que los indicadores de ventana coinciden con los de un rango
+de varios días y son válidos desde la primera barra. Sin FEATURE_HISTORY cada día se
+calcula solo con sus propias barras (los indicadores de ventana empiezan en NaN).
+
+La clave de cada entrada combina la huella del fichero de ticks (la misma que usa
+bar_cache.py: si los ticks cambian, los indicadores se recalculan) y, con historia, la
+de los ficheros de los que puede salir el warm-up, el timeframe y la huella de los
+parámetros (VWAP_FAST, VWAP_SLOW, ...), de modo que barridos de parámetros distintos
+conviven en el almacén.
+
+Uso:
+    python feature_store.py [YYYYMMDD]   # Calcula (o lee) los indicadores del día (default: DATE)
+    python feature_store.py --clear      # Elimina todas las entradas
+"""
+
+import os
+import sys
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import List, Optional
+
+from config import (
+    DATE, FEATURE_CACHE_DIR, FEATURE_CACHE_MAX_MB, USE_FEATURE_STORE, FEATURE_HISTORY, MAX_WARMUP_GAP_DAYS,
+    VWAP_FAST, VWAP_SLOW, VWAP_SLOPE_DEGREE_WINDOW, PRICE_EJECTION_TRIGGER, VWAP_SOURCE
+)
+from bar_cache import cache_key, evict, source_fingerprint, source_path_for
+from calculate_vwap import calculate_vwap
+from calculate_vwap_slope import rolling_slope
+from data_catalog import catalog_dates
+from find_fractals import BASE_TIMEFRAME, bar_cache_variant, load_day_bars
+from sessions import warmup_bars
+
+
+FEATURE_VERSION = 1  # Cambiar si cambia el cálculo de alguna columna (invalida el almacén)
+
+FEATURE_COLUMNS = [
+    'vwap_fast', 'vwap_slow', 'vwap_slope', 'price_vwap_distance', 'price_ejection',
+    'price_above_vwap', 'price_below_vwap', 'long_signal', 'short_signal',
+    'uptrend', 'downtrend',
+]
+
+# Entradas ya leídas o calculadas en este proceso (el mismo DataFrame para todos los consumidores)
+_memo = {}
+
+
+# =============================================================================
+# PARÁMETROS
+# =============================================================================
+
+def feature_params(**overrides) -> dict:
+    """
+    Parámetros de los indicadores (por defecto los de config.py)
+
+    Args:
+        overrides: vwap_fast, vwap_slow, slope_window, ejection_trigger, vwap_source
+                   y/o history (warm-up con barras de días previos) a sustituir
+    """
+    params = {
+        'vwap_fast': VWAP_FAST,
+        'vwap_slow': VWAP_SLOW,
+        'slope_window': VWAP_SLOPE_DEGREE_WINDOW,
+        'ejection_trigger': PRICE_EJECTION_TRIGGER,
+        'vwap_source': VWAP_SOURCE,
+        'history': FEATURE_HISTORY,
+    }
+    unknown = set(overrides) - set(params)
+    if unknown:
+        raise ValueError(f"Parámetros de indicadores desconocidos: {sorted(unknown)}")
+    params.update(overrides)
+    return params
+
+
+def params_fingerprint(params: dict) -> str:
+    """Huella corta de los parámetros y de la versión del cálculo"""
+    raw = json.dumps({'version': FEATURE_VERSION, **params}, sort_keys=True)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:10]
+
+
+def history_bars(params: dict) -> int:
+    """
+    Barras previas necesarias para que todas las ventanas estén completas en la primera
+    barra del día (0 sin history)
+    """
+    if not params['history']:
+        return 0
+    return max(params['vwap_slow'], params['vwap_fast'] + params['slope_window'] - 1)
+
+
+# =============================================================================
+# CÁLCULO
+# =============================================================================
+
+def compute_features(df: pd.DataFrame, params: Optional[dict] = None) -> pd.DataFrame:
+    """
+    Calcula las columnas de FEATURE_COLUMNS sobre un DataFrame de barras OHLC
+
+    vwap_fast y vwap_slow usan la fuente params['vwap_source'] ('typical' o 'tick', ver calculate_vwap).
+
+    Señales (definición de la estrategia Momentum, que comparten los optimizadores):
+        price_ejection  distancia |close - vwap_fast| / vwap_fast > ejection_trigger
+        long_signal     price_ejection con el precio por encima de vwap_fast
+        short_signal    price_ejection con el precio por debajo de vwap_fast
+        uptrend         vwap_fast > vwap_slow (downtrend: <)
+
+    Returns:
+        DataFrame con las columnas de FEATURE_COLUMNS y el mismo índice que df
+    """
+    params = params or feature_params()
+    vwap_fast = calculate_vwap(df, period=params['vwap_fast'], source=params['vwap_source'])
+    vwap_slow = calculate_vwap(df, period=params['vwap_slow'], source=params['vwap_source'])
+    vwap_slope = pd.Series(np.abs(rolling_slope(vwap_fast, params['slope_window'])), index=df.index)
+
+    close = df['close']
+    price_vwap_distance = abs((close - vwap_fast) / vwap_fast)
+    price_ejection = (price_vwap_distance > params['ejection_trigger']) & (vwap_fast.notna())
+    price_above_vwap = (close > vwap_fast).astype(bool)
+    price_below_vwap = (close < vwap_fast).astype(bool)
+
+    return pd.DataFrame({
+        'vwap_fast': vwap_fast,
+        'vwap_slow': vwap_slow,
+        'vwap_slope': vwap_slope,
+        'price_vwap_distance': price_vwap_distance,
+        'price_ejection': price_ejection,
+        'price_above_vwap': price_above_vwap,
+        'price_below_vwap': price_below_vwap,
+        'long_signal': price_ejection & price_above_vwap,
+        'short_signal': price_ejection & price_below_vwap,
+        'uptrend': (vwap_fast > vwap_slow) & (vwap_slow.notna()),
+        'downtrend': (vwap_fast < vwap_slow) & (vwap_slow.notna()),
+    }, index=df.index)
+
+
+def build_day_features(date_str: str, timeframe: str = BASE_TIMEFRAME,
+                       params: Optional[dict] = None) -> Optional[pd.DataFrame]:
+    """
+    Calcula los indicadores de un día sobre sus barras precedidas de history_bars(params)
+    barras de los días anteriores (ninguna sin history)
+
+    Returns:
+        DataFrame (timestamp + FEATURE_COLUMNS) con una fila por barra del día, o None
+    """
+    params = params or feature_params()
+    df_bars = load_day_bars(date_str, timeframe)
+    if df_bars is None or df_bars.empty:
+        return None
+
+    n_history = history_bars(params)
+    df_history = warmup_bars(df_bars['timestamp'].iloc[0], n_history, timeframe) if n_history else None
+    if df_history is not None:
+        df_frame = pd.concat([df_history, df_bars], ignore_index=True)
+    else:
+        df_frame = df_bars.reset_index(drop=True)
+
+    features = compute_features(df_frame, params).iloc[len(df_frame) - len(df_bars):]
+    features = features.reset_index(drop=True)
+    features.insert(0, 'timestamp', df_bars['timestamp'].to_numpy())
+    return features
+
+
+# =============================================================================
+# ALMACÉN
+# =============================================================================
+
+def _entry_prefix(date_str: str, timeframe: str, params: dict) -> str:
+    return f"features_{date_str}_{timeframe}_{params_fingerprint(params)}_"
+
+
+def _source_key(date_str: str, timeframe: str, params: dict) -> Optional[str]:
+    """
+    Huella de las barras de las que salen los indicadores del día: la de su fichero de ticks
+    (con la variante de las barras) y, con history, la de los ficheros de los días de los que
+    warmup_bars puede tomar barras. Si cambia cualquiera de ellos, cambia la clave.
+    """
+    key = cache_key(date_str, timeframe, bar_cache_variant())
+    if key is None or not params['history']:
+        return key
+
+    earliest = (pd.Timestamp(date_str) - pd.Timedelta(days=MAX_WARMUP_GAP_DAYS)).strftime('%Y%m%d')
+    sources = [key]
+    for previous in catalog_dates(earliest, date_str):
+        path = source_path_for(previous)
+        if previous != date_str and path is not None:
+            sources.append(source_fingerprint(path))
+    return hashlib.sha1('|'.join(sources).encode('utf-8')).hexdigest()[:16]
+
+
+def feature_path_for(date_str: str, timeframe: str = BASE_TIMEFRAME,
+                     params: Optional[dict] = None) -> Optional[Path]:
+    """Ruta de la entrada vigente para (día, timeframe, parámetros) o None si no hay ticks"""
+    params = params or feature_params()
+    source_key = _source_key(date_str, timeframe, params)
+    if source_key is None:
+        return None
+    return FEATURE_CACHE_DIR / f"{_entry_prefix(date_str, timeframe, params)}{source_key}.pkl"
+
+
+def _save_features(date_str: str, timeframe: str, params: dict,
+                   path: Path, features: pd.DataFrame) -> None:
+    """Guarda una entrada, elimina las de versiones anteriores de los ticks y aplica el límite de tamaño"""
+    FEATURE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    for old in FEATURE_CACHE_DIR.glob(f"{_entry_prefix(date_str, timeframe, params)}*.pkl"):
+        if old != path:
+            old.unlink(missing_ok=True)
+
+    tmp_path = path.with_name(path.name + '.tmp')
+    features.to_pickle(tmp_path)
+    tmp_path.replace(path)
+
+    evict(FEATURE_CACHE_MAX_MB, cache_dir=FEATURE_CACHE_DIR, pattern="features_*.pkl")
+
+
+def load_day_features(date_str: str, timeframe: str = BASE_TIMEFRAME,
+                      params: Optional[dict] = None) -> Optional[pd.DataFrame]:
+    """
+    Indicadores de un día desde memoria, desde el almacén o calculándolos (y guardándolos)
+
+    Args:
+        date_str: Fecha en formato YYYYMMDD
+        timeframe: Timeframe de las barras (default: BASE_TIMEFRAME)
+        params: Parámetros de los indicadores (default: feature_params())
+
+    Returns:
+        DataFrame (timestamp + FEATURE_COLUMNS) compartido entre llamadas: no modificar
+    """
+    params = params or feature_params()
+    path = feature_path_for(date_str, timeframe, params)
+    if path is None:
+        return None
+    if path.name in _memo:
+        return _memo[path.name]
+
+    features = None
+    if path.exists():
+        try:
+            features = pd.read_pickle(path)
+            os.utime(path)  # LRU por mtime, como la caché de barras
+        except Exception as e:
+            print(f"[WARNING] Entrada de indicadores corrupta {path.name}: {e}")
+            path.unlink(missing_ok=True)
+
+    if features is None:
+        features = build_day_features(date_str, timeframe, params)
+        if features is None:
+            return None
+        _save_features(date_str, timeframe, params, path, features)
+        print(f"[OK] Indicadores de {date_str} ({timeframe}) calculados: {len(features):,} barras")
+
+    _memo[path.name] = features
+    return features
+
+
+def _stored_features(timestamps: pd.Series, timeframe: str, params: dict) -> Optional[pd.DataFrame]:
+    """Filas del almacén para cada timestamp (None si algún timestamp no es una barra del almacén)"""
+    ts = timestamps.to_numpy(dtype='datetime64[ns]')
+    if len(ts) == 0:
+        return None
+
+    days = []
+    for date_str in pd.unique(pd.DatetimeIndex(ts).strftime('%Y%m%d')):
+        features = load_day_features(date_str, timeframe, params)
+        if features is None:
+            return None
+        days.append(features)
+    stored = days[0] if len(days) == 1 else pd.concat(days, ignore_index=True)
+
+    stored_ts = stored['timestamp'].to_numpy(dtype='datetime64[ns]')
+    pos = np.searchsorted(stored_ts, ts)
+    found = pos < len(stored_ts)
+    found[found] = stored_ts[pos[found]] == ts[found]
+    if not found.all():
+        print(f"[WARNING] {np.count_nonzero(~found)} barras no coinciden con las del almacén de "
+              f"indicadores ({timeframe}); se calculan sobre el DataFrame recibido")
+        return None
+    return stored.iloc[pos]
+
+
+def attach_features(df: pd.DataFrame, columns: Optional[List[str]] = None,
+                    timeframe: str = BASE_TIMEFRAME, params: Optional[dict] = None) -> pd.DataFrame:
+    """
+    Añade (in place) columnas de indicadores a un DataFrame de barras con columna timestamp
+
+    Con USE_FEATURE_STORE se toman del almacén por timestamp (un día o un rango, con o sin
+    barras de warm-up); si está desactivado o las barras no son las del almacén (otro
+    timeframe, barras construidas a mano...) se calculan sobre el propio df.
+
+    Args:
+        df: DataFrame OHLC con columna timestamp
+        columns: Columnas a añadir (default: FEATURE_COLUMNS)
+        timeframe: Timeframe de las barras de df
+        params: Parámetros de los indicadores (default: feature_params())
+
+    Returns:
+        El mismo df con las columnas añadidas
+    """
+    columns = columns or FEATURE_COLUMNS
+    params = params or feature_params()
+
+    features = _stored_features(df['timestamp'], timeframe, params) if USE_FEATURE_STORE else None
+    if features is None:
+        features = compute_features(df, params)
+
+    for col in columns:
+        df[col] = features[col].to_numpy()
+    return df
+
+
+def invalidate(date_str: Optional[str] = None) -> int:
+    """
+    Elimina entradas del almacén (y la memoria del proceso)
+
+    Args:
+        date_str: Solo este día (None = todos)
+
+    Returns:
+        Número de entradas eliminadas
+    """
+    _memo.clear()
+    if not FEATURE_CACHE_DIR.exists():
+        return 0
+
+    removed = 0
+    for path in FEATURE_CACHE_DIR.glob(f"features_{date_str or '*'}_*.pkl"):
+        path.unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+
+if __name__ == "__main__":
+    if '--clear' in sys.argv[1:]:
+        print(f"[OK] Eliminadas {invalidate()} entradas de {FEATURE_CACHE_DIR}")
+        sys.exit(0)
+
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    date_str = args[0] if args else DATE
+    params = feature_params()
+
+    print("="*70)
+    print(f"ALMACÉN DE INDICADORES - {date_str}")
+    print("="*70)
+    print(f"Parámetros: {params} (huella {params_fingerprint(params)})")
+
+    features = load_day_features(date_str, params=params)
+    if features is None:
+        print(f"[ERROR] Sin datos para {date_str}")
+        sys.exit(1)
+
+    print(f"[OK] {len(features):,} barras -> {feature_path_for(date_str, params=params)}")
+    print(f"  - vwap_fast válidos: {features['vwap_fast'].notna().sum():,}")
+    print(f"  - Price ejection (green dots): {features['price_ejection'].sum():,}")
+    print(f"  - LONG / SHORT signals: {features['long_signal'].sum():,} / {features['short_signal'].sum():,}")
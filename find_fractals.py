@@ -8,12 +8,28 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 from enum import Enum
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 
 from config import (
     DATA_DIR, FRACTALS_DIR, START_DATE, END_DATE,
-    MIN_CHANGE_PCT_MINOR, MIN_CHANGE_PCT_MAJOR
+    MIN_CHANGE_PCT_MINOR, MIN_CHANGE_PCT_MAJOR, MIN_CHANGE_PCT_EXTRA, USE_BAR_CACHE,
+    BAR_PYRAMID_TIMEFRAMES, BAR_ORDER_FLOW, INCREMENTAL_INGEST, DATE,
+    VALIDATE_TICKS, TICK_MAX_DEVIATION_PCT, TICK_MAX_JUMP_POINTS, USE_SESSION_BARS, TICK_SIZE
 )
+from bar_cache import load_cached_bars, save_cached_bars
+from data_catalog import catalog_dates
+from tick_validation import clean_tick_array
+from tick_store import (
+    has_store, csv_path_for, tick_source_path, store_path_for, load_tick_frame, load_tick_view,
+    read_tick_source, frame_to_array, price_column, points_to_ticks, ticks_to_points,
+    LADO_TO_CODE, NO_PRICE, PRICE_VOLUME_COLUMN
+)
+
+
+BASE_TIMEFRAME = '1min'  # Nivel base de la pirámide de barras (el único que se construye desde ticks)
+
+# Columnas añadidas por aggregate_ticks_to_ohlc(order_flow=True)
+ORDER_FLOW_COLUMNS = ['buy_volume', 'sell_volume', 'delta', 'cum_delta', 'trade_count', 'avg_spread']
 
 
 # =============================================================================
@@ -209,161 +225,625 @@ class UnifiedZigzagDetector:
 
 
 # =============================================================================
-# MAIN PROCESSING
+# KERNEL ZIGZAG SOBRE ARRAYS
 # =============================================================================
 
-def detect_fractals(df: pd.DataFrame, min_change_pct: float, tag: str) -> pd.DataFrame:
+ZIGZAG_BLOCK = 256  # Velas por bloque del recorrido (extremos del bloque compartidos por todos los umbrales)
+
+
+class _ZigzagLevel:
+    """Estado de un umbral del kernel ZigZag (mismos campos que UnifiedZigzagDetector)"""
+
+    def __init__(self, min_change_pct: float, trend: int, cur_high: float, cur_high_pos: int,
+                 cur_low: float, cur_low_pos: int):
+        self.pct = min_change_pct / 100.0
+        self.trend = trend                  # +1 buscando pico, -1 buscando valle
+        self.last_pivot_price = cur_low if trend == 1 else cur_high
+        self.cur_high, self.cur_high_pos = cur_high, cur_high_pos
+        self.cur_low, self.cur_low_pos = cur_low, cur_low_pos
+        self.positions, self.prices, self.directions = [], [], []
+
+    def pivots(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return (np.asarray(self.positions, dtype=np.int64), np.asarray(self.prices, dtype=np.float64),
+                np.asarray(self.directions, dtype=np.int8))
+
+
+class _ZigzagBlock:
+    """Extremos de un bloque de velas [start, end), calculados una vez para todos los umbrales"""
+
+    def __init__(self, high: np.ndarray, low: np.ndarray, start: int, end: int):
+        self.start, self.end = start, end
+        self.high, self.low = high[start:end], low[start:end]
+        self._cache = {}
+
+    def _get(self, key, func):
+        if key not in self._cache:
+            self._cache[key] = func()
+        return self._cache[key]
+
+    def cummax(self) -> np.ndarray:
+        return self._get('cummax', lambda: np.fmax.accumulate(self.high))
+
+    def cummin(self) -> np.ndarray:
+        return self._get('cummin', lambda: np.fmin.accumulate(self.low))
+
+    def max(self) -> Tuple[float, int]:
+        """Máximo de high y posición de su primera aparición"""
+        return self._get('max', lambda: (self.high.max(), self.start + int(np.argmax(self.high))))
+
+    def min(self) -> Tuple[float, int]:
+        """Mínimo de low y posición de su primera aparición"""
+        return self._get('min', lambda: (self.low.min(), self.start + int(np.argmin(self.low))))
+
+
+def _zigzag_block_cannot_pivot(level: _ZigzagLevel, block: _ZigzagBlock) -> bool:
+    """
+    Cota del bloque completo (solo con precios positivos): True si ninguna vela del bloque
+    puede confirmar un giro del umbral, sin recorrerlo. Con un margen relativo de 1e-9 frente
+    al redondeo, de modo que en caso de duda se recorre el bloque.
     """
-    Detecta fractales en los datos OHLC
+    block_high, _ = block.max()
+    block_low, _ = block.min()
+    if level.trend == 1:
+        extreme = max(level.cur_high, block_high)
+        if not extreme > level.last_pivot_price:
+            return True
+        bound = (extreme - block_low) / extreme
+    else:
+        extreme = min(level.cur_low, block_low)
+        if not extreme < level.last_pivot_price:
+            return True
+        bound = (block_high - extreme) / extreme
+    return bound * (1 + 1e-9) < level.pct
+
+
+def _advance_zigzag_level(level: _ZigzagLevel, high: np.ndarray, low: np.ndarray,
+                          block: _ZigzagBlock, positive: bool) -> None:
+    """
+    Avanza un umbral por las velas del bloque (mismas reglas que UnifiedZigzagDetector._check_for_pivot).
+    Entre dos giros el estado solo depende del extremo acumulado desde el último giro, así que
+    cada tramo se resuelve vectorizado con el máximo (buscando pico) o mínimo (buscando valle)
+    acumulado; el tramo que empieza en el bloque usa los acumulados compartidos del bloque.
+    """
+    start, end = block.start, block.end
+
+    if positive and _zigzag_block_cannot_pivot(level, block):
+        # Sin giro en el bloque: solo se actualiza el extremo del tramo (actualización estricta)
+        if level.trend == 1:
+            value, pos = block.max()
+            if value > level.cur_high:
+                level.cur_high, level.cur_high_pos = value, pos
+        else:
+            value, pos = block.min()
+            if value < level.cur_low:
+                level.cur_low, level.cur_low_pos = value, pos
+        return
+
+    while start < end:
+        seg_high = high[start:end]
+        seg_low = low[start:end]
+
+        if level.trend == 1:
+            # Buscando pico: máximo acumulado desde el último valle
+            running = block.cummax() if start == block.start else np.fmax.accumulate(seg_high)
+            extreme = np.fmax(running, level.cur_high)
+            change = np.divide(extreme - seg_low, extreme, out=np.zeros(len(extreme)), where=extreme != 0)
+            hit = np.flatnonzero((extreme > level.last_pivot_price) & (change >= level.pct))
+            seg_extreme, carried, carried_pos = seg_high, level.cur_high, level.cur_high_pos
+        else:
+            # Buscando valle: mínimo acumulado desde el último pico
+            running = block.cummin() if start == block.start else np.fmin.accumulate(seg_low)
+            extreme = np.fmin(running, level.cur_low)
+            change = np.divide(seg_high - extreme, extreme, out=np.where(seg_high > 0, np.inf, 0.0),
+                               where=extreme != 0)
+            hit = np.flatnonzero((extreme < level.last_pivot_price) & (change >= level.pct))
+            seg_extreme, carried, carried_pos = seg_low, level.cur_low, level.cur_low_pos
+
+        k = hit[0] if len(hit) else len(extreme) - 1
+        value = extreme[k]
+        # El detector actualiza el extremo solo con valores estrictamente mejores: primera aparición
+        pos = carried_pos if value == carried else start + int(np.argmax(seg_extreme[:k + 1] == value))
+
+        if not len(hit):
+            if level.trend == 1:
+                level.cur_high, level.cur_high_pos = value, pos
+            else:
+                level.cur_low, level.cur_low_pos = value, pos
+            return
+
+        level.positions.append(pos)
+        level.prices.append(value)
+        level.directions.append(level.trend)
+        level.last_pivot_price = value
+
+        # El extremo opuesto se reinicia con la vela que confirma el giro
+        j = start + int(k)
+        if level.trend == 1:
+            level.cur_low, level.cur_low_pos = low[j], j
+        else:
+            level.cur_high, level.cur_high_pos = high[j], j
+        level.trend = -level.trend
+        start = j + 1
+
+
+def zigzag_pivots_multi(high, low, min_change_pcts: List[float]) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Kernel ZigZag sobre arrays para varios umbrales en un solo recorrido de las velas.
+    Para cada umbral da los mismos puntos de giro que UnifiedZigzagDetector alimentado
+    vela a vela con add_candle, sin dicts por vela ni objetos ZigzagPoint.
+
+    Las velas se recorren por bloques de ZIGZAG_BLOCK. Los extremos de cada bloque (máximo,
+    mínimo y sus acumulados) se calculan una vez y los comparten todos los umbrales; un
+    umbral que no puede girar dentro del bloque (cota con esos extremos) lo salta en O(1).
+    Como los umbrales altos giran poco, añadir niveles cuesta mucho menos que repetir el cálculo.
 
     Args:
-        df: DataFrame con columnas timestamp, open, high, low, close
-        min_change_pct: Cambio mínimo en porcentaje
-        tag: 'major' o 'minor'
+        high: Máximos de las velas (array o Series)
+        low: Mínimos de las velas (misma longitud)
+        min_change_pcts: Cambios mínimos en porcentaje (ej: [0.10, 0.20] = 0.10% y 0.20%)
 
     Returns:
-        DataFrame con fractales detectados
+        Lista con un elemento por umbral (mismo orden): (posiciones, precios, direcciones)
+        en orden de confirmación, con la posición (0..n-1) de la vela del punto de giro,
+        su precio y su dirección (+1 pico, -1 valle)
     """
-    print(f"\n[INFO] Detectando fractales {tag.upper()} (min_change={min_change_pct:.3f}%)...")
+    high = np.ascontiguousarray(high, dtype=np.float64)
+    low = np.ascontiguousarray(low, dtype=np.float64)
+    n = len(high)
+
+    if n < 2:
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64), np.empty(0, dtype=np.int8))
+        return [empty for _ in min_change_pcts]
+
+    # Dos primeras velas: extremos iniciales y tendencia según qué se movió más (como add_candle).
+    # No dependen del umbral, así que todos los niveles parten del mismo estado.
+    cur_high, cur_high_pos = high[0], 0
+    cur_low, cur_low_pos = low[0], 0
+    if high[1] > cur_high:
+        cur_high, cur_high_pos = high[1], 1
+    if low[1] < cur_low:
+        cur_low, cur_low_pos = low[1], 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        high_change = (cur_high - high[0]) / high[0]
+        low_change = (low[0] - cur_low) / low[0]
+    trend = 1 if high_change > low_change else -1
+
+    levels = [_ZigzagLevel(pct, trend, cur_high, cur_high_pos, cur_low, cur_low_pos)
+              for pct in min_change_pcts]
+
+    # La cota para saltar bloques asume precios positivos (sin NaN)
+    positive = bool(np.all(high > 0) and np.all(low > 0))
+
+    for start in range(2, n, ZIGZAG_BLOCK):
+        block = _ZigzagBlock(high, low, start, min(n, start + ZIGZAG_BLOCK))
+        for level in levels:
+            _advance_zigzag_level(level, high, low, block, positive)
+
+    return [level.pivots() for level in levels]
+
+
+def zigzag_pivots(high, low, min_change_pct: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Kernel ZigZag sobre arrays para un umbral (ver zigzag_pivots_multi): los mismos puntos
+    de giro que UnifiedZigzagDetector alimentado vela a vela con add_candle
+
+    Args:
+        high: Máximos de las velas (array o Series)
+        low: Mínimos de las velas (misma longitud)
+        min_change_pct: Cambio mínimo en porcentaje (ej: 0.15 = 0.15%)
+
+    Returns:
+        (posiciones, precios, direcciones) en orden de confirmación: posición (0..n-1) de la
+        vela del punto de giro, su precio y su dirección (+1 pico, -1 valle)
+    """
+    return zigzag_pivots_multi(high, low, [min_change_pct])[0]
 
-    detector = UnifiedZigzagDetector(min_change_pct=min_change_pct)
 
-    # Procesar cada vela
-    for idx, row in df.iterrows():
-        detector.add_candle(
-            high=row['high'],
-            low=row['low'],
-            index=idx,
-            timestamp=row['timestamp']
-        )
+# =============================================================================
+# MAIN PROCESSING
+# =============================================================================
 
-    # Obtener fractales detectados
-    fractals = detector.get_zigzag_points()
+def _fractals_frame(df: pd.DataFrame, pivots: Tuple[np.ndarray, np.ndarray, np.ndarray], tag: str) -> pd.DataFrame:
+    """Informe (picos, valles, alternancia) y DataFrame de fractales a partir de la salida del kernel"""
+    positions, prices, directions = pivots
 
-    print(f"[OK] Detectados {len(fractals)} fractales {tag}")
+    print(f"[OK] Detectados {len(positions)} fractales {tag}")
 
     # Contar picos y valles
-    picos = [f for f in fractals if f.direction == ZigzagDirection.UP]
-    valles = [f for f in fractals if f.direction == ZigzagDirection.DOWN]
-    print(f"    Picos: {len(picos)}")
-    print(f"    Valles: {len(valles)}")
+    print(f"    Picos: {int((directions == 1).sum())}")
+    print(f"    Valles: {int((directions == -1).sum())}")
 
     # Verificar alternancia
-    alternancia_correcta = True
-    for i in range(1, len(fractals)):
-        if fractals[i].direction == fractals[i-1].direction:
-            alternancia_correcta = False
-            print(f"[WARNING] Alternancia incorrecta en índices {fractals[i-1].index} y {fractals[i].index}")
+    repeated = np.flatnonzero(directions[1:] == directions[:-1])
+    for i in repeated:
+        print(f"[WARNING] Alternancia incorrecta en índices {df.index[positions[i]]} y {df.index[positions[i + 1]]}")
 
-    if alternancia_correcta and len(fractals) > 1:
+    if len(repeated) == 0 and len(positions) > 1:
         print(f"[OK] Alternancia correcta verificada")
 
     # Convertir a DataFrame
-    data = []
-    for f in fractals:
-        tipo = "PICO" if f.direction == ZigzagDirection.UP else "VALLE"
-        data.append({
-            'timestamp': f.timestamp,
-            'price': f.price,
-            'type': tipo,
-            'direction': f.direction.value,
-            'tag': tag
-        })
+    is_peak = directions == 1
+    return pd.DataFrame({
+        'timestamp': df['timestamp'].iloc[positions].to_numpy(),
+        'price': prices,
+        'type': np.where(is_peak, "PICO", "VALLE"),
+        'direction': np.where(is_peak, ZigzagDirection.UP.value, ZigzagDirection.DOWN.value),
+        'tag': tag
+    })
+
+
+def detect_fractals(df: pd.DataFrame, min_change_pct: float, tag: str) -> pd.DataFrame:
+    """
+    Detecta fractales en los datos OHLC (kernel zigzag_pivots, mismos puntos que UnifiedZigzagDetector)
 
-    return pd.DataFrame(data)
+    Args:
+        df: DataFrame con columnas timestamp, open, high, low, close
+        min_change_pct: Cambio mínimo en porcentaje
+        tag: 'major' o 'minor'
+
+    Returns:
+        DataFrame con fractales detectados
+    """
+    print(f"\n[INFO] Detectando fractales {tag.upper()} (min_change={min_change_pct:.3f}%)...")
+
+    return _fractals_frame(df, zigzag_pivots(df['high'], df['low'], min_change_pct), tag)
+
+
+def detect_fractals_multi(df: pd.DataFrame, levels: dict) -> dict:
+    """
+    Detecta fractales de varios umbrales con un solo recorrido de las barras (zigzag_pivots_multi)
+
+    Args:
+        df: DataFrame con columnas timestamp, open, high, low, close
+        levels: {tag: min_change_pct}, p.ej. {'minor': 0.10, 'major': 0.20, 'pct_0.50': 0.50}
+
+    Returns:
+        {tag: DataFrame con fractales detectados} (mismo formato que detect_fractals)
+    """
+    tags = list(levels)
+    print(f"\n[INFO] Detectando fractales {', '.join(t.upper() for t in tags)} en una pasada "
+          f"(min_change={', '.join(f'{levels[t]:.3f}%' for t in tags)})...")
+
+    pivots = zigzag_pivots_multi(df['high'], df['low'], [levels[t] for t in tags])
+    return {tag: _fractals_frame(df, level_pivots, tag) for tag, level_pivots in zip(tags, pivots)}
 
 
 def load_nq_tick_data(date_str: str) -> pd.DataFrame:
     """
-    Carga datos de time_and_sales para NQ desde archivo CSV
-    Formato: time_and_sales_nq_YYYYMMDD.csv
-    Columnas: Timestamp;Precio;Volumen;Lado;Bid;Ask (o minúsculas)
+    Carga datos de time_and_sales para NQ
+    Lee del tick store (.npy, ver tick_store.py) si existe un fichero convertido al día
+    y solo cae al CSV time_and_sales_nq_YYYYMMDD.csv (o a su versión comprimida .csv.zst,
+    .csv.gz, .parquet) en caso contrario.
+    Columnas CSV: Timestamp;Precio;Volumen;Lado;Bid;Ask (o minúsculas)
 
     Args:
         date_str: Fecha en formato YYYYMMDD
 
     Returns:
-        DataFrame con datos de ticks (columnas normalizadas: Timestamp, Precio, Volumen)
+        DataFrame con datos de ticks (columnas normalizadas: timestamp, price/precio, volume, lado, bid, ask)
     """
-    csv_path = DATA_DIR / f"time_and_sales_nq_{date_str}.csv"
+    csv_path = tick_source_path(date_str)
 
-    if not csv_path.exists():
-        print(f"[ERROR] No se encontró el archivo: {csv_path}")
+    if has_store(date_str):
+        source_path = store_path_for(date_str)
+    elif csv_path is not None:
+        source_path = csv_path
+    else:
+        print(f"[ERROR] No se encontró el archivo: {csv_path_for(date_str)}")
         return None
 
-    print(f"[INFO] Cargando datos de tick desde {csv_path}")
+    print(f"[INFO] Cargando datos de tick desde {source_path}")
 
     try:
-        # Leer CSV sin parse_dates para evitar errores
-        df = pd.read_csv(
-            csv_path,
-            sep=';',
-            decimal=','
-        )
-
-        # Normalizar nombres de columnas a MINÚSCULAS (formato estándar Python)
-        column_mapping = {}
-        for col in df.columns:
-            col_lower = col.lower()
-            if col_lower == 'timestamp':
-                column_mapping[col] = 'timestamp'
-            elif col_lower == 'precio':
-                column_mapping[col] = 'precio'
-            elif col_lower in ('volumen', 'volume'):
-                column_mapping[col] = 'volume'
-            elif col_lower == 'lado':
-                column_mapping[col] = 'lado'
-            elif col_lower == 'bid':
-                column_mapping[col] = 'bid'
-            elif col_lower == 'ask':
-                column_mapping[col] = 'ask'
-
-        df.rename(columns=column_mapping, inplace=True)
-
-        # Convertir timestamp a datetime
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        if source_path == csv_path:
+            df = read_tick_source(csv_path)
+        else:
+            df = load_tick_frame(date_str)
 
+        price_col = price_column(df)
         print(f"[OK] Cargados {len(df):,} ticks")
         print(f"[INFO] Rango temporal: {df['timestamp'].min()} -> {df['timestamp'].max()}")
-        print(f"[INFO] Rango de precios: {df['precio'].min():.2f} -> {df['precio'].max():.2f}")
+        print(f"[INFO] Rango de precios: {df[price_col].min():.2f} -> {df[price_col].max():.2f}")
 
         return df
 
     except Exception as e:
-        print(f"[ERROR] Error al cargar {csv_path}: {e}")
+        print(f"[ERROR] Error al cargar {source_path}: {e}")
         return None
 
 
-def aggregate_ticks_to_ohlc(df_ticks: pd.DataFrame, timeframe: str = '1min') -> pd.DataFrame:
+def _timeframe_to_ns(timeframe: str) -> int:
+    """Convierte un timeframe de pandas ('1min', '5min', '1h') a nanosegundos"""
+    return int(pd.to_timedelta(pd.tseries.frequencies.to_offset(timeframe)).value)
+
+
+def _time_buckets(ts: np.ndarray, step: int) -> Tuple[int, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Agrupa timestamps ordenados (int64 ns) en intervalos de `step` ns con el mismo
+    origen que resample (origin='start_day': medianoche del primer timestamp)
+
+    Returns:
+        (origin, bucket de cada fila, inicio de cada grupo, fin de cada grupo)
+    """
+    day_ns = 86_400 * 10**9
+    origin = ts[0] - ts[0] % day_ns
+    bucket = (ts - origin) // step
+
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(bucket)) + 1))
+    ends = np.concatenate((starts[1:], [len(ts)]))
+    return origin, bucket, starts, ends
+
+
+def _tick_arrays(df_ticks, order_flow: bool = False) -> dict:
+    """
+    Columnas de ticks ordenadas por tiempo, a partir de un array TICK_DTYPE (vistas sin
+    copia si ya está ordenado) o de un DataFrame de ticks:
+        ts (int64 ns), price (ticks int32), volume
+        + lado (int8: 1=ASK, -1=BID, 0=desconocido), bid, ask (ticks) si order_flow
+    """
+    if isinstance(df_ticks, np.ndarray):
+        cols = {
+            'ts': df_ticks['timestamp'],
+            'price': df_ticks['price'],
+            'volume': df_ticks['volume'],
+        }
+        if order_flow:
+            cols.update(lado=df_ticks['lado'], bid=df_ticks['bid'], ask=df_ticks['ask'])
+    else:
+        cols = {
+            'ts': df_ticks['timestamp'].to_numpy(dtype='datetime64[ns]').view('i8'),
+            'price': points_to_ticks(df_ticks[price_column(df_ticks)]),
+            'volume': df_ticks['volume'].to_numpy(),
+        }
+        if order_flow:
+            lado = df_ticks['lado'].astype(str).str.upper() if 'lado' in df_ticks.columns else None
+            cols['lado'] = (lado.map(LADO_TO_CODE).fillna(0).to_numpy(dtype='i1')
+                            if lado is not None else np.zeros(len(df_ticks), dtype='i1'))
+            for col in ('bid', 'ask'):
+                cols[col] = (points_to_ticks(df_ticks[col]) if col in df_ticks.columns
+                             else np.full(len(df_ticks), NO_PRICE, dtype=np.int32))
+
+    # resample() ordena por timestamp; solo reordenamos si hace falta (implica copia)
+    ts = cols['ts']
+    if np.any(ts[1:] < ts[:-1]):
+        order = np.argsort(ts, kind='stable')
+        cols = {key: values[order] for key, values in cols.items()}
+
+    return cols
+
+
+def _ohlcv_from_groups(cols: dict, starts: np.ndarray, ends: np.ndarray, compact: bool) -> dict:
+    """
+    Columnas open/high/low/close/volume/price_volume de los grupos de ticks [starts, ends).
+    El OHLC se calcula en ticks enteros y se pasa a puntos al final (salvo compact=True).
+    price_volume = Σ(precio·volumen) de los trades de la barra, exacto en int64 (ticks·contratos).
+
+    Si cols trae lado/bid/ask (order flow), añade en la misma pasada:
+        buy_volume, sell_volume  volumen agresor comprador (ASK) / vendedor (BID)
+        delta, cum_delta         buy - sell por barra y acumulado
+        trade_count              número de ticks
+        avg_spread               ask - bid medio en puntos (NaN si la barra no tiene cotizaciones)
+    """
+    price = cols['price']
+    volume = cols['volume']
+
+    bars = {
+        'open': price[starts],
+        'high': np.maximum.reduceat(price, starts),
+        'low': np.minimum.reduceat(price, starts),
+        'close': price[ends - 1],
+    }
+    price_volume = np.add.reduceat(price.astype(np.int64) * volume, starts, dtype=np.int64)
+    if compact:
+        bars['volume'] = np.add.reduceat(volume, starts, dtype=np.uint64).astype(np.uint32)
+        bars[PRICE_VOLUME_COLUMN] = price_volume
+    else:
+        bars = {col: ticks_to_points(values) for col, values in bars.items()}
+        bars['volume'] = np.add.reduceat(volume, starts, dtype=np.int64)
+        bars[PRICE_VOLUME_COLUMN] = price_volume * TICK_SIZE
+
+    if 'lado' in cols:
+        lado = cols['lado']
+        buy = np.add.reduceat(np.where(lado > 0, volume, 0), starts, dtype=np.int64)
+        sell = np.add.reduceat(np.where(lado < 0, volume, 0), starts, dtype=np.int64)
+
+        has_quote = (cols['bid'] != NO_PRICE) & (cols['ask'] != NO_PRICE)
+        spread = np.where(has_quote, cols['ask'].astype(np.int64) - cols['bid'], 0)
+        spread_sum = np.add.reduceat(spread, starts, dtype=np.int64)
+        quote_count = np.add.reduceat(has_quote, starts, dtype=np.int64)
+
+        bars['buy_volume'] = buy
+        bars['sell_volume'] = sell
+        bars['delta'] = buy - sell
+        bars['cum_delta'] = np.cumsum(buy - sell)
+        bars['trade_count'] = ends - starts
+        with np.errstate(invalid='ignore', divide='ignore'):
+            bars['avg_spread'] = np.where(quote_count > 0, spread_sum / quote_count, np.nan) * TICK_SIZE
+
+    return bars
+
+
+def _aggregate_tick_array_to_ohlc(ticks, timeframe: str, compact: bool = False,
+                                  order_flow: bool = False) -> pd.DataFrame:
+    """
+    Agrega un array estructurado de ticks (TICK_DTYPE, p.ej. la vista de load_tick_view)
+    a barras OHLC sin pasar por un DataFrame de ticks (también acepta un DataFrame de ticks).
+
+    Lee las columnas timestamp/price/volume directamente de la vista (sin copiarlas)
+    y reproduce resample(timeframe).ohlc() + dropna(): mismas barras y mismo índice.
+    """
+    if len(ticks) == 0:
+        return pd.DataFrame(columns=['timestamp', 'open', 'high', 'low', 'close', 'volume', PRICE_VOLUME_COLUMN])
+
+    step = _timeframe_to_ns(timeframe)
+    cols = _tick_arrays(ticks, order_flow=order_flow)
+    origin, bucket, starts, ends = _time_buckets(cols['ts'], step)
+
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(origin + bucket[starts] * step),
+        **_ohlcv_from_groups(cols, starts, ends, compact),
+    }, index=bucket[starts] - bucket[0])
+
+
+def _tick_bar_starts(n: int, size: int) -> np.ndarray:
+    """Inicio de cada barra de `size` ticks"""
+    return np.arange(0, n, size)
+
+
+def _volume_bar_starts(volume: np.ndarray, size: int) -> np.ndarray:
+    """
+    Inicio de cada barra de volumen: una barra se cierra con el tick que hace que su
+    volumen acumulado alcance `size` (un tick grande no se reparte entre barras).
+    Se itera por barras con búsqueda binaria sobre el volumen acumulado.
+    """
+    size = max(1, int(size))  # Con size < 1 la búsqueda volvería al mismo tick y no avanzaría
+    cum = np.cumsum(volume, dtype=np.int64)
+    n = len(cum)
+    starts = []
+    i = 0
+    while i < n:
+        starts.append(i)
+        before = cum[i - 1] if i > 0 else 0
+        i = int(np.searchsorted(cum, before + size, side='left')) + 1
+    return np.asarray(starts, dtype=np.int64)
+
+
+def _range_bar_starts(price: np.ndarray, size_ticks: int) -> np.ndarray:
+    """
+    Inicio de cada barra de rango fijo: una barra se cierra con el tick que hace que
+    high - low >= size_ticks; el siguiente tick abre la barra siguiente.
+
+    El cierre depende del inicio de la barra, así que se itera por barras (no por ticks):
+    para cada barra se buscan los extremos acumulados sobre una ventana que se duplica
+    hasta encontrar el cierre, todo ello vectorizado.
+    """
+    n = len(price)
+    starts = []
+    i = 0
+    window = max(64, size_ticks * 4)
+    while i < n:
+        starts.append(i)
+        j = n
+        w = window
+        while True:
+            segment = price[i:i + w]
+            width = np.maximum.accumulate(segment) - np.minimum.accumulate(segment)
+            hit = np.flatnonzero(width >= size_ticks)
+            if len(hit) > 0:
+                j = i + hit[0] + 1
+                break
+            if i + w >= n:
+                break
+            w *= 2
+        i = j
+    return np.asarray(starts, dtype=np.int64)
+
+
+def _aggregate_ticks_to_bars(df_ticks, bar_type: str, bar_size, compact: bool = False,
+                             order_flow: bool = False) -> pd.DataFrame:
+    """
+    Barras de actividad (no temporales) a partir de ticks:
+        'tick'   -> una barra cada bar_size ticks
+        'volume' -> una barra cada bar_size contratos
+        'range'  -> una barra cada vez que high - low alcanza bar_size puntos
+    El timestamp de cada barra es el de su primer tick.
+    """
+    cols = _tick_arrays(df_ticks, order_flow=order_flow)
+    n = len(cols['ts'])
+    if n == 0:
+        return pd.DataFrame(columns=['timestamp', 'open', 'high', 'low', 'close', 'volume', PRICE_VOLUME_COLUMN])
+
+    if bar_type == 'tick':
+        starts = _tick_bar_starts(n, int(bar_size))
+    elif bar_type == 'volume':
+        starts = _volume_bar_starts(cols['volume'], int(bar_size))
+    elif bar_type == 'range':
+        starts = _range_bar_starts(cols['price'], max(1, int(round(bar_size / TICK_SIZE))))
+    else:
+        raise ValueError(f"bar_type debe ser 'time', 'tick', 'volume' o 'range', no '{bar_type}'")
+
+    ends = np.concatenate((starts[1:], [n]))
+
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(cols['ts'][starts]),
+        **_ohlcv_from_groups(cols, starts, ends, compact),
+    })
+
+
+def compact_bars(df_ohlc: pd.DataFrame) -> pd.DataFrame:
+    """
+    Versión compacta de un DataFrame OHLC: precios en ticks int32, volumen uint32 y
+    price_volume en ticks·contratos int64
+    (ver tick_store.points_to_ticks / ticks_to_points para volver a puntos)
+    """
+    df_compact = df_ohlc.copy()
+    for col in ('open', 'high', 'low', 'close'):
+        df_compact[col] = points_to_ticks(df_ohlc[col])
+    df_compact['volume'] = df_ohlc['volume'].to_numpy(dtype=np.uint32)
+    if PRICE_VOLUME_COLUMN in df_ohlc.columns:
+        df_compact[PRICE_VOLUME_COLUMN] = np.rint(
+            df_ohlc[PRICE_VOLUME_COLUMN].to_numpy(dtype=np.float64) / TICK_SIZE).astype(np.int64)
+    return df_compact
+
+
+def aggregate_ticks_to_ohlc(df_ticks, timeframe: str = '1min', compact: bool = False,
+                            bar_type: str = 'time', bar_size: Optional[float] = None,
+                            order_flow: bool = False) -> pd.DataFrame:
     """
     Agrega datos de tick a barras OHLC
 
     Args:
-        df_ticks: DataFrame con datos de tick (columnas: timestamp, precio, volume)
-        timeframe: Timeframe para agregación (ej: '1min', '5min', '1H')
+        df_ticks: DataFrame con datos de tick (columnas: timestamp, price/precio, volume)
+                  o array estructurado TICK_DTYPE (p.ej. vista memory-mapped de load_tick_view)
+        timeframe: Timeframe para agregación (ej: '1min', '5min', '1H'), solo con bar_type='time'
+        compact: Si True, precios en ticks int32 y volumen uint32 (ver compact_bars)
+        bar_type: 'time' (default), 'tick' (N ticks), 'volume' (N contratos) o 'range' (N puntos)
+        bar_size: Tamaño de barra para bar_type 'tick', 'volume' o 'range'
+        order_flow: Si True, añade buy_volume, sell_volume, delta, cum_delta, trade_count
+                    y avg_spread calculados en la misma pasada (requiere lado/bid/ask)
 
     Returns:
-        DataFrame con OHLC (timestamp, open, high, low, close, volume)
+        DataFrame con OHLC (timestamp, open, high, low, close, volume, price_volume [+ order flow]).
+        price_volume = Σ(precio·volumen) de los trades de la barra: price_volume / volume es
+        el VWAP exacto de la barra (ver calculate_vwap con source='tick')
     """
-    print(f"[INFO] Agregando ticks a barras OHLC ({timeframe})")
+    if bar_type != 'time':
+        if not bar_size or bar_size <= 0:
+            raise ValueError(f"bar_size debe ser > 0 para bar_type='{bar_type}'")
+        if bar_type in ('tick', 'volume') and (bar_size < 1 or bar_size != int(bar_size)):
+            raise ValueError(f"bar_size debe ser un entero >= 1 para bar_type='{bar_type}', no {bar_size}")
+        print(f"[INFO] Agregando ticks a barras OHLC ({bar_type} {bar_size})")
+        df_ohlc = _aggregate_ticks_to_bars(df_ticks, bar_type, bar_size, compact=compact,
+                                           order_flow=order_flow)
+    elif isinstance(df_ticks, np.ndarray) or order_flow:
+        print(f"[INFO] Agregando ticks a barras OHLC ({timeframe})")
+        df_ohlc = _aggregate_tick_array_to_ohlc(df_ticks, timeframe, compact=compact,
+                                                order_flow=order_flow)
+    else:
+        print(f"[INFO] Agregando ticks a barras OHLC ({timeframe})")
 
-    # Establecer timestamp como índice
-    df_ticks = df_ticks.copy()
-    df_ticks.set_index('timestamp', inplace=True)
+        # Establecer timestamp como índice
+        df_ticks = df_ticks.copy()
+        df_ticks.set_index('timestamp', inplace=True)
 
-    # Agregar a OHLC
-    ohlc = df_ticks['precio'].resample(timeframe).ohlc()
-    volume = df_ticks['volume'].resample(timeframe).sum()
+        # Agregar a OHLC
+        prices = df_ticks[price_column(df_ticks)]
+        ohlc = prices.resample(timeframe).ohlc()
+        volume = df_ticks['volume'].resample(timeframe).sum()
+        price_volume = (prices * df_ticks['volume']).resample(timeframe).sum()
 
-    # Combinar OHLC y volumen
-    df_ohlc = pd.concat([ohlc, volume], axis=1)
-    df_ohlc.columns = ['open', 'high', 'low', 'close', 'volume']
+        # Combinar OHLC, volumen y Σ(precio·volumen)
+        df_ohlc = pd.concat([ohlc, volume, price_volume], axis=1)
+        df_ohlc.columns = ['open', 'high', 'low', 'close', 'volume', PRICE_VOLUME_COLUMN]
 
-    # Reset index para tener timestamp como columna
-    df_ohlc.reset_index(inplace=True)
+        # Reset index para tener timestamp como columna
+        df_ohlc.reset_index(inplace=True)
 
-    # Eliminar filas con NaN (periodos sin trades)
-    df_ohlc = df_ohlc.dropna()
+        # Eliminar filas con NaN (periodos sin trades)
+        df_ohlc = df_ohlc.dropna()
+
+        if compact:
+            df_ohlc = compact_bars(df_ohlc)
 
     print(f"[OK] Generadas {len(df_ohlc):,} barras OHLC")
     print(f"[INFO] Rango temporal: {df_ohlc['timestamp'].min()} -> {df_ohlc['timestamp'].max()}")
@@ -371,31 +851,230 @@ def aggregate_ticks_to_ohlc(df_ticks: pd.DataFrame, timeframe: str = '1min') ->
     return df_ohlc
 
 
-def load_date_range(start_date: str, end_date: str) -> pd.DataFrame:
+def resample_bars(df_bars: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    """
+    Deriva barras de un timeframe superior a partir de barras OHLC ya construidas
+    (p.ej. 1min -> 5min/15min/1h) sin volver a los ticks.
+    El resultado coincide con aggregate_ticks_to_ohlc(ticks, timeframe) siempre que
+    timeframe sea múltiplo del timeframe de df_bars.
+
+    Args:
+        df_bars: DataFrame OHLC (timestamp, open, high, low, close, volume)
+        timeframe: Timeframe destino (ej: '5min', '15min', '1h')
+
+    Returns:
+        DataFrame OHLC en el timeframe destino
+    """
+    if df_bars.empty:
+        return df_bars.copy()
+
+    ts = df_bars['timestamp'].to_numpy(dtype='datetime64[ns]').view('i8')
+    origin, bucket, starts, ends = _time_buckets(ts, _timeframe_to_ns(timeframe))
+
+    high = df_bars['high'].to_numpy()
+    low = df_bars['low'].to_numpy()
+    volume = df_bars['volume'].to_numpy()
+
+    bars = {
+        'timestamp': pd.to_datetime(origin + bucket[starts] * _timeframe_to_ns(timeframe)),
+        'open': df_bars['open'].to_numpy()[starts],
+        'high': np.maximum.reduceat(high, starts),
+        'low': np.minimum.reduceat(low, starts),
+        'close': df_bars['close'].to_numpy()[ends - 1],
+        'volume': np.add.reduceat(volume, starts),
+    }
+    if PRICE_VOLUME_COLUMN in df_bars.columns:
+        bars[PRICE_VOLUME_COLUMN] = np.add.reduceat(df_bars[PRICE_VOLUME_COLUMN].to_numpy(), starts)
+
+    # Columnas de order flow: sumas por grupo, delta acumulado recalculado
+    # y spread medio ponderado por número de trades
+    if all(col in df_bars.columns for col in ORDER_FLOW_COLUMNS):
+        for col in ('buy_volume', 'sell_volume', 'delta'):
+            bars[col] = np.add.reduceat(df_bars[col].to_numpy(), starts)
+        bars['cum_delta'] = np.cumsum(bars['delta'])
+        bars['trade_count'] = np.add.reduceat(df_bars['trade_count'].to_numpy(), starts)
+
+        count = df_bars['trade_count'].to_numpy()
+        spread = df_bars['avg_spread'].to_numpy()
+        has_spread = ~np.isnan(spread)
+        weight = np.add.reduceat(np.where(has_spread, count, 0), starts)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            bars['avg_spread'] = np.where(
+                weight > 0,
+                np.add.reduceat(np.where(has_spread, spread * count, 0.0), starts) / weight,
+                np.nan
+            )
+
+    return pd.DataFrame(bars, index=bucket[starts] - bucket[0])
+
+
+def bar_cache_variant() -> str:
     """
-    Carga datos de NQ para una fecha (o rango si se expande en el futuro)
+    Variante de caché de las barras de load_day_bars según las columnas que incluyen
+    y la validación aplicada a los ticks (flag y umbrales), para que cambiar
+    VALIDATE_TICKS o TICK_MAX_* invalide las barras cacheadas
+    """
+    variant = 'pv+orderflow' if BAR_ORDER_FLOW else 'pv'
+    if VALIDATE_TICKS:
+        return f"{variant}+val{TICK_MAX_DEVIATION_PCT:g}-{TICK_MAX_JUMP_POINTS:g}"
+    return f"{variant}+raw"
+
+
+def load_day_bars(date_str: str, timeframe: str = BASE_TIMEFRAME) -> pd.DataFrame:
+    """
+    Carga las barras OHLC de un único día
+    Si el día está en el tick store, lo abre como vista memory-mapped (zero-copy)
+    y agrega directamente desde la vista, sin construir el DataFrame de ticks.
+    Los timeframes múltiplos de BASE_TIMEFRAME (5min, 15min, 1h...) se derivan de las
+    barras base (resample_bars), de modo que los ticks se recorren una sola vez por día.
+    Con USE_BAR_CACHE las barras de cada timeframe se guardan en outputs/cache/bars/
+    y se reutilizan mientras el fichero de ticks no cambie (ver bar_cache.py).
+    Las barras incluyen price_volume (Σ precio·volumen de los trades, para el VWAP exacto)
+    y, con BAR_ORDER_FLOW, las columnas de ORDER_FLOW_COLUMNS.
+    Con VALIDATE_TICKS los ticks inválidos se descartan antes de agregar (ver tick_validation.py).
+    Con INCREMENTAL_INGEST el día DATE (CSV que sigue creciendo) se lee con live_ingest:
+    solo se parsean las líneas nuevas y no se usa la caché de barras (su propio estado
+    en outputs/cache/live/ ya se actualiza en cada llamada).
+
+    Args:
+        date_str: Fecha en formato YYYYMMDD
+        timeframe: Timeframe de las barras (default: '1min')
+
+    Returns:
+        DataFrame con OHLC (timestamp, open, high, low, close, volume, price_volume [+ order flow]) o None
+    """
+    variant = bar_cache_variant()
+    live = INCREMENTAL_INGEST and date_str == DATE and csv_path_for(date_str).exists()
+    use_cache = USE_BAR_CACHE and not live
+
+    # Barras ya cacheadas para la versión actual del fichero de ticks
+    if use_cache:
+        df_ohlc = load_cached_bars(date_str, timeframe, variant=variant)
+        if df_ohlc is not None:
+            print(f"[OK] {len(df_ohlc):,} barras OHLC ({timeframe}) desde caché")
+            return df_ohlc
+
+    step = _timeframe_to_ns(timeframe)
+    base_step = _timeframe_to_ns(BASE_TIMEFRAME)
+
+    if step != base_step and step % base_step == 0:
+        # Nivel superior de la pirámide: derivar de las barras base
+        df_base = load_day_bars(date_str, BASE_TIMEFRAME)
+        if df_base is None:
+            return None
+        df_ohlc = resample_bars(df_base, timeframe)
+        print(f"[OK] {len(df_ohlc):,} barras OHLC ({timeframe}) derivadas de {BASE_TIMEFRAME}")
+    elif live:
+        # Día en curso: parsear solo lo añadido al CSV desde la última ejecución
+        from live_ingest import update_day_bars
+        df_ohlc = update_day_bars(date_str, timeframe, order_flow=BAR_ORDER_FLOW)
+        if df_ohlc is None:
+            return None
+        print(f"[OK] {len(df_ohlc):,} barras OHLC ({timeframe}) por ingesta incremental")
+    else:
+        # Cargar datos de tick (vista memory-mapped si hay store, DataFrame desde CSV si no)
+        ticks = load_tick_view(date_str)
+        if ticks is not None:
+            print(f"[INFO] Memory-map de ticks desde {store_path_for(date_str)} ({len(ticks):,} ticks)")
+        else:
+            ticks = load_nq_tick_data(date_str)
+            if ticks is None:
+                return None
+
+        # Descartar ticks inválidos (cuarentena + informe de calidad en el catálogo)
+        if VALIDATE_TICKS:
+            if isinstance(ticks, pd.DataFrame):
+                ticks = frame_to_array(ticks)
+            ticks = clean_tick_array(ticks, date_str)
+
+        df_ohlc = aggregate_ticks_to_ohlc(ticks, timeframe=timeframe, order_flow=BAR_ORDER_FLOW)
+
+    if use_cache:
+        save_cached_bars(date_str, timeframe, df_ohlc, variant=variant)
+
+    return df_ohlc
+
+
+def load_day_bar_pyramid(date_str: str, timeframes: Optional[List[str]] = None) -> Optional[dict]:
+    """
+    Construye (o lee de caché) todos los niveles de la pirámide de timeframes de un día
+    con una sola pasada por los ticks (la del timeframe base)
+
+    Args:
+        date_str: Fecha en formato YYYYMMDD
+        timeframes: Lista de timeframes (default: BAR_PYRAMID_TIMEFRAMES)
+
+    Returns:
+        dict {timeframe: DataFrame OHLC} o None si no hay datos
+    """
+    pyramid = {}
+    for timeframe in (timeframes or BAR_PYRAMID_TIMEFRAMES):
+        df_ohlc = load_day_bars(date_str, timeframe)
+        if df_ohlc is None:
+            return None
+        pyramid[timeframe] = df_ohlc
+    return pyramid
+
+
+def iter_day_bars(start_date: str, end_date: str, timeframe: str = '1min') -> Iterator[Tuple[str, pd.DataFrame]]:
+    """
+    Recorre bajo demanda los días disponibles en [start_date, end_date]
+    Cada bloque diario se carga (o se lee de caché) solo cuando se pide, de modo que
+    nunca hay más de un día de ticks en memoria.
+
+    Yields:
+        (fecha YYYYMMDD, DataFrame OHLC del día)
+    """
+    for date_str in catalog_dates(start_date, end_date):
+        df_day = load_day_bars(date_str, timeframe)
+        if df_day is not None and not df_day.empty:
+            yield date_str, df_day
+
+
+def load_date_range(start_date: str, end_date: str, warmup: int = 0) -> pd.DataFrame:
+    """
+    Carga datos de NQ para una fecha o un rango de fechas
+    Un día suelto se devuelve tal cual (load_day_bars). Para un rango, concatena
+    los bloques de barras de cada día disponible, cargados uno a uno.
+    Con USE_SESSION_BARS las fechas son sesiones Globex en lugar de días naturales
+    (ver sessions.py).
 
     Args:
         start_date: Fecha en formato YYYYMMDD
         end_date: Fecha en formato YYYYMMDD
+        warmup: Barras previas a start_date a anteponer para calentar indicadores
+                (marcadas con warmup=True; eliminarlas con sessions.strip_warmup)
 
     Returns:
         DataFrame con OHLC (timestamp, open, high, low, close, volume)
     """
-    print(f"\n[INFO] Cargando datos NQ para fecha: {start_date}")
+    if USE_SESSION_BARS:
+        from sessions import load_session_range
+        print(f"\n[INFO] Cargando sesiones NQ: {start_date} -> {end_date}")
+        return load_session_range(start_date, end_date, warmup=warmup)
 
-    # Para este proyecto, solo procesamos una fecha única
-    if start_date != end_date:
-        print(f"[WARNING] Este proyecto está configurado para una fecha única")
-        print(f"[INFO] Procesando solo {start_date}")
+    if start_date == end_date:
+        print(f"\n[INFO] Cargando datos NQ para fecha: {start_date}")
+        df_ohlc = load_day_bars(start_date)
+    else:
+        dates = catalog_dates(start_date, end_date)
+        print(f"\n[INFO] Cargando datos NQ para rango: {start_date} -> {end_date} ({len(dates)} días disponibles)")
+        if not dates:
+            print(f"[ERROR] No hay datos en el rango {start_date} -> {end_date}")
+            return None
 
-    # Cargar datos de tick
-    df_ticks = load_nq_tick_data(start_date)
-    if df_ticks is None:
-        return None
+        blocks = [df_day for _, df_day in iter_day_bars(start_date, end_date)]
+        if not blocks:
+            return None
 
-    # Agregar a barras de 1 minuto
-    df_ohlc = aggregate_ticks_to_ohlc(df_ticks, timeframe='1min')
+        df_ohlc = pd.concat(blocks, ignore_index=True)
+
+        print(f"[OK] {len(df_ohlc):,} barras OHLC en {len(blocks)} días")
+        print(f"[INFO] Rango temporal: {df_ohlc['timestamp'].min()} -> {df_ohlc['timestamp'].max()}")
+
+    if df_ohlc is not None and warmup > 0:
+        from sessions import prepend_warmup
+        df_ohlc = prepend_warmup(df_ohlc, warmup)
 
     return df_ohlc
 
@@ -403,6 +1082,8 @@ def load_date_range(start_date: str, end_date: str) -> pd.DataFrame:
 def process_fractals_range(start_date: str, end_date: str) -> dict:
     """
     Procesa fractales para NQ
+    MINOR, MAJOR y los umbrales de MIN_CHANGE_PCT_EXTRA se detectan en un solo recorrido
+    de las barras (detect_fractals_multi); cada nivel se guarda en su propio CSV.
 
     Args:
         start_date: Fecha en formato YYYYMMDD
@@ -414,9 +1095,14 @@ def process_fractals_range(start_date: str, end_date: str) -> dict:
     print("="*70)
     print("DETECCIÓN DE FRACTALES - NQ (Nasdaq Futures)")
     print("="*70)
-    print(f"\nFecha: {start_date}")
+    if start_date == end_date:
+        print(f"\nFecha: {start_date}")
+    else:
+        print(f"\nRango: {start_date} -> {end_date}")
     print(f"Minor threshold: {MIN_CHANGE_PCT_MINOR}%")
     print(f"Major threshold: {MIN_CHANGE_PCT_MAJOR}%")
+    if MIN_CHANGE_PCT_EXTRA:
+        print(f"Extra thresholds: {', '.join(f'{pct}%' for pct in MIN_CHANGE_PCT_EXTRA)}")
     print("-"*70)
 
     # Cargar datos del rango
@@ -431,11 +1117,12 @@ def process_fractals_range(start_date: str, end_date: str) -> dict:
         print(f"[ERROR] Faltan columnas: {missing}")
         return None
 
-    # Detectar fractales MINOR
-    df_fractals_minor = detect_fractals(df, MIN_CHANGE_PCT_MINOR, 'minor')
-
-    # Detectar fractales MAJOR
-    df_fractals_major = detect_fractals(df, MIN_CHANGE_PCT_MAJOR, 'major')
+    # Detectar fractales MINOR, MAJOR y niveles extra en un solo recorrido de las barras
+    levels = {'minor': MIN_CHANGE_PCT_MINOR, 'major': MIN_CHANGE_PCT_MAJOR}
+    levels.update({f"pct_{pct:g}": pct for pct in MIN_CHANGE_PCT_EXTRA})
+    df_fractals_levels = detect_fractals_multi(df, levels)
+    df_fractals_minor = df_fractals_levels['minor']
+    df_fractals_major = df_fractals_levels['major']
 
     # Crear directorio de salida
     FRACTALS_DIR.mkdir(parents=True, exist_ok=True)
@@ -448,11 +1135,12 @@ def process_fractals_range(start_date: str, end_date: str) -> dict:
         date_range_str = start_date
     else:
         date_range_str = f"{start_date}_{end_date}"
-    output_minor = FRACTALS_DIR / f"{symbol}_fractals_minor_{date_range_str}.csv"
-    output_major = FRACTALS_DIR / f"{symbol}_fractals_major_{date_range_str}.csv"
+    level_paths = {tag: FRACTALS_DIR / f"{symbol}_fractals_{tag}_{date_range_str}.csv" for tag in levels}
+    output_minor = level_paths['minor']
+    output_major = level_paths['major']
 
-    df_fractals_minor.to_csv(output_minor, index=False)
-    df_fractals_major.to_csv(output_major, index=False)
+    for tag, df_level in df_fractals_levels.items():
+        df_level.to_csv(level_paths[tag], index=False)
 
     print("\n" + "="*70)
     print("RESUMEN")
@@ -462,6 +1150,10 @@ def process_fractals_range(start_date: str, end_date: str) -> dict:
     print(f"  - Guardado en: {output_minor}")
     print(f"Fractales MAJOR: {len(df_fractals_major)}")
     print(f"  - Guardado en: {output_major}")
+    for tag, pct in levels.items():
+        if tag not in ('minor', 'major'):
+            print(f"Fractales {pct}%: {len(df_fractals_levels[tag])}")
+            print(f"  - Guardado en: {level_paths[tag]}")
     print("="*70)
 
     return {
@@ -475,7 +1167,9 @@ def process_fractals_range(start_date: str, end_date: str) -> dict:
         'major_path': output_major,
         'df': df,
         'df_fractals_minor': df_fractals_minor,
-        'df_fractals_major': df_fractals_major
+        'df_fractals_major': df_fractals_major,
+        'df_fractals_levels': df_fractals_levels,
+        'level_paths': level_paths
     }
 
 
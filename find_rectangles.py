@@ -6,8 +6,7 @@ Find rectangles based on VWAP Slope crossovers
 - Top (y2): max price in range
 """
 import pandas as pd
-import numpy as np
-from config import VWAP_SLOPE_INDICATOR_HIGH_VALUE, VWAP_SLOPE_DEGREE_WINDOW, SQUARE_TALL_NARROW_THRESHOLD
+from config import VWAP_SLOPE_INDICATOR_HIGH_VALUE, SQUARE_TALL_NARROW_THRESHOLD
 
 
 def find_vwap_slope_rectangles(df):
@@ -36,18 +35,14 @@ def find_vwap_slope_rectangles(df):
     # Calculate VWAP Slope if not already present
     # IMPORTANT: Must use exact same calculation as plot_day.py for synchronization
     if 'vwap_slope' not in df.columns or df['vwap_slope'].isna().all():
-        from calculate_vwap import calculate_vwap
-        from config import VWAP_FAST
+        from feature_store import attach_features
 
+        # Slope from the shared feature store
+        # This MUST match plot_day.py calculation exactly (both read the same stored values)
+        columns = ['vwap_slope']
         if 'vwap_fast' not in df.columns or df['vwap_fast'].isna().all():
-            df['vwap_fast'] = calculate_vwap(df, period=VWAP_FAST)
-
-        # Calculate slope using rolling().apply() with strict window check
-        # This MUST match plot_day.py calculation exactly
-        df['vwap_slope'] = df['vwap_fast'].rolling(window=VWAP_SLOPE_DEGREE_WINDOW).apply(
-            lambda x: abs(np.polyfit(np.arange(len(x)), x, 1)[0]) if len(x) == VWAP_SLOPE_DEGREE_WINDOW else np.nan,
-            raw=False
-        )
+            columns.insert(0, 'vwap_fast')
+        attach_features(df, columns)
 
     # Debug: Print info about vwap_slope to verify it's being used correctly
     print(f"[INFO] VWAP Slope calculation: {df['vwap_slope'].notna().sum()} valid values out of {len(df)} bars")
@@ -6,10 +6,8 @@ REALTIME Rectangle Detection - Close GREEN/RED rectangles as soon as threshold i
 - Orange consolidation rectangles still require blue square completion
 """
 import pandas as pd
-import numpy as np
 from config import (
     VWAP_SLOPE_INDICATOR_HIGH_VALUE,
-    VWAP_SLOPE_DEGREE_WINDOW,
     SQUARE_TALL_NARROW_THRESHOLD,
     VWAP_SQUARE_MIN_SPIKE
 )
@@ -30,16 +28,13 @@ def find_vwap_slope_rectangles_realtime(df):
     """
     # Calculate VWAP Slope if not already present
     if 'vwap_slope' not in df.columns or df['vwap_slope'].isna().all():
-        from calculate_vwap import calculate_vwap
-        from config import VWAP_FAST
+        from feature_store import attach_features
 
+        # Slope from the shared feature store (same values as plot_day.py)
+        columns = ['vwap_slope']
         if 'vwap_fast' not in df.columns or df['vwap_fast'].isna().all():
-            df['vwap_fast'] = calculate_vwap(df, period=VWAP_FAST)
-
-        df['vwap_slope'] = df['vwap_fast'].rolling(window=VWAP_SLOPE_DEGREE_WINDOW).apply(
-            lambda x: abs(np.polyfit(np.arange(len(x)), x, 1)[0]) if len(x) == VWAP_SLOPE_DEGREE_WINDOW else np.nan,
-            raw=False
-        )
+            columns.insert(0, 'vwap_fast')
+        attach_features(df, columns)
 
     print(f"[INFO] REALTIME Rectangle Detection: {df['vwap_slope'].notna().sum()} valid VWAP slope values")
 
@@ -0,0 +1,138 @@
+"""
+Detección de Trend Divergence (orange dots)
+Un orange dot es el primer green dot (price ejection: |close - vwap_fast| / vwap_fast >
+PRICE_EJECTION_TRIGGER) después de que el cierre cruce vwap_fast. Tras el dot no hay otro
+hasta el siguiente cruce. El lado del dot (+1 por encima del VWAP, -1 por debajo) es el
+del cruce que lo armó.
+
+    find_trend_divergence_dots(df)  -> filas de df con dot (batch, vectorizado, sin iterrows)
+    TrendDivergenceDetector         -> mismo detector barra a barra con update(bar) (tiempo real)
+
+Ambos usan las columnas del almacén de indicadores (vwap_fast, price_ejection); si df no las
+tiene se obtienen con attach_features.
+"""
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from feature_store import attach_features
+from streaming_indicators import StreamingIndicator
+
+
+def _feature_arrays(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """close, vwap_fast y price_ejection de df (del almacén si faltan columnas, sin modificar df)"""
+    if 'vwap_fast' in df.columns and 'price_ejection' in df.columns:
+        features = df
+    else:
+        features = attach_features(df[['timestamp', 'high', 'low', 'close', 'volume']].copy(),
+                                   ['vwap_fast', 'price_ejection'])
+    return (df['close'].to_numpy(dtype=np.float64),
+            features['vwap_fast'].to_numpy(dtype=np.float64),
+            features['price_ejection'].to_numpy(dtype=bool))
+
+
+def trend_divergence_mask(close: np.ndarray, vwap_fast: np.ndarray,
+                          price_ejection: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Kernel sobre arrays
+
+    Returns:
+        (is_dot, side): máscara booleana de orange dots y lado del precio respecto a
+        vwap_fast tras el último cruce (+1 / -1, 0 antes del primer lado conocido)
+    """
+    n = len(close)
+    with np.errstate(invalid='ignore'):
+        side = np.sign(close - vwap_fast)
+    side = np.nan_to_num(side).astype(np.int8)
+
+    # Lado vigente: el último distinto de 0 (close == vwap_fast o VWAP sin calcular no cambian el lado)
+    known = side != 0
+    last_known = np.maximum.accumulate(np.where(known, np.arange(n), -1))
+    side = np.where(last_known >= 0, side[np.maximum(last_known, 0)], 0).astype(np.int8)
+
+    crossed = np.zeros(n, dtype=bool)
+    crossed[1:] = (side[1:] != side[:-1]) & (side[:-1] != 0)
+
+    # Un dot por cruce: el primer green dot de cada tramo entre cruces
+    episode = np.cumsum(crossed)
+    candidates = np.flatnonzero(price_ejection & (episode > 0))
+    first = np.ones(len(candidates), dtype=bool)
+    first[1:] = episode[candidates[1:]] != episode[candidates[:-1]]
+
+    is_dot = np.zeros(n, dtype=bool)
+    is_dot[candidates[first]] = True
+    return is_dot, side
+
+
+def find_trend_divergence_dots(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Orange dots (primer green dot después de cada cruce del cierre con vwap_fast)
+
+    Args:
+        df: DataFrame de barras (con timestamp/high/low/close/volume; vwap_fast y
+            price_ejection se toman de df si existen)
+
+    Returns:
+        Filas de df en las que hay orange dot (mismo índice), con la columna
+        divergence_side (+1 cruce al alza, -1 cruce a la baja)
+    """
+    close, vwap_fast, price_ejection = _feature_arrays(df)
+    is_dot, side = trend_divergence_mask(close, vwap_fast, price_ejection)
+    return df[is_dot].assign(divergence_side=side[is_dot])
+
+
+class TrendDivergenceDetector(StreamingIndicator):
+    """
+    Detector incremental: update(bar) con close, vwap_fast y price_ejection de la barra
+    devuelve True si la barra es un orange dot (mismo resultado que find_trend_divergence_dots)
+    """
+
+    columns = ('close', 'vwap_fast', 'price_ejection')
+
+    def __init__(self):
+        self.side = 0        # Lado vigente respecto a vwap_fast (+1 / -1, 0 = desconocido)
+        self.armed = False   # Ha habido un cruce y aún no se ha marcado su dot
+        self.value = False
+
+    def update(self, bar) -> bool:
+        close, vwap_fast = float(bar['close']), float(bar['vwap_fast'])
+        side = (close > vwap_fast) - (close < vwap_fast)   # 0 si son iguales o vwap_fast es NaN
+        if side != 0:
+            if self.side != 0 and side != self.side:
+                self.armed = True
+            self.side = side
+
+        self.value = bool(self.armed and bar['price_ejection'])
+        if self.value:
+            self.armed = False
+        return self.value
+
+    def replay(self, df: pd.DataFrame) -> np.ndarray:
+        """Alimenta todas las barras de df y devuelve la máscara de orange dots"""
+        close, vwap_fast, price_ejection = _feature_arrays(df)
+        return np.array([self.update({'close': c, 'vwap_fast': v, 'price_ejection': e})
+                         for c, v, e in zip(close, vwap_fast, price_ejection)], dtype=bool)
+
+
+if __name__ == "__main__":
+    from find_fractals import load_date_range
+    from config import START_DATE, END_DATE
+
+    print("="*70)
+    print("TEST: Trend Divergence (orange dots)")
+    print("="*70)
+    print(f"Periodo: {START_DATE} -> {END_DATE}")
+
+    df = load_date_range(START_DATE, END_DATE)
+    if df is None:
+        print("[ERROR] No se pudieron cargar datos")
+        exit(1)
+
+    dots = find_trend_divergence_dots(df)
+    streamed = TrendDivergenceDetector().replay(df)
+
+    print(dots[['timestamp', 'close', 'divergence_side']].to_string())
+    print(f"\nOrange dots: {len(dots)} de {len(df)} barras")
+    same = np.array_equal(np.flatnonzero(streamed), df.index.get_indexer(dots.index))
+    print(f"{'[OK]' if same else '[ERROR]'} Streaming {'idéntico' if same else 'DISTINTO'} al cálculo por lotes")
@@ -17,7 +17,7 @@ import plotly.io as pio
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config import (
-    DATA_DIR, OUTPUTS_DIR,
+    OUTPUTS_DIR,
     ENABLE_VWAP_MOMENTUM_STRATEGY, ENABLE_VWAP_SQUARE_STRATEGY,
     ENABLE_VWAP_CROSSOVER_STRATEGY, ENABLE_VWAP_PULLBACK_STRATEGY,
     USE_ALL_DAYS_AVAILABLE, ALL_DAYS_SEGMENT_START, ALL_DAYS_SEGMENT_END,
@@ -35,6 +35,7 @@ from config import (
     # Grid Entry System
     USE_ENTRY_GRID, GRID_STEP, NUMBER_OF_GRID_STEPS
 )
+from data_catalog import catalog_dates
 from show_config_dashboard import update_dashboard
 
 # Auto-update configuration dashboard
@@ -47,27 +48,14 @@ print("\n" + "="*80)
 print("ITERATION SCRIPT - SCANNING AVAILABLE DATES")
 print("="*80 + "\n")
 
-# Find all CSV files matching pattern time_and_sales_nq_YYYYMMDD.csv
-csv_files = list(DATA_DIR.glob("time_and_sales_nq_*.csv"))
-print(f"[INFO] Found {len(csv_files)} CSV files in data folder")
+# Available dates from the data catalog (data/catalog.json, refreshed incrementally)
+available_dates = catalog_dates()
+print(f"[INFO] Found {len(available_dates)} days in data catalog")
 
-if len(csv_files) == 0:
+if len(available_dates) == 0:
     print("[ERROR] No data files found")
     sys.exit(1)
 
-# Extract dates from filenames using regex
-date_pattern = re.compile(r"time_and_sales_nq_(\d{8})\.csv")
-available_dates = []
-
-for csv_file in csv_files:
-    match = date_pattern.search(csv_file.name)
-    if match:
-        date_str = match.group(1)
-        available_dates.append(date_str)
-
-# Sort dates chronologically
-available_dates.sort()
-
 print(f"[INFO] Extracted {len(available_dates)} dates")
 print(f"[INFO] Full date range: {available_dates[0]} to {available_dates[-1]}")
 
@@ -144,7 +132,6 @@ for i, date_str in enumerate(available_dates, 1):
             config_content = f.read()
 
         # Backup original DATE line
-        import re
         original_date_match = re.search(r'^DATE = "(\d{8})"', config_content, re.MULTILINE)
         if not original_date_match:
             print(f"[ERROR] Could not find DATE in config.py")
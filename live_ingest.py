@@ -0,0 +1,270 @@
+"""
+Ingesta incremental del CSV de time_and_sales del día en curso
+Mientras la sesión está abierta el grabador sigue añadiendo líneas a
+data/time_and_sales_nq_YYYYMMDD.csv; en lugar de releer y re-agregar el fichero
+completo en cada ejecución, se guarda en outputs/cache/live/:
+
+    live_{fecha}_{timeframe}.json         offset en bytes ya leído, cabecera, filas
+    live_{fecha}_{timeframe}.pkl          barras cerradas (se amplía en cada actualización)
+    live_{fecha}_{timeframe}_pending.npy  ticks de la barra abierta (TICK_DTYPE)
+    live_{fecha}_{timeframe}_context.npy  últimos VALIDATION_CONTEXT ticks sin validar
+
+En cada actualización solo se parsea la cola nueva del fichero (hasta el último
+salto de línea completo), se cierran las barras que ya han terminado y la barra
+abierta se recalcula con sus ticks pendientes. Sin VALIDATE_TICKS el resultado es
+idéntico a agregar el fichero completo con aggregate_ticks_to_ohlc. Con validación,
+cada cola se valida junto a los últimos VALIDATION_CONTEXT ticks ya leídos (mediana y
+vecino anterior), no junto al día completo: la mediana puede diferir ligeramente de la
+del fichero y el último tick de cada cola no se compara con el siguiente, así que junto
+a los cortes entre colas el conjunto de ticks descartados puede no coincidir exactamente.
+
+Si el fichero se trunca, cambia la cabecera o llega un tick anterior a la barra
+abierta, el estado se descarta y se reconstruye desde el principio.
+
+Uso:
+    python live_ingest.py [YYYYMMDD]           # Actualiza las barras del día (default: DATE)
+    python live_ingest.py [YYYYMMDD] --reset   # Descarta el estado y re-ingiere el fichero
+"""
+
+import os
+import sys
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Optional
+
+from config import DATE, LIVE_INGEST_DIR, BAR_ORDER_FLOW, VALIDATE_TICKS, TICK_QUARANTINE
+from tick_store import TICK_DTYPE, PRICE_VOLUME_COLUMN, csv_path_for, read_tick_csv_bytes, frame_to_array
+from tick_validation import validate_tick_array, flag_counts, write_quarantine
+from data_catalog import record_quality
+from find_fractals import BASE_TIMEFRAME, _aggregate_tick_array_to_ohlc, _timeframe_to_ns
+
+VALIDATION_CONTEXT = 10_000   # Ticks previos (sin validar) que acompañan a cada cola al validarla
+
+
+# =============================================================================
+# ESTADO
+# =============================================================================
+
+def _state_paths(date_str: str, timeframe: str) -> dict:
+    prefix = LIVE_INGEST_DIR / f"live_{date_str}_{timeframe}"
+    return {
+        'state': prefix.with_name(prefix.name + '.json'),
+        'bars': prefix.with_name(prefix.name + '.pkl'),
+        'pending': prefix.with_name(prefix.name + '_pending.npy'),
+        'context': prefix.with_name(prefix.name + '_context.npy'),
+    }
+
+
+def _new_state(csv_path: Path, header_line: str, order_flow: bool) -> dict:
+    return {
+        'csv_path': str(csv_path),
+        'header': header_line,
+        'order_flow': order_flow,
+        'offset': len(header_line.encode('utf-8')),
+        'rows': 0,
+        'last_timestamp': None,
+        'last_complete_bar': None,
+        'quality': None,
+    }
+
+
+def _load_state(paths: dict, csv_path: Path, header_line: str, order_flow: bool):
+    """
+    (estado, barras cerradas, ticks pendientes, contexto de validación) guardados, o un
+    estado nuevo si no existe o ya no corresponde al fichero (otra ruta/cabecera,
+    fichero truncado...)
+    """
+    empty = (_new_state(csv_path, header_line, order_flow), None,
+             np.empty(0, dtype=TICK_DTYPE), np.empty(0, dtype=TICK_DTYPE))
+    if not all(path.exists() for path in paths.values()):
+        return empty
+
+    try:
+        with open(paths['state'], 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        bars = pd.read_pickle(paths['bars'])
+        pending = np.load(paths['pending'])
+        context = np.load(paths['context'])
+    except (OSError, ValueError) as e:
+        print(f"[WARNING] Estado de ingesta ilegible, se reconstruye: {e}")
+        return empty
+
+    valid = (
+        state.get('csv_path') == str(csv_path)
+        and state.get('header') == header_line
+        and state.get('order_flow') == order_flow
+        and state.get('offset', 0) <= csv_path.stat().st_size
+        and pending.dtype == TICK_DTYPE
+        and context.dtype == TICK_DTYPE
+        and (len(bars) == 0 or PRICE_VOLUME_COLUMN in bars.columns)
+    )
+    if not valid:
+        print(f"[INFO] El fichero {csv_path.name} ha cambiado, se re-ingiere desde el principio")
+        return empty
+
+    return state, (bars if len(bars) else None), pending, context
+
+
+def _save_array(path: Path, array: np.ndarray) -> None:
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def _save_state(paths: dict, state: dict, bars: pd.DataFrame, pending: np.ndarray,
+                context: np.ndarray) -> None:
+    """
+    Guarda barras, ticks pendientes, contexto de validación y (al final) el estado;
+    cada fichero de forma atómica
+    """
+    LIVE_INGEST_DIR.mkdir(parents=True, exist_ok=True)
+
+    tmp_bars = paths['bars'].with_name(paths['bars'].name + '.tmp')
+    bars.to_pickle(tmp_bars)
+    os.replace(tmp_bars, paths['bars'])
+
+    _save_array(paths['pending'], pending)
+    _save_array(paths['context'], context)
+
+    tmp_state = paths['state'].with_name(paths['state'].name + '.tmp')
+    with open(tmp_state, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_state, paths['state'])
+
+
+def reset(date_str: str, timeframe: str = BASE_TIMEFRAME) -> None:
+    """Descarta el estado de ingesta de (día, timeframe)"""
+    for path in _state_paths(date_str, timeframe).values():
+        path.unlink(missing_ok=True)
+
+
+# =============================================================================
+# ACTUALIZACIÓN
+# =============================================================================
+
+def _clean_tail(date_str: str, state: dict, new_ticks: np.ndarray, context: np.ndarray) -> np.ndarray:
+    """
+    Valida los ticks nuevos junto a los últimos ticks ya leídos (context) y contra el
+    último timestamp ingerido, añade los descartes a la cuarentena del día y acumula
+    el informe de calidad en el estado y en el catálogo
+    """
+    flags = validate_tick_array(new_ticks, prev_timestamp=state['last_timestamp'], context=context)
+    bad = flags != 0
+
+    quality = state['quality'] or {'rows': 0, 'dropped': 0, 'flags': {}, 'quarantine': None}
+    quality['rows'] += int(len(new_ticks))
+    quality['dropped'] += int(np.count_nonzero(bad))
+    for name, n in flag_counts(flags).items():
+        quality['flags'][name] = quality['flags'].get(name, 0) + n
+
+    if bad.any():
+        print(f"[WARNING] {np.count_nonzero(bad):,} ticks inválidos descartados de {len(new_ticks):,}")
+        if TICK_QUARANTINE:
+            path = write_quarantine(date_str, new_ticks[bad], flags[bad], append=state['rows'] > 0)
+            quality['quarantine'] = str(path)
+
+    state['quality'] = quality
+    record_quality(date_str, quality)
+    return new_ticks[~bad] if bad.any() else new_ticks
+
+
+def update_day_bars(date_str: str, timeframe: str = BASE_TIMEFRAME,
+                    order_flow: bool = BAR_ORDER_FLOW) -> Optional[pd.DataFrame]:
+    """
+    Actualiza las barras de un día leyendo solo lo añadido al CSV desde la última llamada
+
+    Args:
+        date_str: Fecha en formato YYYYMMDD
+        timeframe: Timeframe de las barras (default: BASE_TIMEFRAME)
+        order_flow: Incluir columnas de order flow (ver aggregate_ticks_to_ohlc)
+
+    Returns:
+        DataFrame OHLC con las barras cerradas más la barra abierta, o None si no hay CSV
+    """
+    csv_path = csv_path_for(date_str)
+    if not csv_path.exists():
+        return None
+
+    paths = _state_paths(date_str, timeframe)
+    step = _timeframe_to_ns(timeframe)
+
+    with open(csv_path, 'rb') as f:
+        header_line = f.readline().decode('utf-8')
+        state, bars, pending, context = _load_state(paths, csv_path, header_line, order_flow)
+        f.seek(state['offset'])
+        tail = f.read()
+
+    # Solo líneas completas: una última línea a medio escribir se lee en la siguiente llamada
+    tail = tail[:tail.rfind(b'\n') + 1]
+    header = header_line.strip().split(';')
+    new_ticks = (frame_to_array(read_tick_csv_bytes(tail, header)) if tail.strip()
+                 else np.empty(0, dtype=TICK_DTYPE))
+
+    raw_ticks = new_ticks
+    if VALIDATE_TICKS and len(new_ticks):
+        new_ticks = _clean_tail(date_str, state, new_ticks, context)
+
+    # Un tick anterior a la barra abierta modificaría barras ya cerradas: reconstruir
+    if len(pending) and len(new_ticks) and new_ticks['timestamp'].min() < pending['timestamp'].min() // step * step:
+        print(f"[WARNING] Ticks fuera de orden en {csv_path.name}, se re-ingiere desde el principio")
+        reset(date_str, timeframe)
+        return update_day_bars(date_str, timeframe, order_flow)
+
+    if len(new_ticks):
+        print(f"[INFO] {len(new_ticks):,} ticks nuevos en {csv_path.name} ({len(tail):,} bytes)")
+
+    ticks = np.concatenate([pending, new_ticks])
+    if len(ticks) == 0:
+        return bars
+
+    df_new = _aggregate_tick_array_to_ohlc(ticks, timeframe, order_flow=order_flow)
+
+    # Continuar índice (minutos desde la primera barra) y delta acumulado de las barras cerradas
+    new_ts = df_new['timestamp'].to_numpy(dtype='datetime64[ns]').view('i8')
+    first_ts = new_ts[0] if bars is None else bars['timestamp'].iloc[0].value
+    df_new.index = (new_ts - first_ts) // step
+    if bars is not None and 'cum_delta' in df_new.columns:
+        df_new['cum_delta'] += bars['cum_delta'].iloc[-1]
+
+    # La última barra sigue abierta: sus ticks quedan pendientes para la próxima llamada
+    open_start = new_ts[-1]
+    pending = np.ascontiguousarray(ticks[ticks['timestamp'] >= open_start])
+    closed = df_new.iloc[:-1]
+    if bars is not None:
+        closed = pd.concat([bars, closed]) if len(closed) else bars
+
+    state['offset'] += len(tail)
+    state['rows'] += len(new_ticks)
+    state['last_timestamp'] = int(ticks['timestamp'].max())
+    if len(closed):
+        state['last_complete_bar'] = str(closed['timestamp'].iloc[-1])
+
+    context = np.ascontiguousarray(np.concatenate([context, raw_ticks])[-VALIDATION_CONTEXT:])
+    _save_state(paths, state, closed, pending, context)
+
+    return pd.concat([closed, df_new.iloc[-1:]]) if len(closed) else df_new
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    date_str = args[0] if args else DATE
+
+    if '--reset' in sys.argv[1:]:
+        reset(date_str)
+
+    print("="*70)
+    print(f"INGESTA INCREMENTAL - {date_str}")
+    print("="*70)
+
+    df_bars = update_day_bars(date_str)
+    if df_bars is None:
+        print(f"[ERROR] No existe {csv_path_for(date_str)}")
+        sys.exit(1)
+
+    with open(_state_paths(date_str, BASE_TIMEFRAME)['state'], 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    print(f"[OK] {len(df_bars):,} barras ({BASE_TIMEFRAME}), {state['rows']:,} ticks ingeridos")
+    print(f"[INFO] Offset: {state['offset']:,} bytes, última barra cerrada: {state['last_complete_bar']}")
@@ -8,8 +8,10 @@ import numpy as np
 import json
 from pathlib import Path
 from datetime import datetime, timedelta
-from config import DATA_DIR, OUTPUTS_DIR, PRICE_EJECTION_TRIGGER, VWAP_FAST, POINT_VALUE
-from calculate_vwap import calculate_vwap
+from config import OUTPUTS_DIR, PRICE_EJECTION_TRIGGER, POINT_VALUE
+from feature_store import attach_features
+from tick_store import load_tick_frame
+from data_catalog import catalog_dates
 
 # ============================================================================
 # FUNCIÓN DE CARGA DE DATOS
@@ -25,17 +27,12 @@ def load_nq_data(start_date, end_date):
     Returns:
         df: DataFrame con barras OHLC de 1 minuto
     """
-    file_path = DATA_DIR / f"time_and_sales_nq_{start_date}.csv"
+    # Leer datos de tick desde el tick store (o CSV si no está convertido)
+    df_ticks = load_tick_frame(start_date)
 
-    if not file_path.exists():
+    if df_ticks is None:
         return None
 
-    # Leer datos de tick (columnas ya normalizadas: timestamp, price, volume)
-    df_ticks = pd.read_csv(file_path, sep=';', decimal=',')
-
-    # Convertir timestamp a datetime
-    df_ticks['timestamp'] = pd.to_datetime(df_ticks['timestamp'])
-
     # Agregar a barras de 1 minuto
     df_ticks.set_index('timestamp', inplace=True)
 
@@ -323,8 +320,8 @@ def optimize_single_day(date_str):
         print(f"[WARN] No hay datos para {date_str}")
         return []
 
-    # Calcular VWAP
-    df['vwap_fast'] = calculate_vwap(df, period=VWAP_FAST)
+    # VWAP desde el almacén de indicadores
+    attach_features(df, ['vwap_fast'])
 
     # Detectar señales de entrada
     df_signals = detect_entry_signals(df)
@@ -461,8 +458,8 @@ def optimize_by_entry_hour(date_str):
     if df is None or df.empty:
         return {}
 
-    # Calcular VWAP
-    df['vwap_fast'] = calculate_vwap(df, period=VWAP_FAST)
+    # VWAP desde el almacén de indicadores
+    attach_features(df, ['vwap_fast'])
 
     # Detectar señales
     df_signals = detect_entry_signals(df)
@@ -574,15 +571,13 @@ if __name__ == "__main__":
     print("OPTIMIZACIÓN DE TIEMPO EN MERCADO - VWAP MOMENTUM STRATEGY")
     print("=" * 80)
 
-    # Obtener todos los archivos de datos disponibles
-    data_files = sorted(DATA_DIR.glob("time_and_sales_nq_*.csv"))
+    # Obtener todos los días disponibles (catálogo de data/)
+    dates = catalog_dates()
 
-    if not data_files:
+    if not dates:
         print("[ERROR] No se encontraron archivos de datos")
         exit(1)
 
-    dates = [f.stem.replace("time_and_sales_nq_", "") for f in data_files]
-
     print(f"\n[INFO] Archivos encontrados: {len(dates)}")
     print(f"[INFO] Rango: {dates[0]} -> {dates[-1]}")
 
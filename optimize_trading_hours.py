@@ -14,30 +14,19 @@ from plotly.subplots import make_subplots
 from config import (
     VWAP_MOMENTUM_TP_POINTS, VWAP_MOMENTUM_SL_POINTS,
     VWAP_MOMENTUM_MAX_POSITIONS,
-    VWAP_FAST, PRICE_EJECTION_TRIGGER, VWAP_SLOPE_DEGREE_WINDOW,
-    DATA_DIR, OUTPUTS_DIR
+    VWAP_SLOPE_DEGREE_WINDOW,
+    OUTPUTS_DIR
 )
 from find_fractals import load_date_range
-from calculate_vwap import calculate_vwap
+from feature_store import attach_features
+from data_catalog import catalog_dates
 
 POINT_VALUE = 20.0  # USD value per point for NQ futures
 
 
 def get_available_dates():
-    """Scan data directory for available NQ data files"""
-    data_files_pattern1 = sorted(DATA_DIR.glob("time_and_sales_nq_*.csv"))
-    data_files_pattern2 = sorted(DATA_DIR.glob("nq_*.csv"))
-
-    data_files = data_files_pattern1 + data_files_pattern2
-
-    dates = []
-    import re
-    for file in data_files:
-        match = re.search(r'(?:time_and_sales_)?nq_(\d{8})\.csv', file.name)
-        if match:
-            dates.append(match.group(1))
-
-    return sorted(set(dates))
+    """Available NQ dates from the data catalog"""
+    return catalog_dates()
 
 
 def calculate_vwap_slope_at_bar(df, bar_idx, window=VWAP_SLOPE_DEGREE_WINDOW):
@@ -87,22 +76,9 @@ def backtest_all_days(dates: list):
             if df is None:
                 continue
 
-            # Calculate VWAP
-            df['vwap_fast'] = calculate_vwap(df, period=VWAP_FAST)
-
-            # Calculate price-VWAP distance
-            df['price_vwap_distance'] = abs((df['close'] - df['vwap_fast']) / df['vwap_fast'])
-
-            # Detect price ejection signals
-            df['price_ejection'] = (df['price_vwap_distance'] > PRICE_EJECTION_TRIGGER) & (df['vwap_fast'].notna())
-
-            # Detect price above/below VWAP
-            df['price_above_vwap'] = (df['close'] > df['vwap_fast']).astype(bool)
-            df['price_below_vwap'] = (df['close'] < df['vwap_fast']).astype(bool)
-
-            # Entry signals
-            df['long_signal'] = df['price_ejection'] & df['price_above_vwap']
-            df['short_signal'] = df['price_ejection'] & df['price_below_vwap']
+            # VWAP, price ejection and entry signals from the shared feature store
+            attach_features(df, ['vwap_fast', 'price_vwap_distance', 'price_ejection',
+                                 'price_above_vwap', 'price_below_vwap', 'long_signal', 'short_signal'])
 
             # Calculate day of week
             date_obj = datetime.strptime(date, "%Y%m%d")
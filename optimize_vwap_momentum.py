@@ -8,37 +8,27 @@ from pathlib import Path
 import sys
 from datetime import datetime, time
 import webbrowser
-import re
 
 # Import configuration
 from config import (
     VWAP_MOMENTUM_MAX_POSITIONS,
     VWAP_MOMENTUM_STRAT_START_HOUR, VWAP_MOMENTUM_STRAT_END_HOUR,
-    VWAP_FAST, PRICE_EJECTION_TRIGGER, VWAP_SLOPE_DEGREE_WINDOW,
-    DATA_DIR, OUTPUTS_DIR
+    VWAP_SLOPE_DEGREE_WINDOW,
+    OUTPUTS_DIR, TICK_SIZE
 )
-from calculate_vwap import calculate_vwap
+from feature_store import attach_features
+from tick_store import points_to_ticks
+from data_catalog import catalog_dates
 
 POINT_VALUE = 20.0  # USD value per point for NQ futures
 
 
 def get_available_dates():
-    """Scan data directory for available NQ data files"""
-    # Try both naming patterns: time_and_sales_nq_*.csv and nq_*.csv
-    data_files_pattern1 = sorted(DATA_DIR.glob("time_and_sales_nq_*.csv"))
-    data_files_pattern2 = sorted(DATA_DIR.glob("nq_*.csv"))
-
-    data_files = data_files_pattern1 + data_files_pattern2
-
-    dates = []
-    for file in data_files:
-        # Extract date from filename: time_and_sales_nq_20251021.csv -> 20251021
-        # or nq_20251021.csv -> 20251021
-        match = re.search(r'(?:time_and_sales_)?nq_(\d{8})\.csv', file.name)
-        if match:
-            dates.append(match.group(1))
-
-    return sorted(set(dates))  # Remove duplicates and sort
+    """
+    Sorted YYYYMMDD dates in the data catalog: days with a time_and_sales_nq_YYYYMMDD
+    source in data/ (.csv, .csv.zst, .csv.gz or .parquet) or in the tick store (.npy)
+    """
+    return catalog_dates()
 
 
 def calculate_vwap_slope_at_bar(df, bar_idx, window=VWAP_SLOPE_DEGREE_WINDOW):
@@ -106,22 +96,17 @@ def backtest_single_day(
         # The load_date_range function returns OHLC data with 'timestamp' column already
         # No need to rename columns
 
-        # Calculate VWAP
-        df['vwap_fast'] = calculate_vwap(df, period=VWAP_FAST)
-
-        # Calculate price-VWAP distance
-        df['price_vwap_distance'] = abs((df['close'] - df['vwap_fast']) / df['vwap_fast'])
-
-        # Detect price ejection signals
-        df['price_ejection'] = (df['price_vwap_distance'] > PRICE_EJECTION_TRIGGER) & (df['vwap_fast'].notna())
-
-        # Detect price above/below VWAP
-        df['price_above_vwap'] = (df['close'] > df['vwap_fast']).astype(bool)
-        df['price_below_vwap'] = (df['close'] < df['vwap_fast']).astype(bool)
+        # VWAP, price ejection and entry signals from the shared feature store
+        # (computed once per day and reused by every TP/SL combination)
+        attach_features(df, ['vwap_fast', 'price_vwap_distance', 'price_ejection',
+                             'price_above_vwap', 'price_below_vwap', 'long_signal', 'short_signal'])
 
-        # Entry signals
-        df['long_signal'] = df['price_ejection'] & df['price_above_vwap']
-        df['short_signal'] = df['price_ejection'] & df['price_below_vwap']
+        # Precios en ticks enteros: niveles TP/SL y comparaciones exactas (a puntos solo al reportar)
+        df['high_ticks'] = points_to_ticks(df['high'])
+        df['low_ticks'] = points_to_ticks(df['low'])
+        df['close_ticks'] = points_to_ticks(df['close'])
+        tp_ticks = int(round(tp_points / TICK_SIZE))
+        sl_ticks = int(round(sl_points / TICK_SIZE))
 
         # Parse trading time range
         start_time = datetime.strptime(start_hour, "%H:%M:%S").time()
@@ -148,36 +133,41 @@ def backtest_single_day(
             # Check if we have an open position - manage exit
             if open_position is not None:
                 direction = open_position['direction']
-                entry_price = open_position['entry_price']
-                tp_price = open_position['tp_price']
-                sl_price = open_position['sl_price']
+                entry_level = open_position['entry_ticks']
+                tp_level = open_position['tp_ticks']
+                sl_level = open_position['sl_ticks']
 
                 # Check exit conditions
                 exit_reason = None
-                exit_price = None
+                exit_level = None
 
                 if direction == 'BUY':
-                    if bar['high'] >= tp_price:
+                    if bar['high_ticks'] >= tp_level:
                         exit_reason = 'profit'
-                        exit_price = tp_price
-                    elif bar['low'] <= sl_price:
+                        exit_level = tp_level
+                    elif bar['low_ticks'] <= sl_level:
                         exit_reason = 'stop'
-                        exit_price = sl_price
+                        exit_level = sl_level
                 else:  # SELL
-                    if bar['low'] <= tp_price:
+                    if bar['low_ticks'] <= tp_level:
                         exit_reason = 'profit'
-                        exit_price = tp_price
-                    elif bar['high'] >= sl_price:
+                        exit_level = tp_level
+                    elif bar['high_ticks'] >= sl_level:
                         exit_reason = 'stop'
-                        exit_price = sl_price
+                        exit_level = sl_level
 
                 # Close position if exit triggered
                 if exit_reason:
                     if direction == 'BUY':
-                        pnl = exit_price - entry_price
+                        pnl_ticks = exit_level - entry_level
                     else:  # SELL
-                        pnl = entry_price - exit_price
+                        pnl_ticks = entry_level - exit_level
 
+                    entry_price = entry_level * TICK_SIZE
+                    exit_price = exit_level * TICK_SIZE
+                    tp_price = tp_level * TICK_SIZE
+                    sl_price = sl_level * TICK_SIZE
+                    pnl = pnl_ticks * TICK_SIZE
                     pnl_usd = pnl * POINT_VALUE
 
                     time_in_market = (bar['timestamp'] - open_position['entry_time']).total_seconds() / 60.0
@@ -209,35 +199,31 @@ def backtest_single_day(
             if open_position is None and max_positions > 0:
                 # LONG signal
                 if bar['long_signal']:
-                    entry_price = bar['close']
-                    tp_price = entry_price + tp_points
-                    sl_price = entry_price - sl_points
+                    entry_level = bar['close_ticks']
                     vwap_slope_entry = calculate_vwap_slope_at_bar(df, idx, VWAP_SLOPE_DEGREE_WINDOW)
 
                     open_position = {
                         'direction': 'BUY',
                         'entry_time': bar['timestamp'],
-                        'entry_price': entry_price,
+                        'entry_ticks': entry_level,
                         'entry_vwap': bar['vwap_fast'],
-                        'tp_price': tp_price,
-                        'sl_price': sl_price,
+                        'tp_ticks': entry_level + tp_ticks,
+                        'sl_ticks': entry_level - sl_ticks,
                         'vwap_slope_entry': vwap_slope_entry
                     }
 
                 # SHORT signal
                 elif bar['short_signal']:
-                    entry_price = bar['close']
-                    tp_price = entry_price - tp_points
-                    sl_price = entry_price + sl_points
+                    entry_level = bar['close_ticks']
                     vwap_slope_entry = calculate_vwap_slope_at_bar(df, idx, VWAP_SLOPE_DEGREE_WINDOW)
 
                     open_position = {
                         'direction': 'SELL',
                         'entry_time': bar['timestamp'],
-                        'entry_price': entry_price,
+                        'entry_ticks': entry_level,
                         'entry_vwap': bar['vwap_fast'],
-                        'tp_price': tp_price,
-                        'sl_price': sl_price,
+                        'tp_ticks': entry_level - tp_ticks,
+                        'sl_ticks': entry_level + sl_ticks,
                         'vwap_slope_entry': vwap_slope_entry
                     }
 
@@ -245,13 +231,17 @@ def backtest_single_day(
         if open_position is not None:
             last_bar = df.iloc[-1]
             direction = open_position['direction']
-            entry_price = open_position['entry_price']
-            exit_price = last_bar['close']
+            entry_level = open_position['entry_ticks']
+            exit_level = last_bar['close_ticks']
 
             if direction == 'BUY':
-                pnl = exit_price - entry_price
+                pnl_ticks = exit_level - entry_level
             else:
-                pnl = entry_price - exit_price
+                pnl_ticks = entry_level - exit_level
+
+            entry_price = entry_level * TICK_SIZE
+            exit_price = exit_level * TICK_SIZE
+            pnl = pnl_ticks * TICK_SIZE
 
             pnl_usd = pnl * POINT_VALUE
             time_in_market = (last_bar['timestamp'] - open_position['entry_time']).total_seconds() / 60.0
@@ -265,8 +255,8 @@ def backtest_single_day(
                 'exit_price': exit_price,
                 'entry_vwap': open_position['entry_vwap'],
                 'exit_vwap': last_bar['vwap_fast'],
-                'tp_price': open_position['tp_price'],
-                'sl_price': open_position['sl_price'],
+                'tp_price': open_position['tp_ticks'] * TICK_SIZE,
+                'sl_price': open_position['sl_ticks'] * TICK_SIZE,
                 'exit_reason': 'eod',
                 'pnl': pnl,
                 'pnl_usd': pnl_usd,
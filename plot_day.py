@@ -38,7 +38,8 @@ from config import (
     ENABLE_VWAP_WYCKOFF_STRATEGY, USE_WYCKOFF_ATR_TRAILING_STOP,
     ENABLE_OPENING_RANGE_PLOT, OPENING_RANGE_START, OPENING_RANGE_END
 )
-from calculate_vwap import calculate_vwap
+from feature_store import attach_features
+from vwap_bands import calculate_vwap_bands, detect_band_reversals
 import numpy as np
 
 # ============================================================================
@@ -287,8 +288,8 @@ def plot_range_chart(df, df_fractals_minor, df_fractals_major, start_date, end_d
     # Añadir indicador VWAP
     if PLOT_VWAP:
         print(f"[DEBUG] Calculating VWAP Fast ({VWAP_FAST})...")
-        # VWAP Rápido (Fast - Magenta)
-        df['vwap_fast'] = calculate_vwap(df, period=VWAP_FAST)
+        # VWAP Rápido (Fast - Magenta), Lento y distancia precio-VWAP desde el almacén de indicadores
+        attach_features(df, ['vwap_fast', 'vwap_slow', 'price_vwap_distance'])
         df_vwap_fast = df[df['vwap_fast'].notna()].copy()
 
         if SHOW_FAST_VWAP and not df_vwap_fast.empty:
@@ -308,14 +309,10 @@ def plot_range_chart(df, df_fractals_minor, df_fractals_major, start_date, end_d
         # Calculate VWAP Slope for all bars (in absolute value) only if slope subplot is enabled
         # Note: For visualization, we apply a minimum value to avoid very small values in log scale
         if show_slope_subplot:
-            # If vwap_slope already exists (from strategy), use it; otherwise calculate it
-            # IMPORTANT: Use exact same calculation method as find_rectangles.py for synchronization
+            # If vwap_slope already exists (from strategy), use it; otherwise take it from the
+            # feature store (same values find_rectangles.py uses, for synchronization)
             if 'vwap_slope' not in df.columns:
-                import numpy as np
-                df['vwap_slope'] = df['vwap_fast'].rolling(window=VWAP_SLOPE_DEGREE_WINDOW).apply(
-                    lambda x: abs(np.polyfit(np.arange(len(x)), x, 1)[0]) if len(x) == VWAP_SLOPE_DEGREE_WINDOW else np.nan,
-                    raw=False
-                )
+                attach_features(df, ['vwap_slope'])
 
             # Create a copy for plotting with minimum value for log scale visualization
             min_slope = 0.002
@@ -397,7 +394,6 @@ def plot_range_chart(df, df_fractals_minor, df_fractals_major, start_date, end_d
                 print(f"[INFO] VWAP Slope (Window={VWAP_SLOPE_DEGREE_WINDOW}) añadido al gráfico: {len(df_vwap_slope)} puntos válidos")
 
         # VWAP Lento (Slow - Verde)
-        df['vwap_slow'] = calculate_vwap(df, period=VWAP_SLOW)
         df_vwap_slow = df[df['vwap_slow'].notna()].copy()
 
         if SHOW_SLOW_VWAP and not df_vwap_slow.empty:
@@ -599,9 +595,7 @@ def plot_range_chart(df, df_fractals_minor, df_fractals_major, start_date, end_d
 
     # Añadir puntos verdes cuando el precio se aleja del VWAP Fast (Price Ejection)
     if PLOT_VWAP and 'vwap_fast' in df.columns:
-        # Calcular la distancia porcentual entre precio y VWAP fast
-        df['price_vwap_distance'] = abs((df['close'] - df['vwap_fast']) / df['vwap_fast'])
-
+        # Distancia porcentual entre precio y VWAP fast (calculada con los indicadores)
         # Filtrar puntos donde la distancia supera el threshold
         df_ejection = df[df['price_vwap_distance'] >= PRICE_EJECTION_TRIGGER].copy()
 
@@ -1404,135 +1398,54 @@ def plot_range_chart(df, df_fractals_minor, df_fractals_major, start_date, end_d
     # VWAP BANDS (Standard Deviation)
     # ========================================================================
     if PLOT_VWAP_BANDS and 'vwap_fast' in df.columns:
-        # Filtrar datos desde VWAP_BANDS_START_TIME
-        bands_start_time = pd.to_datetime(VWAP_BANDS_START_TIME).time()
-        df_bands = df[df['timestamp'].dt.time >= bands_start_time].copy()
-
-        if not df_bands.empty:
-            # Calcular desviación estándar del precio respecto al VWAP Fast
-            df_bands['price_deviation'] = df_bands['close'] - df_bands['vwap_fast']
-            std_dev = df_bands['price_deviation'].expanding().std()
-
-            # Bandas 2 sigma
-            upper_band_2sigma = df_bands['vwap_fast'] + 2 * std_dev
-            lower_band_2sigma = df_bands['vwap_fast'] - 2 * std_dev
-
-            # Bandas 3 sigma
-            upper_band_3sigma = df_bands['vwap_fast'] + 3 * std_dev
-            lower_band_3sigma = df_bands['vwap_fast'] - 3 * std_dev
-
-            # Dibujar bandas 2 sigma (líneas sólidas naranja)
-            fig.add_trace(go.Scatter(
-                x=df_bands['index'],
-                y=upper_band_2sigma,
-                mode='lines',
-                name='VWAP +2σ',
-                line=dict(color='rgba(255, 165, 0, 0.4)', width=1, dash='solid'),
-                showlegend=True
-            ), row=price_row, col=1)
-
-            fig.add_trace(go.Scatter(
-                x=df_bands['index'],
-                y=lower_band_2sigma,
-                mode='lines',
-                name='VWAP -2σ',
-                line=dict(color='rgba(255, 165, 0, 0.4)', width=1, dash='solid'),
-                showlegend=True
-            ), row=price_row, col=1)
-
-            # Dibujar bandas 3 sigma (líneas sólidas rojas)
-            fig.add_trace(go.Scatter(
-                x=df_bands['index'],
-                y=upper_band_3sigma,
-                mode='lines',
-                name='VWAP +3σ',
-                line=dict(color='rgba(255, 0, 0, 0.3)', width=1, dash='solid'),
-                showlegend=True
-            ), row=price_row, col=1)
-
-            fig.add_trace(go.Scatter(
-                x=df_bands['index'],
-                y=lower_band_3sigma,
-                mode='lines',
-                name='VWAP -3σ',
-                line=dict(color='rgba(255, 0, 0, 0.3)', width=1, dash='solid'),
-                showlegend=True
-            ), row=price_row, col=1)
+        # Bandas ancladas a VWAP_BANDS_START_TIME de cada día (motor compartido con analyze_band_reversals)
+        bands = calculate_vwap_bands(df)
+        in_bands = bands['std_dev'].notna()
+
+        if in_bands.any():
+            band_x = df['index'].where(in_bands)
+
+            # Dibujar bandas 2 sigma (líneas sólidas naranja) y 3 sigma (líneas sólidas rojas)
+            for column, name, color in (
+                ('upper_2sigma', 'VWAP +2σ', 'rgba(255, 165, 0, 0.4)'),
+                ('lower_2sigma', 'VWAP -2σ', 'rgba(255, 165, 0, 0.4)'),
+                ('upper_3sigma', 'VWAP +3σ', 'rgba(255, 0, 0, 0.3)'),
+                ('lower_3sigma', 'VWAP -3σ', 'rgba(255, 0, 0, 0.3)'),
+            ):
+                fig.add_trace(go.Scatter(
+                    x=band_x,
+                    y=bands[column],
+                    mode='lines',
+                    name=name,
+                    line=dict(color=color, width=1, dash='solid'),
+                    showlegend=True
+                ), row=price_row, col=1)
 
             print(f"[INFO] VWAP bands (2σ and 3σ) added from {VWAP_BANDS_START_TIME}")
 
             # ========================================================================
-            # DETECT BLUE DOTS: Price touches 2σ band and crosses back through 1σ band
+            # DETECT BLUE DOTS: Close beyond 3σ band, then close back inside 2σ band
             # ========================================================================
             if VWAP_TIME_ENTRY:
-                entry_time = pd.to_datetime(VWAP_TIME_ENTRY).time()
-
-                # Calcular bandas 1 sigma para detección
-                upper_band_1sigma = df_bands['vwap_fast'] + std_dev
-                lower_band_1sigma = df_bands['vwap_fast'] - std_dev
-
-                # Filtrar datos DESPUÉS del Entry Time
-                df_after_entry = df_bands[df_bands['timestamp'].dt.time > entry_time].copy()
-
-                if not df_after_entry.empty:
-                    blue_dot_indices = []
-                    blue_dot_prices = []
-
-                    # Añadir las bandas 2sigma y 3sigma al dataframe para facilitar la detección
-                    df_after_entry['upper_2sigma'] = upper_band_2sigma[df_after_entry.index]
-                    df_after_entry['lower_2sigma'] = lower_band_2sigma[df_after_entry.index]
-                    df_after_entry['upper_3sigma'] = upper_band_3sigma[df_after_entry.index]
-                    df_after_entry['lower_3sigma'] = lower_band_3sigma[df_after_entry.index]
-
-                    # Estado de seguimiento
-                    touched_upper_3sigma = False
-                    touched_lower_3sigma = False
-                    plotted_upper_dot = False  # Flag to prevent multiple dots after single 3σ touch
-                    plotted_lower_dot = False  # Flag to prevent multiple dots after single 3σ touch
-
-                    for i, row in df_after_entry.iterrows():
-                        close_price = row['close']
-
-                        # BEARISH reversal signal (for potential SHORT entry):
-                        # Close ABOVE upper 3σ, then cross down through upper 2σ
-                        # Reset flags when close penetrates 3σ (allows new signal)
-                        if close_price > row['upper_3sigma']:
-                            touched_upper_3sigma = True
-                            plotted_upper_dot = False  # Reset: can plot new dot after this 3σ penetration
-
-                        # Only plot if: 1) closed above 3σ, 2) now crossed below 2σ, 3) haven't plotted yet
-                        if touched_upper_3sigma and not plotted_upper_dot and close_price < row['upper_2sigma']:
-                            blue_dot_indices.append(row['index'])
-                            blue_dot_prices.append(close_price)
-                            print(f"[BLUE DOT] {row['timestamp'].time()} - Close above upper 3σ, crossed down through upper 2σ at {close_price:.2f}")
-                            plotted_upper_dot = True  # Mark as plotted, won't plot again until 3σ is penetrated
-
-                        # BULLISH reversal signal (for potential LONG entry):
-                        # Close BELOW lower 3σ, then cross up through lower 2σ
-                        # Reset flags when close penetrates 3σ (allows new signal)
-                        if close_price < row['lower_3sigma']:
-                            touched_lower_3sigma = True
-                            plotted_lower_dot = False  # Reset: can plot new dot after this 3σ penetration
-
-                        # Only plot if: 1) closed below 3σ, 2) now crossed above 2σ, 3) haven't plotted yet
-                        if touched_lower_3sigma and not plotted_lower_dot and close_price > row['lower_2sigma']:
-                            blue_dot_indices.append(row['index'])
-                            blue_dot_prices.append(close_price)
-                            print(f"[BLUE DOT] {row['timestamp'].time()} - Close below lower 3σ, crossed up through lower 2σ at {close_price:.2f}")
-                            plotted_lower_dot = True  # Mark as plotted, won't plot again until 3σ is penetrated
-
-                    # Dibujar blue dots en el chart
-                    if blue_dot_indices:
-                        fig.add_trace(go.Scatter(
-                            x=blue_dot_indices,
-                            y=blue_dot_prices,
-                            mode='markers',
-                            name='Band Reversal',
-                            marker=dict(color='blue', size=8, symbol='circle'),
-                            showlegend=True,
-                            hovertemplate='Band Reversal<br>Price: %{y:.2f}<extra></extra>'
-                        ), row=price_row, col=1)
-                        print(f"[INFO] Added {len(blue_dot_indices)} blue dots for band reversals")
+                df_events = detect_band_reversals(df, bands, after_time=VWAP_TIME_ENTRY)
+
+                for event in df_events.itertuples(index=False):
+                    side = 'above upper 3σ, crossed down through upper 2σ' if event.signal_type == 'BEARISH' \
+                        else 'below lower 3σ, crossed up through lower 2σ'
+                    print(f"[BLUE DOT] {event.signal_time.time()} - Close {side} at {event.signal_price:.2f}")
+
+                # Dibujar blue dots en el chart
+                if not df_events.empty:
+                    fig.add_trace(go.Scatter(
+                        x=df.loc[df_events['signal_bar'], 'index'],
+                        y=df_events['signal_price'],
+                        mode='markers',
+                        name='Band Reversal',
+                        marker=dict(color='blue', size=8, symbol='circle'),
+                        showlegend=True,
+                        hovertemplate='Band Reversal<br>Price: %{y:.2f}<extra></extra>'
+                    ), row=price_row, col=1)
+                    print(f"[INFO] Added {len(df_events)} blue dots for band reversals")
 
     # Configurar layout
     # Título: mostrar solo una fecha si start_date == end_date
@@ -0,0 +1,223 @@
+"""
+Calendario de sesiones CME Globex para NQ y carga de barras por sesión
+Los ficheros de data/ están partidos por día natural en hora local (DATA_TIMEZONE),
+pero la sesión de NQ con fecha D va de SESSION_OPEN_TIME ET del día anterior a
+SESSION_CLOSE_TIME ET de D. En hora de Madrid suele coincidir con 00:00 -> 23:00 de D,
+salvo en las semanas en que EEUU y Europa no han cambiado aún de horario (la sesión
+empieza a las 23:00 del día anterior y abarca dos ficheros).
+
+load_session_bars construye las barras de una sesión a partir de los ficheros que
+solapan con ella y antepone solo las últimas SESSION_WARMUP_BARS barras anteriores
+(marcadas con warmup=True) para que los indicadores de ventana (VWAP_SLOW...) sean
+válidos desde la primera barra de la sesión. La cola se obtiene de la caché de barras
+si existe o, si no, agregando únicamente los ticks finales del día anterior desde su
+vista memory-mapped, sin cargar el fichero completo.
+
+Tras calcular los indicadores, strip_warmup(df) elimina las barras de warm-up.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Optional, Tuple
+
+from config import (
+    DATA_TIMEZONE, SESSION_TIMEZONE, SESSION_OPEN_TIME, SESSION_CLOSE_TIME,
+    SESSION_WARMUP_BARS, MAX_WARMUP_GAP_DAYS, USE_BAR_CACHE, BAR_ORDER_FLOW, VALIDATE_TICKS
+)
+from bar_cache import load_cached_bars
+from data_catalog import catalog_dates
+from tick_store import load_tick_view
+from tick_validation import clean_tick_array
+from find_fractals import (
+    BASE_TIMEFRAME, load_day_bars, bar_cache_variant, _aggregate_tick_array_to_ohlc, _timeframe_to_ns
+)
+
+
+# =============================================================================
+# CALENDARIO
+# =============================================================================
+
+def session_bounds(trade_date: str) -> Tuple[pd.Timestamp, pd.Timestamp]:
+    """
+    Apertura y cierre [open, close] de la sesión con fecha trade_date (YYYYMMDD),
+    en hora local de los datos (DATA_TIMEZONE, sin zona). El cierre es inclusivo: entre
+    el cierre y la siguiente apertura el mercado está parado y una barra con timestamp
+    igual al cierre solo contiene la última ejecución de la sesión.
+    """
+    day = pd.Timestamp(trade_date)
+    open_ts = pd.Timestamp(f"{(day - pd.Timedelta(days=1)).date()} {SESSION_OPEN_TIME}", tz=SESSION_TIMEZONE)
+    close_ts = pd.Timestamp(f"{day.date()} {SESSION_CLOSE_TIME}", tz=SESSION_TIMEZONE)
+    to_local = lambda ts: ts.tz_convert(DATA_TIMEZONE).tz_localize(None)
+    return to_local(open_ts), to_local(close_ts)
+
+
+def session_files(trade_date: str) -> list:
+    """Fechas de los ficheros de data/ que solapan con la sesión"""
+    open_ts, close_ts = session_bounds(trade_date)
+    return catalog_dates(open_ts.strftime('%Y%m%d'), close_ts.strftime('%Y%m%d'))
+
+
+# =============================================================================
+# WARM-UP
+# =============================================================================
+
+def _tail_bars(date_str: str, cutoff: pd.Timestamp, n_bars: int, timeframe: str) -> Optional[pd.DataFrame]:
+    """
+    Últimas n_bars barras de un fichero anteriores a cutoff
+    Orden de preferencia: barras ya cacheadas, ticks finales de la vista memory-mapped
+    (ventana que se duplica hasta reunir n_bars) y, si no hay store, el día completo.
+    """
+    df_bars = None
+    if USE_BAR_CACHE:
+        df_bars = load_cached_bars(date_str, timeframe, variant=bar_cache_variant())
+
+    if df_bars is None:
+        ticks = load_tick_view(date_str)
+        if ticks is not None:
+            step = _timeframe_to_ns(timeframe)
+            cutoff_ns = cutoff.value
+            ts = ticks['timestamp']
+            hi = int(np.searchsorted(ts, cutoff_ns))
+            window = n_bars * step
+            while True:
+                lo = int(np.searchsorted(ts, (cutoff_ns - window) // step * step))
+                tail = ticks[lo:hi]
+                if VALIDATE_TICKS:
+                    tail = clean_tick_array(tail)
+                df_bars = _aggregate_tick_array_to_ohlc(tail, timeframe, order_flow=BAR_ORDER_FLOW)
+                if len(df_bars) >= n_bars or lo == 0:
+                    break
+                window *= 2
+            return df_bars.tail(n_bars)
+
+        df_bars = load_day_bars(date_str, timeframe)
+        if df_bars is None:
+            return None
+
+    return df_bars[df_bars['timestamp'] < cutoff].tail(n_bars)
+
+
+def warmup_bars(before: pd.Timestamp, n_bars: int = SESSION_WARMUP_BARS,
+                timeframe: str = BASE_TIMEFRAME) -> Optional[pd.DataFrame]:
+    """
+    Las n_bars barras inmediatamente anteriores a before, recorriendo hacia atrás los
+    ficheros de los MAX_WARMUP_GAP_DAYS días naturales previos. Las barras más antiguas
+    no se usan: si faltan días en data/ el warm-up queda incompleto en lugar de sembrar
+    los indicadores con barras de otra semana.
+    """
+    earliest = before.normalize() - pd.Timedelta(days=MAX_WARMUP_GAP_DAYS)
+    parts = []
+    cutoff = before
+    for date_str in reversed(catalog_dates(earliest.strftime('%Y%m%d'), before.strftime('%Y%m%d'))):
+        if n_bars <= 0:
+            break
+        df_tail = _tail_bars(date_str, cutoff, n_bars, timeframe)
+        if df_tail is None or df_tail.empty:
+            continue
+        df_tail = df_tail[df_tail['timestamp'] >= earliest]
+        if df_tail.empty:
+            break
+        parts.insert(0, df_tail)
+        n_bars -= len(df_tail)
+        cutoff = df_tail['timestamp'].iloc[0]
+
+    if not parts:
+        return None
+    return pd.concat(parts, ignore_index=True)
+
+
+# =============================================================================
+# BARRAS POR SESIÓN
+# =============================================================================
+
+def load_session_bars(trade_date: str, timeframe: str = BASE_TIMEFRAME,
+                      warmup: int = SESSION_WARMUP_BARS) -> Optional[pd.DataFrame]:
+    """
+    Barras OHLC de una sesión Globex con warm-up de la sesión anterior
+
+    Args:
+        trade_date: Fecha de la sesión en formato YYYYMMDD
+        timeframe: Timeframe de las barras (divisor de 1h para que las fronteras de sesión coincidan)
+        warmup: Número de barras previas a anteponer (0 = sin warm-up)
+
+    Returns:
+        DataFrame OHLC (con columna warmup si warmup > 0). El índice cuenta barras desde
+        la primera barra de la sesión (negativo en el warm-up) y cum_delta se reinicia
+        en la apertura. None si la sesión no tiene datos.
+    """
+    open_ts, close_ts = session_bounds(trade_date)
+
+    blocks = []
+    for date_str in session_files(trade_date):
+        df_day = load_day_bars(date_str, timeframe)
+        if df_day is not None:
+            in_session = (df_day['timestamp'] >= open_ts) & (df_day['timestamp'] <= close_ts)
+            blocks.append(df_day[in_session])
+    blocks = [b for b in blocks if not b.empty]
+    if not blocks:
+        print(f"[ERROR] Sin datos para la sesión {trade_date} ({open_ts} -> {close_ts})")
+        return None
+
+    df_session = pd.concat(blocks, ignore_index=True)
+    if 'cum_delta' in df_session.columns:
+        df_session['cum_delta'] = df_session['delta'].cumsum()
+
+    step = _timeframe_to_ns(timeframe)
+    ts = df_session['timestamp'].to_numpy(dtype='datetime64[ns]').view('i8')
+    df_session.index = (ts - ts[0]) // step
+
+    print(f"[OK] Sesión {trade_date}: {len(df_session):,} barras ({open_ts} -> {close_ts})")
+    return prepend_warmup(df_session, warmup, timeframe) if warmup > 0 else df_session
+
+
+def prepend_warmup(df_bars: pd.DataFrame, n_bars: int = SESSION_WARMUP_BARS,
+                   timeframe: str = BASE_TIMEFRAME) -> pd.DataFrame:
+    """
+    Antepone a df_bars las n_bars barras anteriores a su primera barra (warmup=True).
+    El índice de las barras de warm-up continúa hacia atrás el de df_bars
+    (negativo si df_bars empieza en 0).
+    """
+    df_bars = df_bars.assign(warmup=False)
+    df_warmup = warmup_bars(df_bars['timestamp'].iloc[0], n_bars, timeframe)
+    if df_warmup is None:
+        return df_bars
+
+    df_warmup = df_warmup.assign(warmup=True)
+    if 'cum_delta' in df_warmup.columns:
+        df_warmup['cum_delta'] = df_warmup['delta'].cumsum()
+
+    step = _timeframe_to_ns(timeframe)
+    first_ts = df_bars['timestamp'].iloc[0].value
+    ts = df_warmup['timestamp'].to_numpy(dtype='datetime64[ns]').view('i8')
+    df_warmup.index = df_bars.index[0] + (ts - first_ts) // step
+
+    print(f"[INFO] Warm-up: {len(df_warmup)} barras previas "
+          f"({df_warmup['timestamp'].iloc[0]} -> {df_warmup['timestamp'].iloc[-1]})")
+    return pd.concat([df_warmup, df_bars])
+
+
+def load_session_range(start_date: str, end_date: str, timeframe: str = BASE_TIMEFRAME,
+                       warmup: int = SESSION_WARMUP_BARS) -> Optional[pd.DataFrame]:
+    """
+    Sesiones consecutivas de start_date a end_date; el warm-up solo se antepone a la
+    primera (las siguientes tienen como historia la sesión previa del propio rango)
+    """
+    sessions = [
+        df_session for df_session in (
+            load_session_bars(trade_date, timeframe, warmup=0)
+            for trade_date in catalog_dates(start_date, end_date)
+        )
+        if df_session is not None
+    ]
+    if not sessions:
+        return None
+
+    df_sessions = sessions[0] if len(sessions) == 1 else pd.concat(sessions, ignore_index=True)
+    return prepend_warmup(df_sessions, warmup, timeframe) if warmup > 0 else df_sessions
+
+
+def strip_warmup(df: pd.DataFrame) -> pd.DataFrame:
+    """Elimina las barras de warm-up (y la columna warmup) tras calcular indicadores"""
+    if 'warmup' not in df.columns:
+        return df
+    return df[~df['warmup']].drop(columns='warmup')
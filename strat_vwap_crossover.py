@@ -10,7 +10,7 @@ import pandas as pd
 from pathlib import Path
 from datetime import datetime, time
 from config import (
-    DATE, START_DATE, END_DATE,
+    DATE, START_DATE, END_DATE, SESSION_WARMUP_BARS,
     VWAP_CROSSOVER_TP_POINTS, VWAP_CROSSOVER_SL_POINTS, VWAP_CROSSOVER_MAX_POSITIONS,
     VWAP_CROSSOVER_START_HOUR, VWAP_CROSSOVER_END_HOUR,
     VWAP_FAST, PRICE_EJECTION_TRIGGER,
@@ -68,9 +68,10 @@ print(f"  - Point Value: ${POINT_VALUE:.0f} per point")
 # ============================================================================
 # Load tick data and aggregate to OHLC
 from find_fractals import load_date_range
+from sessions import strip_warmup
 
 print(f"\n[INFO] Loading data for {START_DATE} to {END_DATE}...")
-df = load_date_range(START_DATE, END_DATE)
+df = load_date_range(START_DATE, END_DATE, warmup=SESSION_WARMUP_BARS)
 
 if df is None:
     print("[ERROR] No data loaded")
@@ -78,15 +79,11 @@ if df is None:
 
 print(f"[OK] Loaded {len(df):,} bars")
 
-# Calculate VWAP Fast
-from calculate_vwap import calculate_vwap
-df['vwap_fast'] = calculate_vwap(df, period=VWAP_FAST)
-
-# Calculate price-VWAP distance
-df['price_vwap_distance'] = abs((df['close'] - df['vwap_fast']) / df['vwap_fast'])
+# VWAP Fast, price-VWAP distance and price vs VWAP from the shared feature store
+from feature_store import attach_features
+attach_features(df, ['vwap_fast', 'price_vwap_distance', 'price_above_vwap'])
 
 # Detect crossovers
-df['price_above_vwap'] = (df['close'] > df['vwap_fast']).astype(bool)
 df['cross_above'] = (df['price_above_vwap']) & (~df['price_above_vwap'].shift(1).fillna(False))
 df['cross_below'] = (~df['price_above_vwap']) & (df['price_above_vwap'].shift(1).fillna(False))
 
@@ -94,6 +91,9 @@ print(f"[INFO] VWAP Fast calculated")
 print(f"[INFO] Cross above signals: {df['cross_above'].sum()}")
 print(f"[INFO] Cross below signals: {df['cross_below'].sum()}")
 
+# Drop the warm-up bars of the previous session (indicators are already computed over them)
+df = strip_warmup(df)
+
 # ============================================================================
 # STRATEGY EXECUTION
 # ============================================================================
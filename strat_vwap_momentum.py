@@ -6,11 +6,12 @@ Simple strategy based on price ejection from VWAP Fast:
 - Only LONG positions (no SHORT)
 """
 
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from datetime import datetime, time, timedelta
 from config import (
-    DATE, START_DATE, END_DATE,
+    DATE, START_DATE, END_DATE, SESSION_WARMUP_BARS,
     VWAP_MOMENTUM_TP_POINTS, VWAP_MOMENTUM_SL_POINTS, VWAP_MOMENTUM_MAX_POSITIONS,
     VWAP_MOMENTUM_STRAT_START_HOUR, VWAP_MOMENTUM_STRAT_END_HOUR,
     USE_SELECTED_ALLOWED_HOURS, VWAP_MOMENTUM_ALLOWED_HOURS,
@@ -25,6 +26,7 @@ from config import (
     USE_MAX_SL_ALLOWED_IN_TIME_IN_MARKET, MAX_SL_ALLOWED_IN_TIME_IN_MARKET,
     USE_TP_ALLOWED_IN_TIME_IN_MARKET, TP_IN_TIME_IN_MARKET,
     USE_TRAIL_CASH, TRAIL_CASH_TRIGGER_POINTS, TRAIL_CASH_BREAK_EVEN_POINTS_PROFIT,
+    USE_ATR_TRAILING_STOP, ATR_PERIOD, ATR_MULTIPLIER, ATR_MODE,
     USE_KEEP_PUSHING_GREEN_DOTS, TIME_OUT_AFTER_LAST_GREEN_DOT_MINUTES,
     KEEP_POSITION_OPEN_IF_MARKET_PRICE_OVER_LAST_DOT
 )
@@ -98,7 +100,7 @@ def get_strategy_info_compact():
     else:
         exit_mode = f"TP/SL ({TP_POINTS}/{SL_POINTS}pts)"
         tp_info = ""
-        sl_info = ""
+        sl_info = f"| ATR-Trail({ATR_PERIOD}/{ATR_MULTIPLIER}x)" if USE_ATR_TRAILING_STOP else ""
 
     # Direction filter info
     if VWAP_MOMENTUM_LONG_ALLOWED and VWAP_MOMENTUM_SHORT_ALLOWED:
@@ -184,9 +186,11 @@ else:
 # ============================================================================
 # Load tick data and aggregate to OHLC
 from find_fractals import load_date_range
+from sessions import strip_warmup
+from calculate_vwap_slope import rolling_slope
 
 print(f"\n[INFO] Loading data for {START_DATE} to {END_DATE}...")
-df = load_date_range(START_DATE, END_DATE)
+df = load_date_range(START_DATE, END_DATE, warmup=SESSION_WARMUP_BARS)
 
 if df is None:
     print("[ERROR] No data loaded")
@@ -235,42 +239,37 @@ def calculate_vwap_slope_at_bar(df, bar_idx, window=VWAP_SLOPE_DEGREE_WINDOW):
 # ============================================================================
 # CALCULATE INDICATORS
 # ============================================================================
-# Calculate VWAP Fast
-from calculate_vwap import calculate_vwap
-df['vwap_fast'] = calculate_vwap(df, period=VWAP_FAST)
+# VWAP Fast/Slow, price ejection (green dots) and entry signals from the shared feature store:
+# - Green dot: price ejected from VWAP Fast (distance > PRICE_EJECTION_TRIGGER)
+# - LONG: Green dot AND price above VWAP (bullish ejection)
+# - SHORT: Green dot AND price below VWAP (bearish ejection)
+from feature_store import attach_features
+attach_features(df, ['vwap_fast', 'vwap_slow', 'price_vwap_distance', 'price_ejection',
+                     'price_above_vwap', 'price_below_vwap', 'long_signal', 'short_signal'])
 
-# Calculate VWAP Slow (for trend filter)
 if USE_VWAP_SLOW_TREND_FILTER:
-    df['vwap_slow'] = calculate_vwap(df, period=VWAP_SLOW)
     print(f"[INFO] VWAP Slow calculated (period={VWAP_SLOW}) for trend filter")
 
 # Pre-calculate VWAP Slope for all bars (ABSOLUTE VALUE for exit logic)
 print(f"[INFO] Calculating VWAP Slope for all bars...")
-df['vwap_slope'] = [abs(calculate_vwap_slope_at_bar(df, idx, window=VWAP_SLOPE_DEGREE_WINDOW)) for idx in df.index]
+# Same endpoint definition as calculate_vwap_slope_at_bar (0 while the window is incomplete), vectorized
+df['vwap_slope'] = np.abs(np.nan_to_num(rolling_slope(df['vwap_fast'], VWAP_SLOPE_DEGREE_WINDOW, method='endpoint')))
 print(f"[OK] VWAP Slope calculated for {len(df[df['vwap_slope'].notna()])} bars")
 
-# Calculate price-VWAP distance (this creates the green dots)
-df['price_vwap_distance'] = abs((df['close'] - df['vwap_fast']) / df['vwap_fast'])
-
-# Detect price ejection signals (green dots)
-# Green dot appears when price is ejected from VWAP (distance > PRICE_EJECTION_TRIGGER)
-df['price_ejection'] = (df['price_vwap_distance'] > PRICE_EJECTION_TRIGGER) & (df['vwap_fast'].notna())
-
-# Detect when price is above or below VWAP
-df['price_above_vwap'] = (df['close'] > df['vwap_fast']).astype(bool)
-df['price_below_vwap'] = (df['close'] < df['vwap_fast']).astype(bool)
-
-# Entry signals:
-# LONG: Green dot AND price above VWAP (bullish ejection)
-# SHORT: Green dot AND price below VWAP (bearish ejection)
-df['long_signal'] = df['price_ejection'] & df['price_above_vwap']
-df['short_signal'] = df['price_ejection'] & df['price_below_vwap']
-
 print(f"[INFO] VWAP Fast calculated")
 print(f"[INFO] Price ejection signals (green dots): {df['price_ejection'].sum()}")
 print(f"[INFO] LONG entry signals (green dots above VWAP): {df['long_signal'].sum()}")
 print(f"[INFO] SHORT entry signals (green dots below VWAP): {df['short_signal'].sum()}")
 
+# ATR for the trailing stop (computed over the warm-up bars too, so it is valid from the first bar)
+if USE_ATR_TRAILING_STOP:
+    from calculate_atr import calculate_atr
+    df['atr'] = calculate_atr(df, period=ATR_PERIOD, mode=ATR_MODE)
+    print(f"[INFO] ATR({ATR_PERIOD}, {ATR_MODE}) calculated for trailing stop (multiplier {ATR_MULTIPLIER}x)")
+
+# Drop the warm-up bars of the previous session (indicators are already computed over them)
+df = strip_warmup(df)
+
 # ============================================================================
 # STRATEGY EXECUTION
 # ============================================================================
@@ -461,6 +460,18 @@ for idx, bar in df.iterrows():
                                 exit_reason = 'slope_exit'
                                 exit_price = bar['close']
 
+            # ATR TRAILING STOP (if enabled): follows the best price since entry at ATR * multiplier,
+            # only tightening the stop (never widening it). Updated after the exit checks: the bar's
+            # high/low are only known at its close, so the new stop applies from the next bar
+            if exit_reason is None and USE_ATR_TRAILING_STOP and not pd.isna(bar['atr']):
+                atr_distance = bar['atr'] * ATR_MULTIPLIER
+                if direction == 'BUY':
+                    open_position['highest_since_entry'] = max(open_position.get('highest_since_entry', bar['high']), bar['high'])
+                    open_position['sl_price'] = max(sl_price, open_position['highest_since_entry'] - atr_distance)
+                else:  # SELL
+                    open_position['lowest_since_entry'] = min(open_position.get('lowest_since_entry', bar['low']), bar['low'])
+                    open_position['sl_price'] = min(sl_price, open_position['lowest_since_entry'] + atr_distance)
+
         # Close position if exit triggered
         if exit_reason:
             # Calculate P&L (different for LONG vs SHORT)
@@ -10,7 +10,7 @@ import pandas as pd
 from pathlib import Path
 from datetime import datetime, time
 from config import (
-    DATE, START_DATE, END_DATE,
+    DATE, START_DATE, END_DATE, SESSION_WARMUP_BARS,
     VWAP_FAST, VWAP_SLOW, PRICE_EJECTION_TRIGGER,
     DATA_DIR, OUTPUTS_DIR, POINT_VALUE,
     ENABLE_VWAP_PULLBACK_STRATEGY,
@@ -18,7 +18,7 @@ from config import (
     VWAP_PULLBACK_MAX_POSITIONS,
     VWAP_PULLBACK_START_HOUR, VWAP_PULLBACK_END_HOUR
 )
-from calculate_vwap import calculate_vwap
+from feature_store import attach_features
 from show_config_dashboard import update_dashboard
 
 # Auto-update configuration dashboard
@@ -86,9 +86,10 @@ print("="*80 + "\n")
 # LOAD DATA
 # ============================================================================
 from find_fractals import load_date_range
+from sessions import strip_warmup
 
 print(f"[INFO] Loading data for date: {DATE}")
-df = load_date_range(START_DATE, END_DATE)
+df = load_date_range(START_DATE, END_DATE, warmup=SESSION_WARMUP_BARS)
 
 if df is None:
     print("[ERROR] Could not load data")
@@ -99,25 +100,10 @@ print(f"[OK] Data loaded: {len(df)} bars")
 # ============================================================================
 # CALCULATE INDICATORS
 # ============================================================================
-# Calculate VWAP Fast
-df['vwap_fast'] = calculate_vwap(df, period=VWAP_FAST)
-
-# Calculate VWAP Slow (required for trend filter)
-df['vwap_slow'] = calculate_vwap(df, period=VWAP_SLOW)
-
-# Calculate price-VWAP distance (this creates the green dots)
-df['price_vwap_distance'] = abs((df['close'] - df['vwap_fast']) / df['vwap_fast'])
-
-# Detect price ejection signals (green dots)
-df['price_ejection'] = (df['price_vwap_distance'] > PRICE_EJECTION_TRIGGER) & (df['vwap_fast'].notna())
-
-# Detect when price is above or below VWAP
-df['price_above_vwap'] = (df['close'] > df['vwap_fast']).astype(bool)
-df['price_below_vwap'] = (df['close'] < df['vwap_fast']).astype(bool)
-
-# Detect trend based on VWAP Fast vs VWAP Slow
-df['uptrend'] = (df['vwap_fast'] > df['vwap_slow']) & (df['vwap_slow'].notna())
-df['downtrend'] = (df['vwap_fast'] < df['vwap_slow']) & (df['vwap_slow'].notna())
+# VWAP Fast/Slow, price ejection (green dots), price vs VWAP and trend (VWAP Fast vs VWAP Slow)
+# from the shared feature store
+attach_features(df, ['vwap_fast', 'vwap_slow', 'price_vwap_distance', 'price_ejection',
+                     'price_above_vwap', 'price_below_vwap', 'uptrend', 'downtrend'])
 
 # Entry signals (PULLBACK LOGIC):
 # LONG: Green dot BELOW VWAP (pullback) + VWAP Fast > VWAP Slow (uptrend) = Buy the dip
@@ -131,6 +117,9 @@ print(f"[INFO] Price ejection signals (green dots): {df['price_ejection'].sum()}
 print(f"[INFO] LONG entry signals (green dots below VWAP in uptrend): {df['long_signal'].sum()}")
 print(f"[INFO] SHORT entry signals (green dots above VWAP in downtrend): {df['short_signal'].sum()}")
 
+# Drop the warm-up bars of the previous session (indicators are already computed over them)
+df = strip_warmup(df)
+
 # ============================================================================
 # STRATEGY EXECUTION
 # ============================================================================
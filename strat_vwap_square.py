@@ -10,7 +10,7 @@ import pandas as pd
 from pathlib import Path
 from datetime import datetime, time, timedelta
 from config import (
-    DATE, START_DATE, END_DATE,
+    DATE, START_DATE, END_DATE, SESSION_WARMUP_BARS,
     DATA_DIR, OUTPUTS_DIR, POINT_VALUE,
     ENABLE_VWAP_SQUARE_STRATEGY,
     VWAP_SQUARE_TP_POINTS, VWAP_SQUARE_SL_POINTS,
@@ -20,11 +20,10 @@ from config import (
     VWAP_SQUARE_SHIFT_POINTS,
     VWAP_SQUARE_MIN_SPIKE,
     USE_SQUARE_VWAP_SLOW_TREND_FILTER,
-    USE_SQUARE_ATR_TRAILING_STOP, SQUARE_ATR_PERIOD, SQUARE_ATR_MULTIPLIER,
+    USE_SQUARE_ATR_TRAILING_STOP, SQUARE_ATR_PERIOD, SQUARE_ATR_MULTIPLIER, SQUARE_ATR_MODE,
     USE_OPOSITE_SIDE_OF_SQUARE_AS_STOP,
     USE_VWAP_SQUARE_SHAKE_OUT,
-    VWAP_SQUARE_SHAKE_OUT_RETRACEMENT_PCT,
-    VWAP_FAST, VWAP_SLOW
+    VWAP_SQUARE_SHAKE_OUT_RETRACEMENT_PCT
 )
 from show_config_dashboard import update_dashboard
 
@@ -131,9 +130,10 @@ print("="*80 + "\n")
 # LOAD DATA
 # ============================================================================
 from find_fractals import load_date_range
+from sessions import strip_warmup
 
 print(f"[INFO] Loading data for date: {DATE}")
-df = load_date_range(START_DATE, END_DATE)
+df = load_date_range(START_DATE, END_DATE, warmup=SESSION_WARMUP_BARS)
 
 if df is None:
     print("[ERROR] Could not load data")
@@ -145,20 +145,12 @@ print(f"[OK] Data loaded: {len(df)} bars")
 # CALCULATE VWAP INDICATORS FOR TREND FILTER
 # ============================================================================
 if USE_SQUARE_VWAP_SLOW_TREND_FILTER:
-    from calculate_vwap import calculate_vwap
+    from feature_store import attach_features
 
     print(f"[INFO] Calculating VWAP indicators for trend filter...")
 
-    # Calculate VWAP Fast and Slow if not already present
-    if 'vwap_fast' not in df.columns or df['vwap_fast'].isna().all():
-        df['vwap_fast'] = calculate_vwap(df, period=VWAP_FAST)
-
-    if 'vwap_slow' not in df.columns or df['vwap_slow'].isna().all():
-        df['vwap_slow'] = calculate_vwap(df, period=VWAP_SLOW)
-
-    # Determine trend direction
-    df['uptrend'] = (df['vwap_fast'] > df['vwap_slow']) & (df['vwap_slow'].notna())
-    df['downtrend'] = (df['vwap_fast'] < df['vwap_slow']) & (df['vwap_slow'].notna())
+    # VWAP Fast/Slow and trend direction from the shared feature store
+    attach_features(df, ['vwap_fast', 'vwap_slow', 'uptrend', 'downtrend'])
 
     uptrend_bars = df['uptrend'].sum()
     downtrend_bars = df['downtrend'].sum()
@@ -180,14 +172,18 @@ if USE_SQUARE_ATR_TRAILING_STOP:
     print(f"[INFO] Calculating ATR for trailing stop...")
     print(f"  - ATR Period: {SQUARE_ATR_PERIOD}")
     print(f"  - ATR Multiplier: {SQUARE_ATR_MULTIPLIER}")
+    print(f"  - ATR Mode: {SQUARE_ATR_MODE}")
 
-    df['atr'] = calculate_atr(df, period=SQUARE_ATR_PERIOD)
+    df['atr'] = calculate_atr(df, period=SQUARE_ATR_PERIOD, mode=SQUARE_ATR_MODE)
     atr_valid_bars = df['atr'].notna().sum()
 
     print(f"[OK] ATR calculated: {atr_valid_bars} valid values")
 else:
     print(f"[INFO] Using FIXED stop loss: {SL_POINTS} points")
 
+# Drop the warm-up bars of the previous session (indicators are already computed over them)
+df = strip_warmup(df)
+
 # ============================================================================
 # FIND RECTANGLES - REALTIME METHOD
 # ============================================================================
@@ -17,20 +17,20 @@ Logic:
 import pandas as pd
 from datetime import datetime, time
 from config import (
-    DATE, START_DATE, END_DATE,
+    DATE, START_DATE, END_DATE, SESSION_WARMUP_BARS,
     ENABLE_VWAP_WYCKOFF_STRATEGY,
     START_ORANGE_DOT_WYCKOFF_TIME,
     END_ORANGE_DOT_WYCKOFF_TIME,
     VWAP_WYCKOFF_EXIT_TIME,
     TP_ORANGE_DOT_WYCKOFF,
     SL_ORANGE_DOT_WYCKOFF,
-    VWAP_FAST, VWAP_SLOW, DATA_DIR, OUTPUTS_DIR,
+    DATA_DIR, OUTPUTS_DIR,
     OPENING_RANGE_START, OPENING_RANGE_END, PRICE_EJECTION_TRIGGER,
     MAX_NUM_TRADES_PER_DAY,
     REVERSE_AT_EACH_ORANGE_DOT,
-    USE_WYCKOFF_ATR_TRAILING_STOP, WYCKOFF_ATR_PERIOD, WYCKOFF_ATR_MULTIPLIER
+    USE_WYCKOFF_ATR_TRAILING_STOP, WYCKOFF_ATR_PERIOD, WYCKOFF_ATR_MULTIPLIER, WYCKOFF_ATR_MODE
 )
-import pandas_ta as ta
+from calculate_atr import calculate_atr
 from show_config_dashboard import update_dashboard
 
 # Auto-update configuration dashboard
@@ -66,25 +66,24 @@ print(f"  - Reverse at each Orange Dot: {REVERSE_AT_EACH_ORANGE_DOT}")
 # LOAD DATA
 # ============================================================================
 from find_fractals import load_date_range
-from calculate_vwap import calculate_vwap
+from sessions import strip_warmup
+from feature_store import attach_features
 from find_trend_divergence import find_trend_divergence_dots
 
 print(f"\n[INFO] Loading data for {START_DATE} to {END_DATE}...")
-df = load_date_range(START_DATE, END_DATE)
+df = load_date_range(START_DATE, END_DATE, warmup=SESSION_WARMUP_BARS)
 
 if df is None:
     print("[ERROR] No data loaded")
     exit(1)
 
-# Calculate VWAP
-df['vwap_fast'] = calculate_vwap(df, period=VWAP_FAST)
-df['vwap_slow'] = calculate_vwap(df, period=VWAP_SLOW)
+# VWAP Fast/Slow from the shared feature store
+attach_features(df, ['vwap_fast', 'vwap_slow'])
 
-# Calculate ATR for Trailing Stop
 # Calculate ATR for Trailing Stop
 if USE_WYCKOFF_ATR_TRAILING_STOP:
-    print(f"[INFO] Calculating ATR({WYCKOFF_ATR_PERIOD})...")
-    df['atr'] = df.ta.atr(length=WYCKOFF_ATR_PERIOD)
+    print(f"[INFO] Calculating ATR({WYCKOFF_ATR_PERIOD}, {WYCKOFF_ATR_MODE})...")
+    df['atr'] = calculate_atr(df, period=WYCKOFF_ATR_PERIOD, mode=WYCKOFF_ATR_MODE)
 
 # Identify "Orange Dots" (Trend Divergence) exactly as plotted in chart
 # This ensures strategy aligns with visual indicators
@@ -100,6 +99,9 @@ sl_history_records = [] # List to store (timestamp, sl_price)
 # No longer needing pre-calculated dots index or OR range for this new logic
 # We will check conditions bar by bar.
 
+# Drop the warm-up bars of the previous session (indicators are already computed over them)
+df = strip_warmup(df)
+
 # ============================================================================
 # STRATEGY EXECUTION
 # ============================================================================
@@ -0,0 +1,410 @@
+"""
+Indicadores incrementales (O(1) por barra) para operar en tiempo real
+Cada clase recibe las barras una a una con update(bar) (dict, fila de DataFrame o
+cualquier objeto con bar['high'], bar['close']...) y devuelve el valor de la barra.
+Mantienen un buffer circular con la ventana y sumas acumuladas, sin recalcular la
+ventana completa.
+
+Las sumas móviles replican las reglas de actualización de pandas (suma compensada de
+Kahan al añadir/quitar valores, Welford para la varianza, corrección de valores
+repetidos), así que replay(df) devuelve exactamente (bit a bit) lo mismo que:
+    - StreamingVWAP       -> calculate_vwap(df, period, source)
+    - StreamingVWAPSlope  -> calculate_vwap_slope(df, window, method) sobre el VWAP
+    - StreamingATR        -> calculate_atr(df, period)
+    - SessionVWAPBands    -> vwap_bands.calculate_vwap_bands (bandas de plot_day / analyze_band_reversals)
+De este modo el motor en vivo y el backtest comparten el mismo cálculo.
+"""
+import math
+from datetime import time as dt_time
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from config import VWAP_FAST, VWAP_SLOPE_DEGREE_WINDOW, VWAP_BANDS_START_TIME, ATR_PERIOD, VWAP_SOURCE
+from tick_store import PRICE_VOLUME_COLUMN
+
+
+NAN = float('nan')
+
+
+# =============================================================================
+# SUMAS MÓVILES (mismas operaciones que pandas rolling)
+# =============================================================================
+
+class _RollingSum:
+    """
+    Suma de los últimos `window` valores con el algoritmo de pandas rolling().sum()/.mean():
+    suma de Kahan con compensaciones separadas para altas y bajas, NaN ignorados y
+    resultado exacto cuando toda la ventana repite el mismo valor.
+    """
+
+    def __init__(self, window: int):
+        if window < 1:
+            raise ValueError(f"window debe ser >= 1, no {window}")
+        self.window = window
+        self._buffer = [NAN] * window
+        self._count = 0
+        self._reset()
+
+    def _reset(self):
+        self.nobs = 0
+        self.total = 0.0
+        self.neg_ct = 0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._same_count = 0
+        self._prev = NAN
+
+    def _add(self, val: float):
+        if val != val:
+            return
+        self.nobs += 1
+        y = val - self._comp_add
+        t = self.total + y
+        self._comp_add = t - self.total - y
+        self.total = t
+        if math.copysign(1.0, val) < 0:
+            self.neg_ct += 1
+        if val == self._prev:
+            self._same_count += 1
+        else:
+            self._same_count = 1
+        self._prev = val
+
+    def _remove(self, val: float):
+        if val != val:
+            return
+        self.nobs -= 1
+        y = -val - self._comp_remove
+        t = self.total + y
+        self._comp_remove = t - self.total - y
+        self.total = t
+        if math.copysign(1.0, val) < 0:
+            self.neg_ct -= 1
+
+    def push(self, val: float):
+        """Añade un valor a la ventana (y saca el más antiguo si está llena)"""
+        val = float(val)
+        slot = self._count % self.window
+        if self._count == 0 or self.window == 1:
+            # pandas reinicia la suma cuando la ventana nueva no solapa con la anterior
+            self._reset()
+            self._prev = val
+            self._same_count = 0
+        elif self._count >= self.window:
+            self._remove(self._buffer[slot])
+        self._buffer[slot] = val
+        self._add(val)
+        self._count += 1
+
+    @property
+    def full(self) -> bool:
+        return self._count >= self.window and self.nobs >= self.window
+
+    def sum(self) -> float:
+        """Suma de la ventana (NaN si no tiene `window` valores válidos)"""
+        if not self.full:
+            return NAN
+        if self._same_count >= self.nobs:
+            return self._prev * self.nobs
+        return self.total
+
+    def mean(self) -> float:
+        """Media de la ventana (NaN si no tiene `window` valores válidos)"""
+        if not self.full:
+            return NAN
+        result = self.total / self.nobs
+        if self._same_count >= self.nobs:
+            result = self._prev
+        elif self.neg_ct == 0 and result < 0:
+            result = 0.0
+        elif self.neg_ct == self.nobs and result > 0:
+            result = 0.0
+        return result
+
+
+class _ExpandingVariance:
+    """Varianza acumulada (ddof=1) con Welford + Kahan, como pandas expanding().var()"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.nobs = 0
+        self._mean = 0.0
+        self._ssqdm = 0.0
+        self._comp = 0.0
+        self._same_count = 0
+        self._prev = NAN
+        self._started = False
+
+    def push(self, val: float):
+        val = float(val)
+        if not self._started:
+            self._started = True
+            self._prev = val
+        if val != val:
+            return
+        self.nobs += 1
+        if val == self._prev:
+            self._same_count += 1
+        else:
+            self._same_count = 1
+        self._prev = val
+
+        prev_mean = self._mean - self._comp
+        y = val - self._comp
+        t = y - self._mean
+        self._comp = t + self._mean - y
+        self._mean = self._mean + t / self.nobs
+        self._ssqdm = self._ssqdm + (val - prev_mean) * (val - self._mean)
+
+    def var(self) -> float:
+        if self.nobs < 2:
+            return NAN
+        if self._same_count >= self.nobs:
+            return 0.0
+        return self._ssqdm / (self.nobs - 1)
+
+    def std(self) -> float:
+        var = self.var()
+        return math.sqrt(var) if var >= 0 else (0.0 if var == var else NAN)
+
+
+# =============================================================================
+# INDICADORES
+# =============================================================================
+
+class StreamingIndicator:
+    """Base: update(bar) procesa una barra y devuelve el valor; replay(df) procesa un DataFrame"""
+
+    columns = ('high', 'low', 'close', 'volume')
+
+    def update(self, bar):
+        raise NotImplementedError
+
+    def replay(self, df: pd.DataFrame) -> np.ndarray:
+        """Alimenta todas las barras de df en orden y devuelve los valores (array float64)"""
+        return np.array([self.update(bar) for bar in df[list(self.columns)].to_dict('records')],
+                        dtype=np.float64)
+
+
+class StreamingVWAP(StreamingIndicator):
+    """
+    VWAP móvil de `period` barras (= calculate_vwap). Con source='tick' usa el
+    price_volume de la barra (Σ precio·volumen de sus trades) en lugar del precio típico
+    """
+
+    def __init__(self, period: int = VWAP_FAST, source: str = VWAP_SOURCE):
+        from calculate_vwap import VWAP_SOURCES
+        if source not in VWAP_SOURCES:
+            raise ValueError(f"source debe ser uno de {VWAP_SOURCES}, no '{source}'")
+        self.period = period
+        self.source = source
+        if source == 'tick':
+            self.columns = (PRICE_VOLUME_COLUMN, 'volume')
+        self._tp_volume = _RollingSum(period)
+        self._volume = _RollingSum(period)
+        self.value = NAN
+
+    def update(self, bar) -> float:
+        volume = float(bar['volume'])
+        if self.source == 'tick':
+            self._tp_volume.push(float(bar[PRICE_VOLUME_COLUMN]))
+        else:
+            typical_price = (bar['high'] + bar['low'] + bar['close']) / 3
+            self._tp_volume.push(typical_price * volume)
+        self._volume.push(volume)
+        self.value = self._tp_volume.sum() / self._volume.sum()
+        return self.value
+
+
+class StreamingVWAPSlope(StreamingIndicator):
+    """
+    Pendiente (con signo) del VWAP de `period` barras en las últimas `window` barras
+    (= calculate_vwap_slope sobre calculate_vwap). El VWAP de la barra queda en .vwap
+    """
+
+    def __init__(self, period: int = VWAP_FAST, window: int = VWAP_SLOPE_DEGREE_WINDOW,
+                 method: str = 'regression', source: str = VWAP_SOURCE):
+        from calculate_vwap_slope import SLOPE_METHODS
+        if method not in SLOPE_METHODS:
+            raise ValueError(f"method debe ser uno de {SLOPE_METHODS}, no '{method}'")
+        if window < 2:
+            raise ValueError(f"window debe ser >= 2, no {window}")
+        self.window = window
+        self.method = method
+        self._vwap = StreamingVWAP(period, source)
+        self.columns = self._vwap.columns
+        self._values = [NAN] * window   # Últimos `window` VWAP (endpoint)
+        self._sum_y = _RollingSum(window)
+        self._sum_ky = _RollingSum(window)
+        self._offset = None             # Primer VWAP válido (rolling_slope desplaza y a ese valor)
+        self._k = 0
+        self.vwap = NAN
+        self.value = NAN
+
+    def update(self, bar) -> float:
+        self.vwap = y = self._vwap.update(bar)
+        k = self._k
+        self._k += 1
+
+        if self.method == 'endpoint':
+            self._values[k % self.window] = y
+            if k < self.window - 1:
+                self.value = NAN
+            else:
+                first = self._values[(k + 1) % self.window]
+                self.value = (y - first) / (self.window - 1)
+            return self.value
+
+        if self._offset is None and y == y:
+            self._offset = y
+        if self._offset is not None:
+            y = y - self._offset
+        self._sum_y.push(y)
+        self._sum_ky.push(float(k) * y)
+
+        sum_y = self._sum_y.sum()
+        sum_xy = self._sum_ky.sum() - (float(k) - (self.window - 1)) * sum_y
+        x_mean = (self.window - 1) / 2
+        sxx = self.window * (self.window * self.window - 1) / 12
+        self.value = (sum_xy - x_mean * sum_y) / sxx
+        return self.value
+
+
+class StreamingATR(StreamingIndicator):
+    """
+    ATR del True Range de `period` barras (= calculate_atr con el mismo mode): media simple
+    ('sma') o suavizado recursivo 'wilder' / 'ema' sembrado con la primera media simple
+    """
+
+    columns = ('high', 'low', 'close')
+
+    def __init__(self, period: int = ATR_PERIOD, mode: str = 'sma'):
+        from calculate_atr import ATR_MODES
+        if mode not in ATR_MODES:
+            raise ValueError(f"mode debe ser uno de {ATR_MODES}, no '{mode}'")
+        self.period = period
+        self.mode = mode
+        self._alpha = 1.0 / period if mode == 'wilder' else 2.0 / (period + 1)
+        self._tr = _RollingSum(period)
+        self._prev_close = NAN
+        self.value = NAN
+
+    def update(self, bar) -> float:
+        high, low, close = float(bar['high']), float(bar['low']), float(bar['close'])
+        tr = high - low
+        if self._prev_close == self._prev_close:
+            tr = max(tr, abs(high - self._prev_close), abs(low - self._prev_close))
+        self._prev_close = close
+        self._tr.push(tr)
+
+        if self.mode == 'sma' or self.value != self.value:
+            # SMA o semilla del suavizado: primera media simple completa
+            self.value = self._tr.mean()
+        elif tr == tr and self.value != tr:
+            # Mismo paso que pandas ewm(adjust=False)
+            old_wt = 1.0 - self._alpha
+            self.value = (old_wt * self.value + self._alpha * tr) / (old_wt + self._alpha)
+        return self.value
+
+
+class SessionVWAPBands(StreamingIndicator):
+    """
+    Bandas de desviación estándar del VWAP ancladas a la sesión: desviación típica
+    acumulada (ddof=1) de close - vwap desde VWAP_BANDS_START_TIME de cada día, como
+    plot_day y analyze_band_reversals. Antes de la hora de inicio (o con menos de dos
+    barras) las bandas son NaN. El estado se reinicia al cambiar de fecha.
+    """
+
+    columns = ('timestamp', 'high', 'low', 'close', 'volume')
+    keys = ('vwap', 'std_dev', 'upper_1sigma', 'lower_1sigma',
+            'upper_2sigma', 'lower_2sigma', 'upper_3sigma', 'lower_3sigma')
+
+    def __init__(self, period: int = VWAP_FAST, start_time: str = VWAP_BANDS_START_TIME,
+                 source: str = VWAP_SOURCE):
+        self.start_time: dt_time = pd.to_datetime(start_time).time()
+        self._vwap = StreamingVWAP(period, source)
+        self.columns = ('timestamp', 'close') + tuple(c for c in self._vwap.columns if c != 'close')
+        self._variance = _ExpandingVariance()
+        self._session_date = None
+        self.value: Optional[dict] = None
+
+    def update(self, bar) -> dict:
+        timestamp = pd.Timestamp(bar['timestamp'])
+        vwap = self._vwap.update(bar)
+
+        if timestamp.date() != self._session_date:
+            self._session_date = timestamp.date()
+            self._variance.reset()
+
+        std_dev = NAN
+        if timestamp.time() >= self.start_time:
+            self._variance.push(float(bar['close']) - vwap)
+            std_dev = self._variance.std()
+
+        self.value = {
+            'vwap': vwap,
+            'std_dev': std_dev,
+            'upper_1sigma': vwap + std_dev,
+            'lower_1sigma': vwap - std_dev,
+            'upper_2sigma': vwap + 2 * std_dev,
+            'lower_2sigma': vwap - 2 * std_dev,
+            'upper_3sigma': vwap + 3 * std_dev,
+            'lower_3sigma': vwap - 3 * std_dev,
+        }
+        return self.value
+
+    def replay(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Alimenta todas las barras de df y devuelve un DataFrame con las columnas de keys"""
+        rows = [self.update(bar) for bar in df[list(self.columns)].to_dict('records')]
+        return pd.DataFrame(rows, index=df.index, columns=list(self.keys))
+
+
+if __name__ == "__main__":
+    from find_fractals import load_date_range
+    from calculate_vwap import calculate_vwap
+    from calculate_vwap_slope import calculate_vwap_slope
+    from calculate_atr import calculate_atr
+    from vwap_bands import calculate_vwap_bands
+    from config import START_DATE, END_DATE
+
+    print("="*70)
+    print("TEST: Indicadores incrementales vs cálculo por lotes")
+    print("="*70)
+    print(f"Periodo: {START_DATE} -> {END_DATE}")
+
+    df = load_date_range(START_DATE, END_DATE)
+    if df is None:
+        print("[ERROR] No se pudieron cargar datos")
+        exit(1)
+
+    def same(a, b):
+        return np.array_equal(np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64), equal_nan=True)
+
+    vwap = calculate_vwap(df, period=VWAP_FAST)
+    df['vwap_fast'] = vwap
+    checks = {
+        f"VWAP({VWAP_FAST})": same(StreamingVWAP(VWAP_FAST).replay(df), vwap),
+        f"VWAP ticks({VWAP_FAST})": same(
+            StreamingVWAP(VWAP_FAST, source='tick').replay(df), calculate_vwap(df, period=VWAP_FAST, source='tick')),
+        f"VWAP slope regression({VWAP_SLOPE_DEGREE_WINDOW})": same(
+            StreamingVWAPSlope(VWAP_FAST).replay(df), calculate_vwap_slope(df)),
+        f"VWAP slope endpoint({VWAP_SLOPE_DEGREE_WINDOW})": same(
+            StreamingVWAPSlope(VWAP_FAST, method='endpoint').replay(df), calculate_vwap_slope(df, method='endpoint')),
+        f"ATR({ATR_PERIOD})": same(StreamingATR(ATR_PERIOD).replay(df), calculate_atr(df, period=ATR_PERIOD)),
+        f"ATR Wilder({ATR_PERIOD})": same(
+            StreamingATR(ATR_PERIOD, mode='wilder').replay(df), calculate_atr(df, period=ATR_PERIOD, mode='wilder')),
+    }
+
+    bands = SessionVWAPBands(VWAP_FAST).replay(df)
+    checks[f"Bandas VWAP desde {VWAP_BANDS_START_TIME}"] = all(
+        same(bands[column], batch) for column, batch in calculate_vwap_bands(df).items())
+
+    for name, ok in checks.items():
+        print(f"  {'[OK]' if ok else '[ERROR]'} {name}: {'idéntico' if ok else 'DISTINTO'}")
+
+    print(f"\nRegistros totales: {len(df)}")
+    print("\n[OK] Test completado" if all(checks.values()) else "\n[ERROR] Hay diferencias")
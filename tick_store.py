@@ -0,0 +1,628 @@
+"""
+Almacén columnar de ticks NQ en formato NumPy (.npy)
+Convierte una sola vez data/time_and_sales_nq_YYYYMMDD.csv a un array estructurado
+con columnas tipadas para evitar re-parsear el CSV (separador ; y decimal ,) en cada script.
+
+Layout por día (data/tick_store/time_and_sales_nq_YYYYMMDD.npy, registros de ancho fijo):
+    timestamp  int64    nanosegundos desde epoch (hora local del fichero, sin zona)
+    price      int32    precio en ticks de TICK_SIZE (0.25 puntos en NQ)
+    volume     uint32
+    lado       int8     1 = ASK, -1 = BID, 0 = desconocido
+    bid        int32    en ticks (NO_PRICE si falta)
+    ask        int32    en ticks (NO_PRICE si falta)
+
+Los precios se guardan como número entero de ticks (25 bytes por registro frente a 37
+en float64) y se convierten a puntos solo al construir DataFrames/informes
+(ticks_to_points), de modo que las comparaciones de niveles en ticks son exactas.
+
+Ficheros de origen en data/ (por orden de preferencia, ver SOURCE_SUFFIXES):
+    time_and_sales_nq_YYYYMMDD.csv        CSV original
+    time_and_sales_nq_YYYYMMDD.csv.zst    CSV comprimido con zstd
+    time_and_sales_nq_YYYYMMDD.csv.gz     CSV comprimido con gzip
+    time_and_sales_nq_YYYYMMDD.parquet    Columnar comprimido (columnas de TICK_DTYPE, zstd)
+Los comprimidos se leen de forma transparente (read_tick_source) y ocupan 8-10x menos.
+
+Uso:
+    python tick_store.py                    # Convierte todos los ficheros de data/ que no tengan store
+    python tick_store.py --force            # Re-convierte todos
+    python tick_store.py --archive [zst|gz|parquet]   # Comprime los CSV de data/ (default: zst)
+"""
+
+import io
+import re
+import sys
+import gzip
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import List, Optional
+
+from config import DATA_DIR, TICK_STORE_DIR, TICK_SIZE
+
+
+TICK_DTYPE = np.dtype([
+    ('timestamp', '<i8'),
+    ('price', '<i4'),
+    ('volume', '<u4'),
+    ('lado', 'i1'),
+    ('bid', '<i4'),
+    ('ask', '<i4'),
+])
+
+NO_PRICE = np.iinfo(np.int32).min  # Precio ausente (bid/ask vacíos) en columnas de ticks enteros
+
+LADO_TO_CODE = {'ASK': 1, 'BID': -1}
+CODE_TO_LADO = {1: 'ASK', -1: 'BID'}
+
+# Columna de barras con Σ(precio·volumen) de sus trades (con volume = Σvolumen da el VWAP exacto)
+PRICE_VOLUME_COLUMN = 'price_volume'
+
+
+# Ficheros de origen en data/ por orden de preferencia (ver tick_source_path)
+SOURCE_SUFFIXES = ('.csv', '.csv.zst', '.csv.gz', '.parquet')
+
+PARQUET_COMPRESSION = 'zstd'
+ARCHIVE_ZSTD_LEVEL = 19  # Se comprime una vez y se lee muchas: nivel alto (la descompresión no se ralentiza)
+
+
+# =============================================================================
+# PRECIOS EN TICKS
+# =============================================================================
+
+def points_to_ticks(points) -> np.ndarray:
+    """Convierte precios en puntos a número entero de ticks (int32); NaN -> NO_PRICE"""
+    points = np.asarray(points, dtype='f8')
+    ticks = np.rint(points / TICK_SIZE)
+    return np.where(np.isnan(ticks), NO_PRICE, ticks).astype(np.int32)
+
+
+def ticks_to_points(ticks) -> np.ndarray:
+    """Convierte número de ticks (int32) a puntos (float64); NO_PRICE -> NaN"""
+    ticks = np.asarray(ticks)
+    points = ticks.astype('f8') * TICK_SIZE
+    return np.where(ticks == NO_PRICE, np.nan, points)
+
+
+# =============================================================================
+# RUTAS
+# =============================================================================
+
+def csv_path_for(date_str: str, data_dir: Path = DATA_DIR) -> Path:
+    """Ruta del CSV original para una fecha YYYYMMDD"""
+    return data_dir / f"time_and_sales_nq_{date_str}.csv"
+
+
+def source_format(path: Path) -> str:
+    """Formato de un fichero de origen según su extensión ('csv', 'csv.zst', 'csv.gz', 'parquet', 'npy')"""
+    name = Path(path).name
+    return next((suffix.lstrip('.') for suffix in SOURCE_SUFFIXES + ('.npy',) if name.endswith(suffix)), '')
+
+
+def source_stem(path: Path) -> str:
+    """Nombre de un fichero de origen sin extensión (time_and_sales_nq_YYYYMMDD)"""
+    name = Path(path).name
+    fmt = source_format(path)
+    return name[:-len(fmt) - 1] if fmt else Path(path).stem
+
+
+def tick_source_path(date_str: str, data_dir: Path = DATA_DIR) -> Optional[Path]:
+    """
+    Fichero de ticks de una fecha en data/: el CSV original o, si no existe,
+    su versión comprimida (por orden de SOURCE_SUFFIXES). None si no hay ninguno.
+    """
+    for suffix in SOURCE_SUFFIXES:
+        path = data_dir / f"time_and_sales_nq_{date_str}{suffix}"
+        if path.exists():
+            return path
+    return None
+
+
+def source_files(data_dir: Path = DATA_DIR) -> List[Path]:
+    """Fichero de origen preferido (tick_source_path) de cada día con datos en data_dir"""
+    date_pattern = re.compile(r"time_and_sales_nq_(\d{8})\.")
+    matches = (date_pattern.match(p.name) for p in data_dir.glob("time_and_sales_nq_*"))
+    dates = sorted({m.group(1) for m in matches if m})
+    return [path for path in (tick_source_path(d, data_dir) for d in dates) if path is not None]
+
+
+def store_path_for(date_str: str, store_dir: Path = TICK_STORE_DIR) -> Path:
+    """Ruta del fichero .npy convertido para una fecha YYYYMMDD"""
+    return store_dir / f"time_and_sales_nq_{date_str}.npy"
+
+
+def available_dates(start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[str]:
+    """
+    Fechas YYYYMMDD con datos (CSV en data/ o fichero en el store), ordenadas
+
+    Args:
+        start_date: Fecha mínima incluida (None = sin límite)
+        end_date: Fecha máxima incluida (None = sin límite)
+    """
+    date_pattern = re.compile(r"time_and_sales_nq_(\d{8})\.(?:csv|csv\.zst|csv\.gz|parquet|npy)$")
+    dates = set()
+    for directory in (DATA_DIR, TICK_STORE_DIR):
+        if not directory.exists():
+            continue
+        for path in directory.glob("time_and_sales_nq_*"):
+            match = date_pattern.match(path.name)
+            if match:
+                dates.add(match.group(1))
+
+    return sorted(
+        d for d in dates
+        if (start_date is None or d >= start_date) and (end_date is None or d <= end_date)
+    )
+
+
+def _is_current_store(store_path: Path, csv_path: Optional[Path]) -> bool:
+    """
+    True si store_path existe, tiene el layout actual (TICK_DTYPE) y no es
+    más antiguo que el fichero de origen (CSV o comprimido)
+    """
+    if not store_path.exists():
+        return False
+    if csv_path is not None and csv_path.exists() and csv_path.stat().st_mtime > store_path.stat().st_mtime:
+        return False
+    try:
+        return np.load(store_path, mmap_mode='r').dtype == TICK_DTYPE
+    except (ValueError, OSError):
+        return False
+
+
+def has_store(date_str: str) -> bool:
+    """
+    True si existe un store convertido y está al día respecto al fichero de origen
+    (si el origen se modificó después de la conversión, o el fichero tiene un
+    layout anterior, el store se considera obsoleto)
+    """
+    return _is_current_store(store_path_for(date_str), tick_source_path(date_str))
+
+
+# =============================================================================
+# CSV <-> ARRAY
+# =============================================================================
+
+TICK_COLUMN_NAMES = {
+    'timestamp': 'timestamp',
+    'precio': 'precio',
+    'price': 'price',
+    'volumen': 'volume',
+    'volume': 'volume',
+    'lado': 'lado',
+    'bid': 'bid',
+    'ask': 'ask',
+}
+
+# Tipos fijos por columna normalizada (timestamp se lee como texto y se parsea aparte)
+TICK_CSV_DTYPES = {
+    'timestamp': str,
+    'precio': 'float64',
+    'price': 'float64',
+    'volume': 'int64',
+    'lado': str,
+    'bid': 'float64',
+    'ask': 'float64',
+}
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pa_parquet
+except ImportError:  # pyarrow es opcional: sin él se usa el motor C de pandas
+    pa = None
+    pa_csv = None
+    pa_parquet = None
+
+try:
+    import zstandard
+except ImportError:  # Solo hace falta para .csv.zst si no está pyarrow
+    zstandard = None
+
+
+# =============================================================================
+# FICHEROS COMPRIMIDOS
+# =============================================================================
+
+def open_tick_source(path: Path):
+    """
+    Abre un CSV de ticks (plano, .zst o .gz) como stream binario descomprimido
+
+    zstd se descomprime con pyarrow si está instalado (o con zstandard); gzip con la
+    librería estándar.
+    """
+    path = Path(path)
+    if path.name.endswith('.zst'):
+        if pa is not None:
+            return pa.input_stream(str(path), compression='zstd')
+        if zstandard is not None:
+            return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        raise ImportError(f"Leer {path.name} requiere pyarrow o zstandard")
+    if path.name.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def read_source_bytes(path: Path) -> bytes:
+    """Contenido descomprimido de un CSV de ticks (plano, .zst o .gz)"""
+    with open_tick_source(path) as f:
+        return f.read()
+
+
+def is_compressed(path: Path) -> bool:
+    """True si el fichero es un CSV comprimido (.zst / .gz)"""
+    return Path(path).name.endswith(('.zst', '.gz'))
+
+
+def normalize_tick_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normaliza nombres de columnas del CSV de ticks a MINÚSCULAS (in place)
+    Acepta tanto el formato antiguo (Timestamp;Precio;Volumen) como el nuevo (timestamp;price;volume)
+    """
+    column_mapping = {
+        col: TICK_COLUMN_NAMES[col.lower()]
+        for col in df.columns if col.lower() in TICK_COLUMN_NAMES
+    }
+    df.rename(columns=column_mapping, inplace=True)
+    return df
+
+
+def price_column(df: pd.DataFrame) -> str:
+    """Nombre de la columna de precio de un DataFrame de ticks ('price' o 'precio')"""
+    return 'price' if 'price' in df.columns else 'precio'
+
+
+def tick_csv_dtypes(columns) -> dict:
+    """dtype para pd.read_csv a partir de los nombres de columna originales del CSV"""
+    return {
+        col: TICK_CSV_DTYPES[TICK_COLUMN_NAMES[col.lower()]]
+        for col in columns if col.lower() in TICK_COLUMN_NAMES
+    }
+
+
+def detect_timestamp_format(sample: str) -> str:
+    """
+    Formato strftime de un timestamp de ejemplo del fichero
+    ('2025-12-10 00:00:01' o '2025-11-27 00:00:00.019')
+    """
+    return '%Y-%m-%d %H:%M:%S.%f' if '.' in sample else '%Y-%m-%d %H:%M:%S'
+
+
+def _read_tick_csv_arrow(csv_path: Path, header: list, sample_ts: str) -> pd.DataFrame:
+    """
+    Lector pyarrow (multihilo): el fichero solo usa ',' como separador decimal,
+    así que se sustituye por '.' en el buffer y se parsea con tipos fijos
+    """
+    raw = read_source_bytes(csv_path).replace(b',', b'.')
+
+    # Misma resolución que daría pd.to_datetime sobre el fichero (ns en pandas 2, s/ms/us en pandas 3)
+    unit = np.datetime_data(pd.to_datetime(pd.Series([sample_ts])).dtype)[0]
+    arrow_types = {
+        'float64': pa.float64(), 'int64': pa.int64(), str: pa.string(),
+    }
+    column_types = {}
+    for col, dtype in tick_csv_dtypes(header).items():
+        is_ts = TICK_COLUMN_NAMES[col.lower()] == 'timestamp'
+        column_types[col] = pa.timestamp(unit) if is_ts else arrow_types[dtype]
+
+    table = pa_csv.read_csv(
+        pa.py_buffer(raw),
+        parse_options=pa_csv.ParseOptions(delimiter=';'),
+        convert_options=pa_csv.ConvertOptions(column_types=column_types),
+    )
+    return table.to_pandas()
+
+
+def _read_tick_csv_pandas(csv_path: Path, header: list, sample_ts: str) -> pd.DataFrame:
+    """Lector pandas (motor C) con dtypes fijos y formato de timestamp detectado una vez"""
+    source = io.BytesIO(read_source_bytes(csv_path)) if is_compressed(csv_path) else csv_path
+    df = pd.read_csv(source, sep=';', decimal=',', dtype=tick_csv_dtypes(header))
+    ts_col = next(col for col in header if col.lower() == 'timestamp')
+    df[ts_col] = pd.to_datetime(df[ts_col], format=detect_timestamp_format(sample_ts))
+    return df
+
+
+def read_tick_csv(csv_path: Path) -> pd.DataFrame:
+    """
+    Lee un CSV de time_and_sales (sep=';', decimal=',') con columnas normalizadas
+    y timestamp convertido a datetime. Acepta CSV comprimidos (.csv.zst, .csv.gz).
+
+    Ruta rápida: dtypes fijos y formato de timestamp detectado una sola vez con la
+    primera fila (pyarrow si está instalado, motor C de pandas si no). Si el fichero
+    no encaja (columnas con huecos, formatos mezclados...) se usa la lectura genérica
+    con inferencia. Ver benchmarks/bench_tick_csv.py.
+    """
+    with io.TextIOWrapper(open_tick_source(csv_path), encoding='utf-8') as f:
+        header = f.readline().strip().split(';')
+        sample_ts = f.readline().split(';')[0]
+
+    readers = [_read_tick_csv_pandas]
+    if pa_csv is not None:
+        readers.insert(0, _read_tick_csv_arrow)
+
+    df = None
+    for reader in readers:
+        try:
+            df = reader(csv_path, header, sample_ts)
+            break
+        except (ValueError, TypeError, KeyError, StopIteration):
+            continue
+
+    if df is None:
+        source = io.BytesIO(read_source_bytes(csv_path)) if is_compressed(csv_path) else csv_path
+        df = pd.read_csv(source, sep=';', decimal=',')
+        normalize_tick_columns(df)
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        return df
+
+    normalize_tick_columns(df)
+    return df
+
+
+def read_tick_csv_bytes(data: bytes, header: List[str]) -> pd.DataFrame:
+    """
+    Parsea un fragmento de CSV de time_and_sales sin cabecera (p.ej. las líneas
+    añadidas a un fichero que sigue creciendo) con las columnas de header
+
+    Returns:
+        DataFrame de ticks con columnas normalizadas y timestamp datetime
+    """
+    df = pd.read_csv(io.BytesIO(data), sep=';', decimal=',', header=None,
+                     names=header, dtype=tick_csv_dtypes(header))
+    normalize_tick_columns(df)
+    df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601')
+    return df
+
+
+def frame_to_array(df: pd.DataFrame) -> np.ndarray:
+    """Convierte un DataFrame de ticks normalizado a un array estructurado TICK_DTYPE"""
+    arr = np.empty(len(df), dtype=TICK_DTYPE)
+    arr['timestamp'] = df['timestamp'].to_numpy(dtype='datetime64[ns]').view('i8')
+    arr['price'] = points_to_ticks(df[price_column(df)])
+    arr['volume'] = df['volume'].to_numpy(dtype='u4')
+
+    if 'lado' in df.columns:
+        lado = df['lado'].astype(str).str.upper()
+        arr['lado'] = lado.map(LADO_TO_CODE).fillna(0).to_numpy(dtype='i1')
+    else:
+        arr['lado'] = 0
+
+    for col in ('bid', 'ask'):
+        arr[col] = points_to_ticks(df[col]) if col in df.columns else NO_PRICE
+
+    return arr
+
+
+def array_to_frame(arr: np.ndarray) -> pd.DataFrame:
+    """
+    Convierte un array TICK_DTYPE al DataFrame de ticks estándar
+    (timestamp, price, volume, lado, bid, ask) con precios en puntos.
+    El timestamp sale en datetime64[us], la resolución con la que pandas parsea el CSV,
+    salvo que algún tick tenga nanosegundos (entonces datetime64[ns], sin pérdida).
+    """
+    lado = pd.Series(arr['lado']).map(CODE_TO_LADO)
+    ts = arr['timestamp']
+    unit = 'ns' if (ts % 1000).any() else 'us'
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(ts.astype('datetime64[ns]').astype(f'datetime64[{unit}]')),
+        'price': ticks_to_points(arr['price']),
+        'volume': arr['volume'].astype('int64'),
+        'lado': lado,
+        'bid': ticks_to_points(arr['bid']),
+        'ask': ticks_to_points(arr['ask']),
+    })
+
+
+def write_tick_parquet(arr: np.ndarray, path: Path, compression: str = PARQUET_COMPRESSION) -> Path:
+    """Guarda un array TICK_DTYPE como Parquet comprimido (una columna por campo, precios en ticks)"""
+    if pa_parquet is None:
+        raise ImportError("Escribir Parquet requiere pyarrow")
+    table = pa.table({name: arr[name] for name in TICK_DTYPE.names})
+    level = ARCHIVE_ZSTD_LEVEL if compression == 'zstd' else None
+    pa_parquet.write_table(table, str(path), compression=compression, compression_level=level)
+    return Path(path)
+
+
+def read_tick_parquet(path: Path) -> np.ndarray:
+    """Lee un Parquet de ticks (ver write_tick_parquet) a un array TICK_DTYPE; descompresión multihilo"""
+    if pa_parquet is None:
+        raise ImportError(f"Leer {Path(path).name} requiere pyarrow")
+    table = pa_parquet.read_table(str(path), columns=list(TICK_DTYPE.names), use_threads=True)
+    arr = np.empty(table.num_rows, dtype=TICK_DTYPE)
+    for name in TICK_DTYPE.names:
+        arr[name] = table.column(name).to_numpy()
+    return arr
+
+
+def read_tick_source_array(path: Path) -> np.ndarray:
+    """Ticks de cualquier fichero de origen (CSV plano/comprimido o Parquet) como array TICK_DTYPE"""
+    if source_format(path) == 'parquet':
+        return read_tick_parquet(path)
+    return frame_to_array(read_tick_csv(path))
+
+
+def read_tick_source(path: Path) -> pd.DataFrame:
+    """Ticks de cualquier fichero de origen (CSV plano/comprimido o Parquet) como DataFrame normalizado"""
+    if source_format(path) == 'parquet':
+        return array_to_frame(read_tick_parquet(path))
+    return read_tick_csv(path)
+
+
+# =============================================================================
+# CONVERSIÓN
+# =============================================================================
+
+def convert_csv_to_store(csv_path: Path, store_dir: Path = TICK_STORE_DIR, force: bool = False) -> Optional[Path]:
+    """
+    Convierte un fichero de ticks a su .npy en el store
+
+    Args:
+        csv_path: Ruta al fichero de origen time_and_sales_nq_YYYYMMDD (.csv, .csv.zst, .csv.gz o .parquet)
+        store_dir: Directorio destino
+        force: Si True, re-convierte aunque el store esté al día
+
+    Returns:
+        Ruta del fichero .npy o None si hubo error
+    """
+    csv_path = Path(csv_path)
+    store_path = store_dir / f"{source_stem(csv_path)}.npy"
+
+    if not force and _is_current_store(store_path, csv_path):
+        print(f"  [-] Ya convertido: {csv_path.name}")
+        return store_path
+
+    try:
+        arr = read_tick_source_array(csv_path)
+    except Exception as e:
+        print(f"  [ERROR] {csv_path.name}: {e}")
+        return None
+
+    store_dir.mkdir(parents=True, exist_ok=True)
+
+    # Escribir a fichero temporal y renombrar para no dejar stores a medias
+    tmp_path = store_path.with_name(store_path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        np.save(f, arr)
+    tmp_path.replace(store_path)
+
+    print(f"  [OK] {csv_path.name} -> {store_path.name} ({len(arr):,} ticks)")
+    return store_path
+
+
+def convert_all(data_dir: Path = DATA_DIR, store_dir: Path = TICK_STORE_DIR, force: bool = False) -> List[Path]:
+    """
+    Convierte todos los time_and_sales_nq_* de data_dir al store
+    (un fichero por día: el CSV o, si no existe, su versión comprimida)
+
+    Returns:
+        Lista de rutas .npy generadas (o ya existentes)
+    """
+    csv_files = source_files(data_dir)
+
+    print("="*70)
+    print("CONVERSIÓN CSV -> TICK STORE (.npy)")
+    print("="*70)
+    print(f"Origen: {data_dir}")
+    print(f"Destino: {store_dir}")
+    print(f"Archivos encontrados: {len(csv_files)}")
+    print("-"*70)
+
+    converted = []
+    for csv_file in csv_files:
+        store_path = convert_csv_to_store(csv_file, store_dir=store_dir, force=force)
+        if store_path is not None:
+            converted.append(store_path)
+
+    print("-"*70)
+    print(f"[OK] {len(converted)}/{len(csv_files)} archivos en el store")
+    return converted
+
+
+def archive_source(csv_path: Path, fmt: str = 'zst', force: bool = False) -> Optional[Path]:
+    """
+    Comprime un CSV de ticks junto al original (.csv.zst, .csv.gz o .parquet)
+    El CSV no se borra: mientras exista tiene preferencia (ver tick_source_path).
+
+    Args:
+        csv_path: Ruta al CSV time_and_sales_nq_YYYYMMDD.csv
+        fmt: 'zst', 'gz' o 'parquet'
+        force: Si True, re-comprime aunque el fichero exista y esté al día
+
+    Returns:
+        Ruta del fichero comprimido o None si hubo error
+    """
+    csv_path = Path(csv_path)
+    suffix = {'zst': '.csv.zst', 'gz': '.csv.gz', 'parquet': '.parquet'}[fmt]
+    out_path = csv_path.with_name(source_stem(csv_path) + suffix)
+
+    if not force and out_path.exists() and out_path.stat().st_mtime >= csv_path.stat().st_mtime:
+        print(f"  [-] Ya comprimido: {out_path.name}")
+        return out_path
+
+    tmp_path = out_path.with_name(out_path.name + '.tmp')
+    try:
+        if fmt == 'parquet':
+            write_tick_parquet(frame_to_array(read_tick_csv(csv_path)), tmp_path)
+        elif fmt == 'zst':
+            if pa is None:
+                raise ImportError("Comprimir con zstd requiere pyarrow")
+            codec = pa.Codec('zstd', compression_level=ARCHIVE_ZSTD_LEVEL)
+            tmp_path.write_bytes(codec.compress(csv_path.read_bytes(), asbytes=True))
+        else:
+            with gzip.open(tmp_path, 'wb') as f:
+                f.write(csv_path.read_bytes())
+    except Exception as e:
+        tmp_path.unlink(missing_ok=True)
+        print(f"  [ERROR] {csv_path.name}: {e}")
+        return None
+    tmp_path.replace(out_path)
+
+    ratio = csv_path.stat().st_size / out_path.stat().st_size
+    print(f"  [OK] {csv_path.name} -> {out_path.name} ({ratio:.1f}x)")
+    return out_path
+
+
+# =============================================================================
+# CARGA
+# =============================================================================
+
+def load_tick_array(date_str: str, mmap_mode: Optional[str] = None) -> Optional[np.ndarray]:
+    """
+    Carga el array estructurado de ticks de una fecha desde el store
+
+    Args:
+        date_str: Fecha en formato YYYYMMDD
+        mmap_mode: None = leer a memoria, 'r' = memory-map de solo lectura (ver load_tick_view)
+
+    Returns:
+        np.ndarray con dtype TICK_DTYPE o None si no hay store al día
+    """
+    if not has_store(date_str):
+        return None
+    return np.load(store_path_for(date_str), mmap_mode=mmap_mode)
+
+
+def load_tick_view(date_str: str) -> Optional[np.ndarray]:
+    """
+    Memory-map de solo lectura del fichero .npy de una fecha (zero-copy)
+
+    El array devuelto es un np.memmap con dtype TICK_DTYPE: las columnas
+    (arr['price'], arr['timestamp'], ...) son vistas sobre el page cache del SO,
+    de modo que varios procesos que abren el mismo día comparten la memoria
+    en lugar de materializar cada uno su propia copia en pandas.
+
+    Returns:
+        np.memmap con dtype TICK_DTYPE o None si no hay store al día
+    """
+    return load_tick_array(date_str, mmap_mode='r')
+
+
+def load_tick_frame(date_str: str) -> Optional[pd.DataFrame]:
+    """
+    Carga los ticks de una fecha como DataFrame (timestamp, price, volume, lado, bid, ask).
+    Usa el store si existe y cae al fichero de origen (CSV o comprimido) en caso contrario.
+
+    Returns:
+        DataFrame de ticks o None si no existe ni store ni fichero de origen
+    """
+    arr = load_tick_array(date_str)
+    if arr is not None:
+        return array_to_frame(arr)
+
+    source_path = tick_source_path(date_str)
+    if source_path is None:
+        return None
+    return read_tick_source(source_path)
+
+
+if __name__ == "__main__":
+    force = '--force' in sys.argv[1:] or '-f' in sys.argv[1:]
+    if '--archive' in sys.argv[1:]:
+        fmt_args = [a for a in sys.argv[1:] if a in ('zst', 'gz', 'parquet')]
+        fmt = fmt_args[0] if fmt_args else 'zst'
+        print("="*70)
+        print(f"COMPRESIÓN CSV -> {fmt.upper()}")
+        print("="*70)
+        for csv_file in sorted(DATA_DIR.glob("time_and_sales_nq_*.csv")):
+            archive_source(csv_file, fmt=fmt, force=force)
+    else:
+        convert_all(force=force)
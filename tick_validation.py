@@ -0,0 +1,207 @@
+"""
+Validación vectorizada de ticks antes de agregarlos a barras
+Marca cada tick con un bitmask de problemas, descarta los marcados, los guarda en
+data/quarantine/ (mismo formato que el CSV original + columna flags) y registra un
+informe de calidad por día en el catálogo (ver data_catalog.py).
+
+Reglas (todas en ticks enteros sobre el array TICK_DTYPE, sin bucles Python):
+    bad_price     precio <= 0, ausente o a más de TICK_MAX_DEVIATION_PCT de la mediana del día
+    spike         pico aislado: salto > TICK_MAX_JUMP_POINTS respecto al tick anterior y al
+                  siguiente, que entre sí están cerca
+    bad_volume    volumen 0
+    out_of_order  timestamp anterior al máximo de los ticks previos
+    duplicate     tick fuera de orden que repite exactamente un registro ya visto
+                  (reenvío del grabador)
+    crossed       bid > ask
+
+Varias ejecuciones idénticas consecutivas con el mismo timestamp NO son duplicados:
+son fills legítimos de una misma orden agresiva contra varias órdenes en el libro.
+"""
+
+import numpy as np
+from pathlib import Path
+from typing import Optional
+
+from config import (
+    QUARANTINE_DIR, TICK_QUARANTINE, TICK_MAX_DEVIATION_PCT, TICK_MAX_JUMP_POINTS, TICK_SIZE
+)
+from tick_store import NO_PRICE, array_to_frame
+from data_catalog import record_quality
+
+
+FLAG_BAD_PRICE = 1
+FLAG_SPIKE = 2
+FLAG_BAD_VOLUME = 4
+FLAG_OUT_OF_ORDER = 8
+FLAG_DUPLICATE = 16
+FLAG_CROSSED = 32
+
+FLAG_NAMES = {
+    FLAG_BAD_PRICE: 'bad_price',
+    FLAG_SPIKE: 'spike',
+    FLAG_BAD_VOLUME: 'bad_volume',
+    FLAG_OUT_OF_ORDER: 'out_of_order',
+    FLAG_DUPLICATE: 'duplicate',
+    FLAG_CROSSED: 'crossed',
+}
+
+
+# =============================================================================
+# VALIDACIÓN
+# =============================================================================
+
+def validate_tick_array(ticks: np.ndarray, prev_timestamp: Optional[int] = None,
+                        context: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Bitmask de problemas por tick (0 = tick válido)
+
+    Args:
+        ticks: Array estructurado TICK_DTYPE (o vista memory-mapped)
+        prev_timestamp: Último timestamp (ns) ya ingerido, para validar el orden de
+                        un fragmento que continúa otro (ingesta incremental)
+        context: Últimos ticks (sin validar) que preceden al fragmento; entran en la
+                 mediana y en la comparación con el vecino anterior, pero no se marcan
+
+    Returns:
+        np.ndarray uint8 con los FLAG_* de cada tick
+    """
+    if context is not None and len(context):
+        flags = validate_tick_array(np.concatenate([context, ticks]), prev_timestamp)
+        return flags[len(context):]
+
+    n = len(ticks)
+    flags = np.zeros(n, dtype=np.uint8)
+    if n == 0:
+        return flags
+
+    price = ticks['price'].astype(np.int64)
+    ts = ticks['timestamp']
+
+    # Precios imposibles o absurdos respecto a la mediana del día
+    has_price = price > 0
+    flags[~has_price] |= FLAG_BAD_PRICE
+    if has_price.any():
+        median = np.median(price[has_price])
+        max_dev = median * TICK_MAX_DEVIATION_PCT / 100
+        flags[has_price & (np.abs(price - median) > max_dev)] |= FLAG_BAD_PRICE
+
+    # Picos aislados: lejos de ambos vecinos, que entre sí están cerca
+    if n >= 3:
+        max_jump = TICK_MAX_JUMP_POINTS / TICK_SIZE
+        prev, cur, nxt = price[:-2], price[1:-1], price[2:]
+        spike = (
+            (np.abs(cur - prev) > max_jump)
+            & (np.abs(cur - nxt) > max_jump)
+            & (np.abs(nxt - prev) <= max_jump)
+        )
+        flags[1:-1][spike] |= FLAG_SPIKE
+
+    flags[ticks['volume'] == 0] |= FLAG_BAD_VOLUME
+
+    # Orden temporal: cada tick debe ser >= que todos los anteriores
+    running_max = np.maximum.accumulate(ts)
+    out_of_order = np.zeros(n, dtype=bool)
+    out_of_order[1:] = ts[1:] < running_max[:-1]
+    if prev_timestamp is not None:
+        out_of_order |= ts < prev_timestamp
+
+    if out_of_order.any():
+        # Reenvíos: registros fuera de orden idénticos a uno ya recibido en orden
+        records = np.ascontiguousarray(ticks).view(f"V{ticks.dtype.itemsize}")
+        _, inverse = np.unique(records, return_inverse=True)
+        seen = np.zeros(inverse.max() + 1, dtype=bool)
+        seen[inverse[~out_of_order]] = True
+        duplicate = out_of_order & seen[inverse]
+        flags[duplicate] |= FLAG_DUPLICATE
+        flags[out_of_order & ~duplicate] |= FLAG_OUT_OF_ORDER
+
+    # Cotización cruzada
+    bid, ask = ticks['bid'], ticks['ask']
+    flags[(bid != NO_PRICE) & (ask != NO_PRICE) & (bid > ask)] |= FLAG_CROSSED
+
+    return flags
+
+
+def flag_counts(flags: np.ndarray) -> dict:
+    """Número de ticks con cada tipo de problema {nombre: n}"""
+    return {name: int(np.count_nonzero(flags & flag)) for flag, name in FLAG_NAMES.items()}
+
+
+def flag_labels(flags: np.ndarray) -> np.ndarray:
+    """Etiquetas de texto ('bad_price|spike') de un array de bitmasks"""
+    unique, inverse = np.unique(flags, return_inverse=True)
+    labels = np.array([
+        '|'.join(name for flag, name in FLAG_NAMES.items() if value & flag)
+        for value in unique
+    ], dtype=object)
+    return labels[inverse]
+
+
+# =============================================================================
+# CUARENTENA E INFORME
+# =============================================================================
+
+def quarantine_path_for(date_str: str) -> Path:
+    """Fichero de cuarentena de un día"""
+    return QUARANTINE_DIR / f"time_and_sales_nq_{date_str}_quarantine.csv"
+
+
+def write_quarantine(date_str: str, ticks: np.ndarray, flags: np.ndarray, append: bool = False) -> Path:
+    """
+    Guarda los ticks descartados en formato CSV de time_and_sales (sep ';', decimal ',')
+    con una columna flags adicional
+    """
+    path = quarantine_path_for(date_str)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    df_bad = array_to_frame(ticks)
+    df_bad['flags'] = flag_labels(flags)
+
+    write_header = not (append and path.exists())
+    df_bad.to_csv(path, mode='a' if append else 'w', header=write_header,
+                  index=False, sep=';', decimal=',')
+    return path
+
+
+def quality_report(flags: np.ndarray, quarantine: Optional[Path] = None) -> dict:
+    """Informe de calidad de un día para el catálogo"""
+    return {
+        'rows': int(len(flags)),
+        'dropped': int(np.count_nonzero(flags)),
+        'flags': flag_counts(flags),
+        'quarantine': str(quarantine) if quarantine else None,
+    }
+
+
+def clean_tick_array(ticks: np.ndarray, date_str: Optional[str] = None) -> np.ndarray:
+    """
+    Valida los ticks de un día y devuelve solo los válidos
+    Si no hay ticks inválidos devuelve el mismo array (sin copia: la vista memory-mapped se conserva).
+
+    Args:
+        ticks: Array estructurado TICK_DTYPE
+        date_str: Fecha YYYYMMDD; si se indica, los descartes se guardan en cuarentena
+                  (con TICK_QUARANTINE) y el informe de calidad se registra en el catálogo
+
+    Returns:
+        Array TICK_DTYPE sin los ticks marcados
+    """
+    flags = validate_tick_array(ticks)
+    bad = flags != 0
+    n_bad = int(np.count_nonzero(bad))
+
+    if date_str is not None:
+        quarantine = None
+        if n_bad and TICK_QUARANTINE:
+            quarantine = write_quarantine(date_str, ticks[bad], flags[bad])
+        else:
+            quarantine_path_for(date_str).unlink(missing_ok=True)
+
+        record_quality(date_str, quality_report(flags, quarantine))
+
+    if n_bad == 0:
+        return ticks
+
+    counts = ', '.join(f"{name}={n}" for name, n in flag_counts(flags).items() if n)
+    print(f"[WARNING] {n_bad:,} ticks inválidos descartados de {len(ticks):,} ({counts})")
+    return ticks[~bad]
@@ -1,21 +1,20 @@
 import pandas as pd
+import numpy as np
+import io
 import os
+import sys
+import json
 from pathlib import Path
 
-def segregate_csv_by_date(input_file='data/time_and_sales_20251224_080632.csv'):
-    """
-    Segrega un archivo CSV por fecha, creando un archivo CSV por cada día único.
-    Normaliza automáticamente los nombres de columnas (mayúsculas/minúsculas).
+# Add parent directory to path to import config / tick_store
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-    Args:
-        input_file: Ruta al archivo CSV de entrada
-    """
-    # Leer el archivo CSV (formato europeo: separador ; y decimal ,)
-    print(f"Leyendo archivo: {input_file}")
-    df = pd.read_csv(input_file, sep=';', decimal=',')
 
-    # Normalizar nombres de columnas (soportar mayúsculas y minúsculas)
-    # Siempre convertir a minúsculas para el formato de salida
+def normalize_columns(df):
+    """
+    Normaliza nombres de columnas (soportar mayúsculas y minúsculas) in place.
+    Siempre convierte a minúsculas para el formato de salida.
+    """
     column_mapping = {}
     for col in df.columns:
         col_lower = col.lower()
@@ -33,6 +32,27 @@ def segregate_csv_by_date(input_file='data/time_and_sales_20251224_080632.csv'):
             column_mapping[col] = 'ask'
 
     df.rename(columns=column_mapping, inplace=True)
+    return df
+
+
+def segregate_csv_by_date(input_file='data/time_and_sales_20251224_080632.csv'):
+    """
+    Segrega un archivo CSV por fecha, creando un archivo CSV por cada día único.
+    Normaliza automáticamente los nombres de columnas (mayúsculas/minúsculas).
+    Lee el archivo completo en memoria; para exportaciones grandes usar
+    segregate_csv_by_date_streaming.
+
+    Args:
+        input_file: Ruta al archivo CSV de entrada (acepta .csv.zst / .csv.gz)
+    """
+    # Leer el archivo CSV (formato europeo: separador ; y decimal ,)
+    from tick_store import open_tick_source
+
+    print(f"Leyendo archivo: {input_file}")
+    with open_tick_source(input_file) as f:
+        df = pd.read_csv(f, sep=';', decimal=',')
+
+    normalize_columns(df)
 
     print(f"[INFO] Columnas normalizadas: {list(df.columns)}")
 
@@ -64,5 +84,243 @@ def segregate_csv_by_date(input_file='data/time_and_sales_20251224_080632.csv'):
 
     print(f"\nProceso completado. Se crearon {len(grouped)} archivos en {output_dir}")
 
+
+READ_BLOCK_BYTES = 1 << 22  # Bytes leídos del stream en cada read() de read_line_chunks
+
+
+def read_header_line(source):
+    """
+    Cabecera de un stream binario de CSV: (línea de cabecera con su salto de línea,
+    bytes ya leídos tras ella)
+    """
+    data = b''
+    while b'\n' not in data:
+        block = source.read(READ_BLOCK_BYTES)
+        if not block:
+            break
+        data += block
+    end = data.find(b'\n') + 1 or len(data)
+    return data[:end], data[end:]
+
+
+def read_line_chunks(source, chunksize, buffer=b''):
+    """
+    Lee un stream binario de CSV (sin cabecera) en bloques de `chunksize` líneas completas
+    Devuelve bytes terminados en salto de línea (salvo, quizá, el último), de modo que la
+    suma de sus longitudes es la posición en el stream de la última línea completa leída.
+
+    Args:
+        source: Stream binario (fichero o descompresor)
+        chunksize: Líneas por bloque
+        buffer: Bytes ya leídos del stream que preceden a lo que queda por leer
+    """
+    buffer = bytearray(buffer)
+    n_lines = buffer.count(b'\n')
+    while True:
+        block = source.read(READ_BLOCK_BYTES)
+        if block:
+            buffer += block
+            n_lines += block.count(b'\n')
+        if n_lines >= chunksize:
+            newlines = np.flatnonzero(np.frombuffer(buffer, dtype=np.uint8) == ord('\n'))
+            start = 0
+            for end in newlines[chunksize - 1::chunksize] + 1:
+                yield bytes(buffer[start:end])
+                start = end
+            del buffer[:start]
+            n_lines = len(newlines) % chunksize
+        if not block:
+            if buffer.strip():
+                yield bytes(buffer)
+            return
+
+
+def segregate_csv_by_date_streaming(input_file='data/time_and_sales_20251224_080632.csv',
+                                    chunksize=1_000_000, output_format='csv', resume=True):
+    """
+    Versión streaming de segregate_csv_by_date para exportaciones de varios GB.
+    Lee el CSV en bloques de `chunksize` filas, normaliza columnas por bloque y
+    añade cada fila al fichero de su día, con memoria acotada a un bloque.
+
+    El progreso se guarda en <input>.progress.json tras cada bloque (filas leídas,
+    posición en bytes de la última línea completada y tamaño de cada fichero de
+    salida). Si el proceso se interrumpe, al relanzarlo se truncan las salidas al
+    último bloque completado y se continúa desde esa posición, sin volver a parsear
+    las filas ya procesadas.
+    Con 'npy', los .npy.part solo se borran cuando todos los .npy están escritos y
+    el progreso lo ha registrado (finalized), así que la conversión final también
+    puede reanudarse.
+
+    Args:
+        input_file: Ruta al archivo CSV de entrada (acepta .csv.zst / .csv.gz)
+        chunksize: Filas por bloque
+        output_format: 'csv' = time_and_sales_nq_YYYYMMDD.csv junto al original,
+                       'npy' = ficheros del tick store (ver tick_store.py)
+        resume: Si True, continúa desde el progreso guardado (si corresponde al mismo fichero)
+    """
+    if output_format not in ('csv', 'npy'):
+        raise ValueError(f"output_format debe ser 'csv' o 'npy', no '{output_format}'")
+
+    from tick_store import open_tick_source, is_compressed
+
+    input_path = Path(input_file)
+    progress_path = input_path.with_name(input_path.name + '.progress.json')
+    st = input_path.stat()
+
+    if output_format == 'npy':
+        from tick_store import TICK_DTYPE, frame_to_array
+        from config import TICK_STORE_DIR
+        output_dir = TICK_STORE_DIR
+        output_dir.mkdir(parents=True, exist_ok=True)
+    else:
+        output_dir = input_path.parent
+
+    def output_path_for(date_formatted):
+        if output_format == 'npy':
+            # Registros TICK_DTYPE en bruto; se convierte a .npy al terminar
+            return output_dir / f"time_and_sales_nq_{date_formatted}.npy.part"
+        return output_dir / f"time_and_sales_nq_{date_formatted}.csv"
+
+    # Progreso previo (solo válido si el fichero de entrada no ha cambiado)
+    progress = None
+    if resume and progress_path.exists():
+        with open(progress_path, 'r') as f:
+            progress = json.load(f)
+        if (progress.get('size') != st.st_size or progress.get('mtime_ns') != st.st_mtime_ns
+                or progress.get('output_format') != output_format or 'offset' not in progress):
+            print(f"[WARNING] Progreso de otro fichero/formato, se empieza de cero")
+            progress = None
+
+    if progress is None:
+        progress = {
+            'input': str(input_path.resolve()),
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'output_format': output_format,
+            'rows_done': 0,
+            'offset': None,  # bytes (descomprimidos) leídos hasta la última línea completada
+            'outputs': {},  # fecha -> bytes escritos al cerrar el último bloque
+            'finalized': False,  # npy: todos los .npy escritos, solo falta borrar los .part
+        }
+    elif progress.get('finalized'):
+        print("[INFO] Lectura y conversión ya completadas, se terminan de borrar los .part")
+    else:
+        print(f"[INFO] Reanudando desde la fila {progress['rows_done']:,}")
+        # Descartar lo escrito por un bloque que no llegó a completarse
+        for date_formatted, size in progress['outputs'].items():
+            out = output_path_for(date_formatted)
+            if out.exists() and out.stat().st_size > size:
+                with open(out, 'r+b') as f:
+                    f.truncate(size)
+
+    def save_progress():
+        tmp_path = progress_path.with_name(progress_path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(progress, f, indent=2)
+        os.replace(tmp_path, progress_path)
+
+    # Exportaciones comprimidas (.zst / .gz) se descomprimen en streaming
+    if progress.get('finalized'):
+        reader = []
+    else:
+        print(f"Leyendo archivo en bloques de {chunksize:,} filas: {input_file}")
+        source = open_tick_source(input_path)
+        header_line, buffer = read_header_line(source)
+        header = header_line.decode('utf-8').strip().split(';')
+        if progress['offset'] is None:
+            progress['offset'] = len(header_line)
+
+        # Situar el stream en la última línea completada
+        skip = progress['offset'] - len(header_line)
+        if skip <= len(buffer):
+            buffer = buffer[skip:]
+        elif not is_compressed(input_path):
+            source.seek(progress['offset'])
+            buffer = b''
+        else:
+            # Un stream comprimido no admite seek: se descomprime y descarta hasta la
+            # posición guardada, por bloques (sin parsear filas ni acumular memoria)
+            skip -= len(buffer)
+            while skip > 0:
+                block = source.read(min(skip, READ_BLOCK_BYTES))
+                if not block:
+                    break
+                skip -= len(block)
+            buffer = b''
+        reader = read_line_chunks(source, chunksize, buffer)
+
+    for data in reader:
+        chunk = pd.read_csv(io.BytesIO(data), sep=';', decimal=',', header=None, names=header)
+        normalize_columns(chunk)
+        date_only = chunk['timestamp'].str.split(' ').str[0]
+
+        for date, group in chunk.groupby(date_only):
+            date_formatted = date.replace('-', '')
+            out = output_path_for(date_formatted)
+            is_new = date_formatted not in progress['outputs']
+
+            if output_format == 'npy':
+                group = group.copy()
+                group['timestamp'] = pd.to_datetime(group['timestamp'], format='ISO8601')
+                with open(out, 'wb' if is_new else 'ab') as f:
+                    frame_to_array(group).tofile(f)
+            else:
+                group.to_csv(out, mode='w' if is_new else 'a', header=is_new,
+                             index=False, sep=';', decimal=',')
+
+            progress['outputs'][date_formatted] = out.stat().st_size
+
+        progress['rows_done'] += len(chunk)
+        progress['offset'] += len(data)
+        save_progress()
+
+        print(f"  [OK] {progress['rows_done']:,} filas procesadas ({len(progress['outputs'])} días)")
+
+    if not progress.get('finalized'):
+        source.close()
+
+    if output_format == 'npy':
+        if not progress.get('finalized'):
+            # Convertir registros en bruto a .npy (copia por bloques vía memmap); cada .npy
+            # se escribe en un .tmp y se renombra, y los .part se conservan hasta el final
+            for date_formatted in sorted(progress['outputs']):
+                part = output_path_for(date_formatted)
+                raw = np.memmap(part, dtype=TICK_DTYPE, mode='r')
+                final = output_dir / f"time_and_sales_nq_{date_formatted}.npy"
+                tmp_final = final.with_name(final.name + '.tmp')
+                arr = np.lib.format.open_memmap(tmp_final, mode='w+', dtype=TICK_DTYPE, shape=raw.shape)
+                for start in range(0, len(raw), chunksize):
+                    arr[start:start + chunksize] = raw[start:start + chunksize]
+                arr.flush()
+                del arr, raw
+                os.replace(tmp_final, final)
+
+            progress['finalized'] = True
+            save_progress()
+
+        for date_formatted in progress['outputs']:
+            output_path_for(date_formatted).unlink(missing_ok=True)
+
+    for date_formatted in sorted(progress['outputs']):
+        print(f"Creado: {output_path_for(date_formatted).with_suffix('') if output_format == 'npy' else output_path_for(date_formatted)}")
+
+    progress_path.unlink(missing_ok=True)
+    print(f"\nProceso completado. Se crearon {len(progress['outputs'])} archivos en {output_dir}")
+
+
 if __name__ == "__main__":
-    segregate_csv_by_date()
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    flags = [a for a in sys.argv[1:] if a.startswith('--')]
+
+    if '--help' in flags:
+        print("Uso:")
+        print("  python utils/segregate_by_date.py [input.csv]                 # En memoria")
+        print("  python utils/segregate_by_date.py [input.csv] --stream        # Streaming por bloques (reanudable)")
+        print("  python utils/segregate_by_date.py [input.csv] --stream --npy  # Streaming directo al tick store")
+        sys.exit(0)
+
+    kwargs = {'input_file': args[0]} if args else {}
+    if '--stream' in flags:
+        segregate_csv_by_date_streaming(output_format='npy' if '--npy' in flags else 'csv', **kwargs)
+    else:
+        segregate_csv_by_date(**kwargs)
@@ -0,0 +1,192 @@
+"""
+Bandas de desviación estándar del VWAP ancladas a la sesión y reversiones 3σ -> 2σ (blue dots)
+Motor único para plot_day y analyze_band_reversals:
+
+    calculate_vwap_bands(df)        -> bandas ±1σ/±2σ/±3σ alrededor de vwap_fast. σ es la
+                                       desviación típica acumulada (ddof=1) de close - vwap_fast
+                                       desde VWAP_BANDS_START_TIME de cada día, en una sola pasada
+                                       con Welford (el expanding().var() de pandas: Welford + Kahan),
+                                       sin copias del DataFrame por día.
+    detect_band_reversals(df, bands) -> tabla de eventos. BEARISH: cierre por encima de +3σ y después
+                                       cierre por debajo de +2σ (BULLISH simétrico con -3σ / -2σ).
+                                       Tras un evento no hay otro del mismo lado hasta un nuevo cierre
+                                       más allá de 3σ. Escaneo de estados vectorizado, sin iterrows.
+
+Los valores son idénticos a streaming_indicators.SessionVWAPBands barra a barra.
+"""
+from datetime import time as dt_time
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from config import VWAP_BANDS_START_TIME, VWAP_TIME_ENTRY
+
+
+BAND_COLUMNS = ('std_dev', 'upper_1sigma', 'lower_1sigma', 'upper_2sigma', 'lower_2sigma',
+                'upper_3sigma', 'lower_3sigma')
+
+EVENT_COLUMNS = ('signal_bar', 'date', 'signal_type', 'signal_time', 'signal_price',
+                 'extreme_touch_price', 'extreme_touch_time', 'price_movement', 'pct_movement',
+                 'vwap_fast', 'band_3sigma', 'band_2sigma')
+
+
+def _to_time(value) -> dt_time:
+    return value if isinstance(value, dt_time) else pd.to_datetime(value).time()
+
+
+def calculate_vwap_bands(df: pd.DataFrame, start_time=VWAP_BANDS_START_TIME,
+                         vwap_column: str = 'vwap_fast') -> pd.DataFrame:
+    """
+    Bandas de desviación estándar del VWAP ancladas a start_time de cada día
+
+    Args:
+        df: DataFrame con 'timestamp', 'close' y la columna del VWAP (uno o varios días)
+        start_time: Hora de anclaje de las bandas (default: VWAP_BANDS_START_TIME)
+        vwap_column: Columna del VWAP (default: 'vwap_fast')
+
+    Returns:
+        DataFrame con BAND_COLUMNS y el mismo índice que df. NaN antes de start_time
+        y en la primera barra anclada (la desviación típica necesita dos barras).
+    """
+    timestamps = df['timestamp']
+    anchored = (timestamps.dt.time >= _to_time(start_time)).to_numpy()
+    vwap = df[vwap_column]
+
+    deviation = (df['close'] - vwap)[anchored]
+    session = timestamps[anchored].dt.normalize()
+    std_anchored = deviation.groupby(session.to_numpy(), sort=False).expanding().std()
+
+    std_dev = pd.Series(np.nan, index=df.index)
+    std_dev[anchored] = std_anchored.to_numpy()
+
+    return pd.DataFrame({
+        'std_dev': std_dev,
+        'upper_1sigma': vwap + std_dev,
+        'lower_1sigma': vwap - std_dev,
+        'upper_2sigma': vwap + 2 * std_dev,
+        'lower_2sigma': vwap - 2 * std_dev,
+        'upper_3sigma': vwap + 3 * std_dev,
+        'lower_3sigma': vwap - 3 * std_dev,
+    }, index=df.index)
+
+
+def _scan_side(touch: np.ndarray, cross: np.ndarray, session_start: np.ndarray):
+    """
+    Escaneo vectorizado de un lado: posiciones de los eventos (primer `cross` después de
+    un `touch` de la misma sesión sin evento intermedio) y del primer `touch` que los armó
+    """
+    pos = np.arange(len(touch))
+    last_touch = np.maximum.accumulate(np.where(touch, pos, -1))
+    candidates = np.flatnonzero(cross & (last_touch >= session_start))
+    if len(candidates) == 0:
+        return candidates, candidates
+
+    # Un evento por armado: el primer candidato de cada valor de last_touch
+    armed_by = last_touch[candidates]
+    first = np.ones(len(candidates), dtype=bool)
+    first[1:] = armed_by[1:] != armed_by[:-1]
+    events = candidates[first]
+
+    # Primer toque de 3σ desde el evento anterior del mismo lado (o desde el inicio de la sesión)
+    prev_event = np.concatenate(([-1], events[:-1]))
+    lower = np.maximum(prev_event + 1, session_start[events])
+    touch_pos = np.flatnonzero(touch)
+    touches = touch_pos[np.searchsorted(touch_pos, lower)]
+    return events, touches
+
+
+def detect_band_reversals(df: pd.DataFrame, bands: Optional[pd.DataFrame] = None,
+                          after_time=VWAP_TIME_ENTRY, vwap_column: str = 'vwap_fast') -> pd.DataFrame:
+    """
+    Eventos de reversión 3σ -> 2σ (blue dots) de cada día
+
+    Args:
+        df: DataFrame con 'timestamp', 'close' y la columna del VWAP
+        bands: Resultado de calculate_vwap_bands(df) (se calcula si es None)
+        after_time: Solo se escanean barras posteriores a esta hora (None/'' = todas las ancladas)
+        vwap_column: Columna del VWAP (default: 'vwap_fast')
+
+    Returns:
+        DataFrame con EVENT_COLUMNS ordenado por barra. signal_bar es la etiqueta de df.index;
+        extreme_touch_* es el primer cierre más allá de 3σ que armó la señal y
+        price_movement los puntos recorridos desde él hasta el cierre de la señal.
+    """
+    if bands is None:
+        bands = calculate_vwap_bands(df, vwap_column=vwap_column)
+
+    close = df['close'].to_numpy(dtype=np.float64)
+    timestamps = df['timestamp']
+    scan = bands['std_dev'].notna().to_numpy()
+    if after_time:
+        scan = scan & (timestamps.dt.time > _to_time(after_time)).to_numpy()
+
+    # El estado se reinicia cada día: posición de la primera barra de la sesión de cada barra
+    days = timestamps.dt.normalize().to_numpy()
+    new_day = np.ones(len(df), dtype=bool)
+    new_day[1:] = days[1:] != days[:-1]
+    session_start = np.maximum.accumulate(np.where(new_day, np.arange(len(df)), 0))
+
+    sides = (
+        ('BEARISH', 'upper', close > bands['upper_3sigma'].to_numpy(), close < bands['upper_2sigma'].to_numpy(), 1),
+        ('BULLISH', 'lower', close < bands['lower_3sigma'].to_numpy(), close > bands['lower_2sigma'].to_numpy(), -1),
+    )
+
+    blocks = []
+    for signal_type, side, touch, cross, direction in sides:
+        events, touches = _scan_side(touch & scan, cross & scan, session_start)
+        if len(events) == 0:
+            continue
+        signal_price = close[events]
+        touch_price = close[touches]
+        price_move = (touch_price - signal_price) * direction
+        pct_move = np.where(touch_price > 0, price_move / np.where(touch_price > 0, touch_price, 1) * 100, 0.0)
+        blocks.append(pd.DataFrame({
+            'signal_bar': df.index[events],
+            'date': timestamps.iloc[events].dt.strftime('%Y%m%d').to_numpy(),
+            'signal_type': signal_type,
+            'signal_time': timestamps.iloc[events].to_numpy(),
+            'signal_price': signal_price,
+            'extreme_touch_price': touch_price,
+            'extreme_touch_time': timestamps.iloc[touches].to_numpy(),
+            'price_movement': price_move,
+            'pct_movement': pct_move,
+            'vwap_fast': df[vwap_column].to_numpy()[events],
+            'band_3sigma': bands[f'{side}_3sigma'].to_numpy()[events],
+            'band_2sigma': bands[f'{side}_2sigma'].to_numpy()[events],
+            '_pos': events,
+        }))
+
+    if not blocks:
+        return pd.DataFrame(columns=list(EVENT_COLUMNS))
+    return (pd.concat(blocks, ignore_index=True)
+            .sort_values('_pos', kind='stable')
+            .drop(columns='_pos')
+            .reset_index(drop=True))
+
+
+if __name__ == "__main__":
+    from find_fractals import load_date_range
+    from feature_store import attach_features
+    from config import START_DATE, END_DATE
+
+    print("="*70)
+    print("TEST: Bandas VWAP y reversiones 3σ -> 2σ")
+    print("="*70)
+    print(f"Periodo: {START_DATE} -> {END_DATE}")
+
+    df = load_date_range(START_DATE, END_DATE)
+    if df is None:
+        print("[ERROR] No se pudieron cargar datos")
+        exit(1)
+
+    attach_features(df, ['vwap_fast'])
+    bands = calculate_vwap_bands(df)
+    events = detect_band_reversals(df, bands)
+
+    print(f"\nBarras con bandas: {bands['std_dev'].notna().sum()} de {len(df)} (desde {VWAP_BANDS_START_TIME})")
+    print(f"Eventos (después de {VWAP_TIME_ENTRY}): {len(events)}")
+    if not events.empty:
+        print(events[['signal_type', 'signal_time', 'signal_price', 'extreme_touch_time',
+                      'extreme_touch_price', 'price_movement']].to_string(index=False))
+    print("\n[OK] Test completado")